@@ -1,65 +1,35 @@
 import sys
 import os
-import wave
 from datetime import datetime, timedelta
-from collections import Counter
+from collections import Counter, deque
 import subprocess
 import json
 import shlex
 import threading
 import csv
-import socket
 import time
 import numpy as np
 import importlib.util
 
-# --- AppData Storage ---
-APP_NAME = "DSD-FME-GUI"
-if sys.platform == "win32":
-    APP_DATA_DIR = os.path.join(os.environ['APPDATA'], APP_NAME)
-else:
-    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.config', APP_NAME)
-os.makedirs(APP_DATA_DIR, exist_ok=True)
-
-
-def resource_path(relative_path):
-    if getattr(sys, "_MEIPASS", None):
-        base_path = sys._MEIPASS
-    else:
-        base_path = os.path.abspath(".")
-
-    local_path = os.path.join(base_path, relative_path)
-    appdata_path = os.path.join(APP_DATA_DIR, relative_path)
-
-    if not os.path.exists(appdata_path) and os.path.exists(local_path) and relative_path not in ['dsd-fme.exe', 'dsd-fme']:
-        import shutil
-        try:
-            shutil.copy2(local_path, appdata_path)
-        except Exception as e:
-            print(f"Could not copy file {relative_path} to AppData: {e}")
-            return local_path
-
-    if relative_path in ['dsd-fme.exe', 'dsd-fme']:
-        return os.path.join(os.path.abspath("."), relative_path)
-
-    if relative_path.endswith('.json') or relative_path.endswith('.html'):
-        return appdata_path
-
-    return local_path
-
 from PyQt5.QtWidgets import *
-from PyQt5.QtGui import QFont, QPalette, QColor, QTextCursor, QKeySequence, QDesktopServices
+from PyQt5.QtGui import QFont, QPalette, QColor, QKeySequence, QDesktopServices
 from PyQt5.QtMultimedia import QSound
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject, pyqtSlot, QTimer, QDir, QFileSystemWatcher, QDate, QEvent, QUrl
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject, pyqtSlot, QTimer, QFileSystemWatcher, QDate, QEvent, QUrl, QAbstractListModel, QAbstractTableModel, QModelIndex
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 
 import pyqtgraph as pg
 from pyqtgraph import DateAxisItem, AxisItem
 import sounddevice as sd
-from scipy import signal
 import folium
 from folium.plugins import MousePosition, Draw
 
+from dsd_core import (resource_path, CONFIG_FILE, ALIASES_FILE, UDP_IP, UDP_PORT,
+                      AUDIO_RATE, AUDIO_DTYPE, DECODER_MODES, MODULATIONS,
+                      build_commands, spawn_decoder, read_process_lines, LineBatcher, parse_lines, find_alert,
+                      TerminalLog, TERMINAL_LINE_CAP, Logbook, LOGBOOK_HEADER, LOGBOOK_COLUMNS, LOGBOOK_PAGE_SIZE, format_duration,
+                      CallTracker, UdpReceiver, WavRecorder, RECORD_LAYOUTS, RecordingCatalog, RECORDING_SETTLE_SECONDS, available_codecs, read_recording, export_stereo, AudioRouter, DspWorker, filter_params, FILTER_DEFAULTS,
+                      SpectrogramBank, SPEC_FFT_SIZE, MIN_DB, MAX_DB, Scope, SCOPE_SECONDS)
+
 try:
     import winsound
     WINSOUND_AVAILABLE = True
@@ -72,19 +42,14 @@ try:
 except ImportError:
     RTLSDR_AVAILABLE = False
 
-CONFIG_FILE = resource_path('dsd-fme-gui-config.json')
-ALIASES_FILE = resource_path('dsd-fme-aliases.json')
 MAP_FILE = resource_path('lrrp_map.html')
 MAP3D_FILE = resource_path('lrrp_map_3d.html')
+REFRESH_FPS = 20
+SEARCH_DEBOUNCE_MS = 250
 MGRS_LIB = '<script src="https://cdn.jsdelivr.net/npm/mgrs@1.0.0/mgrs.min.js"></script>'
 THREED_HTML = """<!DOCTYPE html><html><head><title>3D Map</title>
 <style>html,body,#map{height:100%;margin:0;}</style></head>
 <body><div id='map'>3D view placeholder</div></body></html>"""
-UDP_IP = "127.0.0.1"; UDP_PORT = 23456
-CHUNK_SAMPLES = 1024; SPEC_WIDTH = 400
-MIN_DB = -70; MAX_DB = 50
-AUDIO_RATE = 16000; AUDIO_DTYPE = np.int16
-WAV_CHANNELS = 2; WAV_SAMPWIDTH = 2
 
 def run_selftest():
     issues = []
@@ -153,6 +118,16 @@ class AudioProcessingWindow(QDialog):
         button_layout.addWidget(close_button)
         main_layout.addLayout(button_layout)
         self.update_eq_mode()
+        self._connect_param_signals()
+
+    def _connect_param_signals(self):
+        """Republish the filter snapshot to the DSP worker whenever an Audio-Lab control changes."""
+        publish = self.main_app.publish_filter_params
+        keys = list(FILTER_DEFAULTS) + [f'eq{port}_band_{i}' for port in (1, 2) for i in range(len(self.main_app.eq_sliders[port]))]
+        for key in keys:
+            widget = self.main_app.widgets[key]
+            (widget.toggled if isinstance(widget, QCheckBox) else widget.valueChanged).connect(publish)
+        self.eq_mode_combo.currentIndexChanged.connect(publish)
 
     def update_eq_mode(self):
         idx = self.eq_mode_combo.currentIndex()
@@ -281,54 +256,294 @@ class AudioProcessingWindow(QDialog):
         self.main_app.widgets['nr_strength_slider'].setValue(50)
 
 class ProcessReader(QObject):
-    line_read = pyqtSignal(int, str)
+    # (port index, console lines, parsed DecoderEvents)
+    lines_read = pyqtSignal(int, list, list)
     finished = pyqtSignal()
 
     def __init__(self, process, index):
         super().__init__()
         self.process = process
         self.index = index
+        self.batcher = LineBatcher(self._emit_batch)
+
+    def _emit_batch(self, lines):
+        self.lines_read.emit(self.index, lines, parse_lines(self.index, lines))
 
     @pyqtSlot()
     def run(self):
-        if self.process and self.process.stdout:
-            for line in iter(self.process.stdout.readline, ''):
-                self.line_read.emit(self.index, line)
+        read_process_lines(self.process, self.batcher.add)
+        self.batcher.close()
         self.finished.emit()
 
 class UdpListener(QObject):
-    data_ready = pyqtSignal(int, bytes)
+    error = pyqtSignal(int, str)
 
-    def __init__(self, ip, port, channel):
+    def __init__(self, ip, port, channel, on_data):
         super().__init__()
-        self.ip, self.port, self.channel = ip, port, channel
-        self.running = True
+        # packets go straight to the DSP worker; only errors come back through Qt
+        self.receiver = UdpReceiver(ip, port, channel, on_data, self.error.emit)
+
+    @property
+    def running(self):
+        return self.receiver.running
+
+    @running.setter
+    def running(self, value):
+        self.receiver.running = value
 
     @pyqtSlot()
     def run(self):
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            sock.bind((self.ip, self.port))
-            sock.settimeout(1)
-        except OSError as e:
-            self.data_ready.emit(self.channel, f"ERROR: Port {self.port} is already in use. {e}".encode())
-            return
-        while self.running:
-            try:
-                data, addr = sock.recvfrom(CHUNK_SAMPLES * 2)
-                if data:
-                    self.data_ready.emit(self.channel, data)
-            except socket.timeout:
-                continue
-        sock.close()
+        self.receiver.run()
 
 class NumericTableWidgetItem(QTableWidgetItem):
     def __lt__(self, other):
         try: return int(self.text()) < int(other.text())
         except ValueError: return super().__lt__(other)
 
+class TerminalLogModel(QAbstractListModel):
+    """One row per console line of a TerminalLog; shared by every pane showing that port."""
+    def __init__(self, log, parent=None):
+        super().__init__(parent); self.log = log
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.log)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid(): return self.log.line(index.row())
+        return None
+
+    def append_text(self, *texts):
+        lines = [line for text in texts for line in text.splitlines()]
+        if not lines: return
+        first = len(self.log)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.log.append_lines(lines)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel(); self.log.clear(); self.endResetModel()
+
+class TerminalView(QListView):
+    """Read-only terminal pane; only the visible rows are ever laid out or painted."""
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True); self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers); self.setWordWrap(False)
+        font = QFont("Consolas"); font.setStyleHint(QFont.Monospace); self.setFont(font)
+        self._at_bottom = True
+        self.setModel(model)
+        model.rowsAboutToBeInserted.connect(self._remember_scroll)
+        model.rowsInserted.connect(self._follow_tail)
+
+    def _remember_scroll(self, *args):
+        bar = self.verticalScrollBar(); self._at_bottom = bar.value() >= bar.maximum()
+
+    def _follow_tail(self, *args):
+        if self._at_bottom: self.scrollToBottom()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            QApplication.clipboard().setText("\n".join(self.model().log.line(r) for r in rows))
+            return
+        super().keyPressEvent(event)
+
+
+class LogbookModel(QAbstractTableModel):
+    """Calls from the Logbook store, fetched a page at a time as the view scrolls.
+
+    Sorting and filtering are handed to SQL and only the loaded pages are
+    kept, so there is no QSortFilterProxyModel in front of it: a proxy can
+    only sort and filter rows the source has loaded, which would mean all of
+    them. Tags and Notes are editable and written straight back.
+
+    Each loaded row gets a slot number: pages append after the last slot and
+    new calls take the slot before the first, so ``_slots`` finds the row of
+    a call id in O(1) however rows have shifted.
+    """
+    EDITABLE = ("tags", "notes")
+
+    def __init__(self, logbook, parent=None):
+        super().__init__(parent); self.logbook = logbook
+        self.order = ("start", True); self.filters = {}
+        self.rows = []; self.more = False; self._slots = {}; self._first = 0
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self.rows = []; self.more = True; self._slots = {}; self._first = 0
+        self.endResetModel()
+
+    def set_filters(self, **filters):
+        self.filters = filters; self.reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LOGBOOK_HEADER)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal: return LOGBOOK_HEADER[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more
+
+    def fetchMore(self, parent=QModelIndex()):
+        page = self.logbook.rows(*self.order, offset=len(self.rows), limit=LOGBOOK_PAGE_SIZE, **self.filters).fetchall()
+        self.more = len(page) == LOGBOOK_PAGE_SIZE
+        if not page: return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        for slot, row in enumerate(page, start=self._first + len(self.rows)): self._slots[row[0]] = slot
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole): return None
+        value = self.rows[index.row()][index.column() + 1]
+        if LOGBOOK_COLUMNS[index.column()] == "duration": return format_duration(value)
+        return "" if value is None else str(value)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and LOGBOOK_COLUMNS[index.column()] in self.EDITABLE: flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        column = LOGBOOK_COLUMNS[index.column()]
+        if role != Qt.EditRole or column not in self.EDITABLE: return False
+        row = self.rows[index.row()]
+        self.logbook.set_field(row[0], column, value)
+        self.rows[index.row()] = row[:index.column() + 1] + (value,) + row[index.column() + 2:]
+        self.dataChanged.emit(index, index)
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.order = (LOGBOOK_COLUMNS[column], order == Qt.DescendingOrder); self.reload()
+
+    def call_added(self, row_id):
+        """Show a freshly inserted call without reloading when it lands on top of the current order."""
+        if not self.logbook.matches(row_id, **self.filters): return
+        if self.order != ("start", True): self.reload(); return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._first -= 1; self._slots[row_id] = self._first
+        self.rows.insert(0, self.logbook.row(row_id))
+        self.endInsertRows()
+
+    def call_updated(self, row_id):
+        slot = self._slots.get(row_id)
+        if slot is None: return
+        i = slot - self._first
+        self.rows[i] = self.logbook.row(row_id)
+        self.dataChanged.emit(self.index(i, 0), self.index(i, self.columnCount() - 1))
+
+
+class RecordingListModel(QAbstractListModel):
+    """Catalogued recordings, newest first, fetched a page at a time as the view scrolls."""
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent); self.catalog = catalog
+        self.dirs = []; self.rows = []; self.paths = set(); self.total = 0
+
+    def reload(self, dirs):
+        self.beginResetModel()
+        self.dirs = [d for d in dirs if d]; self.rows = []; self.paths = set()
+        self.total = self.catalog.count(self.dirs) if self.dirs else 0
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.rows) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        page = self.catalog.page(self.dirs, len(self.rows))
+        if not page: self.total = len(self.rows); return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page); self.paths.update(row['path'] for row in page)
+        self.endInsertRows()
+
+    def recording_added(self, path):
+        """Show a freshly catalogued recording on top, keeping scroll position, selection and loaded pages."""
+        row = self.catalog.get(path)
+        if row is None or row['path'] in self.paths: return
+        if row.pop('dir') not in {os.path.abspath(d) for d in self.dirs}: return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, row); self.paths.add(row['path']); self.total += 1
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            parts = [row['start'] or "", f"P{row['channel']}" if row['channel'] else "",
+                     f"TG {row['tg']}" if row['tg'] else "", f"ID {row['radio_id']}" if row['radio_id'] else "",
+                     f"{row['duration']:.1f} s" if row['duration'] is not None else "",
+                     f"RMS {row['rms']:.3f}" if row['rms'] is not None else "", os.path.basename(row['path'])]
+            return "  ".join(p for p in parts if p)
+        if role in (Qt.UserRole, Qt.ToolTipRole): return row['path']
+        return None
+
+
+class RefreshScheduler(QObject):
+    """Applies pending display updates once per frame.
+
+    Event handlers record label text and styles with ``set_text``/``set_style``
+    and mark named jobs dirty with ``mark``; ``every`` registers jobs that poll
+    on every frame. On each tick the jobs run once, then each label is written
+    at most once and only if its text or style actually changed, so bursts of
+    decoder events or packets cost one repaint per widget per frame.
+    """
+
+    def __init__(self, fps=REFRESH_FPS, parent=None):
+        super().__init__(parent)
+        self._texts = {}; self._styles = {}; self._jobs = {}; self._frame_jobs = []
+        self.timer = QTimer(self); self.timer.timeout.connect(self.tick)
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        self.timer.setInterval(max(1, round(1000 / max(1, fps))))
+
+    def start(self): self.timer.start()
+
+    def stop(self): self.timer.stop()
+
+    def set_text(self, label, text): self._texts[label] = text
+
+    def set_style(self, label, style): self._styles[label] = style
+
+    def mark(self, name, job):
+        """Run ``job`` on the next frame; marking the same name again replaces it."""
+        self._jobs[name] = job
+
+    def every(self, job):
+        self._frame_jobs.append(job)
+
+    def flush(self, name):
+        """Run the pending job ``name`` now, e.g. before state it renders is read back."""
+        job = self._jobs.pop(name, None)
+        if job: job()
+
+    def tick(self):
+        for job in self._frame_jobs:
+            job()
+        jobs, self._jobs = self._jobs, {}
+        for job in jobs.values():
+            job()
+        texts, self._texts = self._texts, {}
+        for label, text in texts.items():
+            if label.text() != text: label.setText(text)
+        styles, self._styles = self._styles, {}
+        for label, style in styles.items():
+            if label.styleSheet() != style: label.setStyleSheet(style)
+
 
 class DSDApp(QMainWindow):
+    # raised from the recorder's writer thread / the bulk import thread
+    recording_cataloged = pyqtSignal(str)
+    recordings_imported = pyqtSignal(int)
+
     def map_loading_finished(self):
         """Called when the map page has finished loading."""
         print("Map has finished loading.")
@@ -340,22 +555,39 @@ class DSDApp(QMainWindow):
         self.udp_listener_threads = []
         self.udp_listeners = []
         # track state per channel (1 & 2)
-        self.is_in_transmission = [False, False]; self.alerts = []; self.recording_dir = ""
-        self.is_recording = {1: False, 2: False}; self.wav_files = {1: None, 2: None}; self.is_resetting = False
-        self.transmission_log = {}
-        self.last_logged_id = [None, None]
-        self.output_stream = None; self.output_streams = {}; self.volume = 1.0
-# audio device selectors are created later; define placeholders so
-# early audio initialisation does not crash if they are accessed
+        self.alerts = []; self.recording_dir = ""; self.is_resetting = False
+        # Qt-free call tracking, recording and audio routing (see dsd_core)
+        self.call_tracker = CallTracker(self)
+        self.recording_catalog = RecordingCatalog()
+        self.logbook = Logbook()
+        # (radio ID, port) -> logbook row id of each call still on air
+        self.open_log_rows = {}
+        self.recorder = WavRecorder(catalog=self.recording_catalog, on_cataloged=self.recording_cataloged.emit)
+        self.recording_cataloged.connect(lambda path: self.recording_model.recording_added(path))
+        # files other programs (dsd-fme -P) drop into the recording directories are catalogued once they settle
+        self.recording_watcher = QFileSystemWatcher()
+        self.recording_scan_timer = QTimer(self); self.recording_scan_timer.setSingleShot(True)
+        self.recording_scan_timer.setInterval(int(RECORDING_SETTLE_SECONDS * 1000) + 1000)
+        self.recording_scan_timer.timeout.connect(self.scan_recordings)
+        self.recording_watcher.directoryChanged.connect(lambda path: self.recording_scan_timer.start())
+        self.recordings_imported.connect(self.on_recordings_imported)
+        self.audio_router = AudioRouter(self.recorder)
+        self.dsp = DspWorker(self.audio_router, monitor=True)
+        self.monitor_chunks = {ch: np.zeros(monitor.capacity, dtype=AUDIO_DTYPE) for ch, monitor in self.dsp.monitors.items()}
+        self.dsp.start()
+        # one console history per port, shared by the configuration and dashboard panes
+        self.terminal_models = [TerminalLogModel(TerminalLog()), TerminalLogModel(TerminalLog())]
+        self.terminal_pending = [[], []]
+        self.mini_log_calls = deque(maxlen=10)
+        # every label, plot and pane below is repainted from this frame clock
+        self.refresh = RefreshScheduler(parent=self)
+        self.refresh.every(self.drain_monitors)
         self.device_combo1 = None
         # audio device selectors are created later; define placeholders so
         # early audio initialisation does not crash if they are accessed
         self.current_tile = 'CartoDB dark_matter'; self.manual_markers = []
         self.geojson_layers = []
-        self.filter_states = {}
         self.aliases = {'tg': {}, 'id': {}}
-        self.current_tg = [None, None]; self.current_id = [None, None]; self.current_cc = [None, None]
-        self.fs_watcher = QFileSystemWatcher(); self.fs_watcher.directoryChanged.connect(self.update_recording_list)
         self.lrrp_watcher = QFileSystemWatcher()
         self.lrrp_watcher.fileChanged.connect(self.update_map_from_lrrp)
 
@@ -368,6 +600,8 @@ class DSDApp(QMainWindow):
         self.setGeometry(100, 100, 1600, 950)
 
         self.widgets = {}; self.inverse_widgets = {}
+        # combos saved by their item data (device indexes) instead of their text
+        self.device_combos = set()
         # live analysis panels for configuration and dashboard (per channel)
         self.live_labels_conf = [{}, {}]; self.live_labels_dash = [{}, {}]
 
@@ -385,7 +619,9 @@ class DSDApp(QMainWindow):
             self._init_ui()
             self.audio_lab_window = AudioProcessingWindow(self)
             self._load_app_config()
+            self.publish_filter_params()
             self.load_aliases()
+            self.refresh.start()
         else:
             QTimer.singleShot(100, self.close)
 
@@ -417,7 +653,8 @@ class DSDApp(QMainWindow):
         style = theme["stylesheet"]()
         if theme_name not in ("Default (Kameleon Dark)", "Oceanic (Deep Blue)"):
             style += " QGroupBox{border-width:2px;}"
-        app.setStyleSheet(style)
+        # terminal panes are list views but should look like the old text consoles
+        app.setStyleSheet(style.replace("QPlainTextEdit{", "QPlainTextEdit,TerminalView{"))
 
         pg.setConfigOption('background', theme["pg_background"])
         pg.setConfigOption('foreground', theme["pg_foreground"])
@@ -581,8 +818,10 @@ class DSDApp(QMainWindow):
             elif key in self.widgets:
                 widget = self.widgets[key]
                 try:
-                    if isinstance(widget, QCheckBox): widget.setChecked(value)
+                    if isinstance(widget, (QCheckBox, QRadioButton)): widget.setChecked(value)
                     elif isinstance(widget, QLineEdit): widget.setText(value)
+                    elif isinstance(widget, QComboBox) and key in self.device_combos:
+                        self._select_device(widget, value, ui_settings.get(f'{key}_index'))
                     elif isinstance(widget, QComboBox): widget.setCurrentText(value)
                     elif isinstance(widget, QSpinBox): widget.setValue(int(value))
                     elif isinstance(widget, QSlider): widget.setValue(int(value))
@@ -597,19 +836,39 @@ class DSDApp(QMainWindow):
             self.recorder_dir_edit1.setText(ui_settings.get('recorder_dir1', ''))
         if hasattr(self, 'recorder_dir_edit2'):
             self.recorder_dir_edit2.setText(ui_settings.get('recorder_dir2', ''))
+        if hasattr(self, 'recording_model'): self.update_recording_list()
         if hasattr(self, 'volume_slider'): self.volume_slider.setValue(ui_settings.get('volume_slider', 100))
 
 
-    def _save_app_config(self):
-        ui_settings = {}
+    @staticmethod
+    def _select_device(combo, name, index=None):
+        """Select a saved audio device by name, or by its saved index when no device has that name."""
+        if isinstance(name, int): name, index = None, name
+        name = name.removesuffix(" (Default)") if isinstance(name, str) else None
+        row = next((i for i in range(combo.count()) if name and combo.itemData(i) is not None
+                    and combo.itemText(i).removesuffix(" (Default)") == name), -1)
+        if row < 0 and isinstance(index, int): row = combo.findData(index)
+        if row >= 0: combo.setCurrentIndex(row)
+
+    def _widget_values(self):
+        values = {}
         for key, widget in self.widgets.items():
             try:
-                if isinstance(widget, QCheckBox): ui_settings[key] = widget.isChecked()
-                elif isinstance(widget, QLineEdit): ui_settings[key] = widget.text()
-                elif isinstance(widget, QComboBox): ui_settings[key] = widget.currentText()
-                elif isinstance(widget, QSpinBox): ui_settings[key] = widget.value()
-                elif isinstance(widget, QSlider): ui_settings[key] = widget.value()
+                if isinstance(widget, (QCheckBox, QRadioButton)): values[key] = widget.isChecked()
+                elif isinstance(widget, QLineEdit): values[key] = widget.text()
+                elif isinstance(widget, QComboBox) and key in self.device_combos:
+                    # the name identifies the device across reconnects and reboots; the index is only a fallback
+                    index = widget.currentData()
+                    values[key] = widget.currentText().removesuffix(" (Default)") if index is not None else ""
+                    values[f'{key}_index'] = index
+                elif isinstance(widget, QComboBox): values[key] = widget.currentText()
+                elif isinstance(widget, QSpinBox): values[key] = widget.value()
+                elif isinstance(widget, QSlider): values[key] = widget.value()
             except Exception: pass
+        return values
+
+    def _save_app_config(self):
+        ui_settings = self._widget_values()
 
         if hasattr(self, 'eq_sliders'):
             for port, sliders in self.eq_sliders.items():
@@ -768,19 +1027,44 @@ class DSDApp(QMainWindow):
         self.histogram.setImageItem(self.imv.imageItem)
         spec_layout.addWidget(self.imv)
 
+        # every port keeps its history; the source combo only picks what is drawn
+        self.spectrograms = SpectrogramBank()
+        self.spec_composite = None
+
         self.spec_source_combo = QComboBox()
-        self.spec_source_combo.addItems(["Port 1", "Port 2"])
-        self.spec_source_combo.currentIndexChanged.connect(lambda _ : self.spec_data.fill(MIN_DB))
+        self.spec_source_combo.addItems(["Port 1", "Port 2", "Both (side by side)"])
+        self.spec_source_combo.currentIndexChanged.connect(self.switch_spectrogram_source)
         spec_layout.addWidget(QLabel("Spectrogram Source:"))
         spec_layout.addWidget(self.spec_source_combo)
+        spec_options = QHBoxLayout()
+        self.spec_fft_combo = self._add_widget('spec_fft_size', QComboBox()); self.spec_fft_combo.addItems(["256", "512", "1024", "2048"])
+        self.spec_fft_combo.setCurrentText(str(SPEC_FFT_SIZE))
+        self.spec_overlap_combo = self._add_widget('spec_overlap', QComboBox()); self.spec_overlap_combo.addItems(["0%", "50%", "75%"])
+        self.spec_fft_combo.currentTextChanged.connect(self.configure_spectrogram)
+        self.spec_overlap_combo.currentTextChanged.connect(self.configure_spectrogram)
+        spec_options.addWidget(QLabel("FFT:")); spec_options.addWidget(self.spec_fft_combo)
+        spec_options.addWidget(QLabel("Overlap:")); spec_options.addWidget(self.spec_overlap_combo)
+        spec_layout.addLayout(spec_options)
 
         visuals_splitter.addWidget(spec_container)
 
+        scope_container = QWidget(); scope_layout = QVBoxLayout(scope_container); scope_layout.setContentsMargins(0,0,0,0)
+        self.scope = Scope()
         self.scope_widget = pg.PlotWidget(title="")
         self.scope_widget.getAxis('left').setWidth(50)
+        self.scope_widget.setClipToView(True); self.scope_widget.setDownsampling(auto=True, mode='peak')
         self.scope_curve = self.scope_widget.plot()
         self.scope_widget.setYRange(-32768, 32767)
-        visuals_splitter.addWidget(self.scope_widget)
+        self.scope_widget.setXRange(-SCOPE_SECONDS, 0, padding=0)
+        scope_layout.addWidget(self.scope_widget)
+        scope_options = QHBoxLayout()
+        self.scope_window_combo = self._add_widget('scope_window', QComboBox()); self.scope_window_combo.addItems(["0.5 s", "1 s", "2 s", "5 s", "10 s"])
+        self.scope_window_combo.setCurrentText(f"{SCOPE_SECONDS:g} s")
+        self.scope_window_combo.currentTextChanged.connect(self.configure_scope)
+        scope_options.addWidget(QLabel("Scope window:")); scope_options.addWidget(self.scope_window_combo); scope_options.addStretch()
+        scope_layout.addLayout(scope_options)
+        visuals_splitter.addWidget(scope_container)
+        self.imv.setImage(self.spectrogram_image(), autoLevels=False, levels=(MIN_DB, MAX_DB))
 
         visuals_layout.addWidget(visuals_splitter)
         top_bottom_splitter.addWidget(visuals_widget)
@@ -803,14 +1087,14 @@ class DSDApp(QMainWindow):
         controls_and_stats_layout.addWidget(self.live_analysis_splitter_dash)
         audio_controls_group_dash = self._create_audio_controls_group(is_dashboard=True)
         controls_and_stats_layout.addWidget(audio_controls_group_dash)
+        controls_and_stats_layout.addWidget(self._create_udp_stats_group())
         controls_and_stats_layout.addStretch()
         bottom_area.addWidget(controls_and_stats_widget)
 
-        self.terminal_outputs_dash = [QPlainTextEdit(), QPlainTextEdit()]
+        self.terminal_outputs_dash = [TerminalView(model) for model in self.terminal_models]
         self.dashboard_dash_groups = []
         self.dashboard_terminal_splitter = QSplitter(Qt.Horizontal)
         for i, term in enumerate(self.terminal_outputs_dash, start=1):
-            term.setReadOnly(True)
             group = QGroupBox(f"Dashboard {i}")
             v = QVBoxLayout(group)
             v.addWidget(term)
@@ -830,8 +1114,6 @@ class DSDApp(QMainWindow):
         bottom_area.setSizes([500, 800])
         self.dashboard_terminal_splitter.setSizes([800, 0])
 
-        self.spec_data = np.full((SPEC_WIDTH, CHUNK_SAMPLES // 2), MIN_DB, dtype=np.float32)
-
         return widget
 
     def _create_audio_controls_group(self, is_dashboard=False):
@@ -844,6 +1126,8 @@ class DSDApp(QMainWindow):
         self.device_combo2 = QComboBox(); self.populate_audio_devices(self.device_combo2)
         self.device_combo2_label = QLabel("Output Port 2:")
         self.device_combo2.hide(); self.device_combo2_label.hide()
+        self._add_widget('output_device1', self.device_combo1, {'device': True})
+        self._add_widget('output_device2', self.device_combo2, {'device': True})
 
         self.volume_slider = QSlider(Qt.Horizontal); self.volume_slider.setRange(0, 150)
         self.mute_check1 = QCheckBox("Mute")
@@ -877,9 +1161,15 @@ class DSDApp(QMainWindow):
             self.btn_start_dash = QPushButton("START"); self.btn_start_dash.clicked.connect(self.start_process)
             self.btn_stop_dash = QPushButton("STOP"); self.btn_stop_dash.setEnabled(False); self.btn_stop_dash.clicked.connect(self.stop_process)
             main_layout.addWidget(self.btn_start_dash, 7, 1); main_layout.addWidget(self.btn_stop_dash, 7, 2)
+
+            self.refresh_fps_spin = self._add_widget('refresh_fps', QSpinBox(), {'range': (5, 60), 'suffix': " fps", 'value': REFRESH_FPS})
+            self.refresh_fps_spin.valueChanged.connect(self.refresh.set_fps)
+            main_layout.addWidget(QLabel("Display refresh:"), 8, 0); main_layout.addWidget(self.refresh_fps_spin, 8, 1, 1, 2)
         self.device_combo1.currentIndexChanged.connect(self.restart_audio_streams)
         self.device_combo2.currentIndexChanged.connect(self.restart_audio_streams)
         self.volume_slider.valueChanged.connect(self.set_volume)
+        self.mute_check1.toggled.connect(lambda state: self.set_mute(1, state))
+        self.mute_check2.toggled.connect(lambda state: self.set_mute(2, state))
         return group
 
     def open_audio_lab(self):
@@ -1082,6 +1372,13 @@ class DSDApp(QMainWindow):
         if not self.is_resetting:
             self._save_app_config()
         self.stop_process()
+        self.refresh.stop()
+        self.dsp.stop()
+        self.recorder.close()
+        self.recording_catalog.close()
+        self.logbook.close()
+        for model in self.terminal_models:
+            model.log.close()
 
         if os.path.exists(MAP_FILE):
             try:
@@ -1131,7 +1428,7 @@ class DSDApp(QMainWindow):
 
         self.audio_input_group = QGroupBox("Audio Input Options")
         l_audio = QGridLayout(self.audio_input_group)
-        self._add_widget("audio_in_dev", QComboBox())
+        self._add_widget("audio_in_dev", QComboBox(), {'device': True})
         self.audio_refresh_btn = QPushButton("Refresh List")
         self.audio_refresh_btn.clicked.connect(self._populate_audio_input_devices)
         self._populate_audio_input_devices()
@@ -1228,14 +1525,7 @@ class DSDApp(QMainWindow):
         tab = QWidget(); scroll = QScrollArea(); scroll.setWidgetResizable(True); layout = QVBoxLayout(tab); layout.addWidget(scroll); container = QWidget(); scroll.setWidget(container); grid = QGridLayout(container)
         self.decoder_mode_group = QButtonGroup()
         g1 = QGroupBox("Decoder Mode (-f...)"); l1 = QVBoxLayout(g1)
-        modes = {
-            "-fa":"Auto", "-fA":"Analog", "-ft":"Trunk P25/DMR", "-fs":"DMR Simplex",
-            "-f1":"P25 P1", "-f2":"P25 P2", "-fd":"D-STAR", "-fx":"X2-TDMA",
-            "-fy":"YSF", "-fz":"M17", "-fU": "M17 UDP Frame", "-fi":"NXDN48", "-fn":"NXDN96",
-            "-fp":"ProVoice", "-fe":"EDACS EA", "-fE":"EDACS EA w/ESK", "-fh": "EDACS Std/PV", "-fH": "EDACS Std/PV w/ESK",
-            "-fm": "dPMR", "-fZ": "M17 Stream Encoder", "-fP": "M17 Packet Encoder", "-fB": "M17 BERT Encoder"
-        }
-        for flag, name in modes.items():
+        for flag, name in DECODER_MODES.items():
             rb = QRadioButton(name); self._add_widget(flag, rb); self.decoder_mode_group.addButton(rb); l1.addWidget(rb)
 
         g2 = QGroupBox("Decoder Options"); l2 = QGridLayout(g2)
@@ -1257,8 +1547,7 @@ class DSDApp(QMainWindow):
     def _create_advanced_tab(self):
         tab = QWidget(); layout = QGridLayout(tab)
         g1 = QGroupBox("Modulation (-m...) & Display"); l1 = QVBoxLayout(g1); self.mod_group = QButtonGroup()
-        mods = {"-ma":"Auto","-mc":"C4FM (default)","-mg":"GFSK","-mq":"QPSK","-m2":"P25p2 QPSK"}
-        for flag, name in mods.items():
+        for flag, name in MODULATIONS.items():
             rb = QRadioButton(name); self._add_widget(flag, rb); self.mod_group.addButton(rb); l1.addWidget(rb)
         l1.addSpacing(10)
         l1.addWidget(self._add_widget("-N", QCheckBox("Use NCurses Emulation [-N]")))
@@ -1351,21 +1640,26 @@ class DSDApp(QMainWindow):
         filter_group = QGroupBox("Filtering and Search")
         filter_layout = QGridLayout(filter_group)
 
-        self.logbook_search_input = QLineEdit(); self.logbook_search_input.setPlaceholderText("Search visible entries...")
+        self.logbook_search_input = QLineEdit(); self.logbook_search_input.setPlaceholderText("Search all calls...")
         self.logbook_start_date = QDateEdit(QDate.currentDate().addMonths(-1)); self.logbook_start_date.setCalendarPopup(True)
         self.logbook_end_date = QDateEdit(QDate.currentDate()); self.logbook_end_date.setCalendarPopup(True)
         self.logbook_filter_btn = QPushButton("Filter"); self.logbook_filter_btn.clicked.connect(self.filter_logbook)
+        # Filter as the user types or picks dates, once input has paused for SEARCH_DEBOUNCE_MS
+        self.logbook_filter_timer = QTimer(self); self.logbook_filter_timer.setSingleShot(True); self.logbook_filter_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.logbook_filter_timer.timeout.connect(self.filter_logbook)
+        for signal in (self.logbook_search_input.textChanged, self.logbook_start_date.dateChanged, self.logbook_end_date.dateChanged):
+            signal.connect(lambda _: self.logbook_filter_timer.start())
 
         filter_layout.addWidget(QLabel("Search:"), 0, 0); filter_layout.addWidget(self.logbook_search_input, 0, 1)
         filter_layout.addWidget(QLabel("From:"), 1, 0); filter_layout.addWidget(self.logbook_start_date, 1, 1)
         filter_layout.addWidget(QLabel("To:"), 2, 0); filter_layout.addWidget(self.logbook_end_date, 2, 1)
         filter_layout.addWidget(self.logbook_filter_btn, 3, 0, 1, 2)
 
-        self.logbook_table = QTableWidget()
-        self.logbook_table.setColumnCount(9)
-        self.logbook_table.setHorizontalHeaderLabels(["Start Time","End Time","Duration","Port","Talkgroup","Radio ID","Color Code", "Tags", "Notes"])
+        self.logbook_model = LogbookModel(self.logbook, self)
+        self.logbook_table = QTableView(); self.logbook_table.setModel(self.logbook_model)
         self.logbook_table.setEditTriggers(QAbstractItemView.DoubleClicked)
         self.logbook_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.logbook_table.horizontalHeader().setSortIndicator(0, Qt.DescendingOrder)
         self.logbook_table.setSortingEnabled(True)
         self.logbook_table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.logbook_table.verticalHeader().setVisible(False)
@@ -1463,8 +1757,18 @@ class DSDApp(QMainWindow):
         self.recorder_dir_edits[1] = self.recorder_dir_edit1; self.recorder_dir_edits[2] = self.recorder_dir_edit2
         self.recorder_browse_btn1 = QPushButton("Browse..."); self.recorder_browse_btn1.clicked.connect(lambda: self.browse_for_recording_dir(1))
         self.recorder_browse_btn2 = QPushButton("Browse..."); self.recorder_browse_btn2.clicked.connect(lambda: self.browse_for_recording_dir(2)); self.recorder_dir_edit2.hide(); self.recorder_browse_btn2.hide()
-        self.recording_list = QListWidget(); self.recording_list.itemDoubleClicked.connect(self.play_recording)
+        self.recording_model = RecordingListModel(self.recording_catalog, self)
+        self.recording_list = QListView(); self.recording_list.setModel(self.recording_model); self.recording_list.setUniformItemSizes(True)
+        self.recording_list.doubleClicked.connect(self.play_recording)
+        self.recording_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        import_btn = QPushButton("Import Existing Files"); import_btn.clicked.connect(self.import_recordings)
         play_btn = QPushButton("Play Selected Recording"); play_btn.clicked.connect(self.play_recording)
+        self.recorder_layout_combo = self._add_widget('recorder_layout', QComboBox()); self.recorder_layout_combo.addItems(RECORD_LAYOUTS.values())
+        self.recorder_layout_combo.currentTextChanged.connect(self.recorder.set_layout)
+        export_btn = QPushButton("Export Selected as Stereo..."); export_btn.clicked.connect(self.export_stereo_recording)
+        self.recorder_codec_combo = self._add_widget('recorder_codec', QComboBox()); self.recorder_codec_combo.addItems([entry[0] for entry in available_codecs().values()])
+        self.recorder_codec_combo.currentTextChanged.connect(self.recorder.set_codec)
+        if len(available_codecs()) == 1: self.recorder_codec_combo.setToolTip("Install the soundfile package for FLAC and Opus recording.")
         self.per_call_check = self._add_widget("-P", QCheckBox("Enable Per-Call WAV Saving (-P)"))
         self.per_call_dir_edit = self._add_widget("-7", QLineEdit())
         self.per_call_dir_browse_btn = QPushButton("Browse...")
@@ -1475,6 +1779,8 @@ class DSDApp(QMainWindow):
         layout.addWidget(self.recording_list, 3, 0, 1, 3); layout.addWidget(play_btn, 4, 0, 1, 3)
         layout.addWidget(self.per_call_check, 4, 0, 1, 3)
         layout.addWidget(QLabel("Per-Call Dir [-7]:"), 5, 0); layout.addWidget(self.per_call_dir_edit, 5, 1); layout.addWidget(self.per_call_dir_browse_btn, 5, 2)
+        layout.addWidget(QLabel("Layout:"), 6, 0); layout.addWidget(self.recorder_layout_combo, 6, 1); layout.addWidget(export_btn, 6, 2)
+        layout.addWidget(QLabel("Format:"), 7, 0); layout.addWidget(self.recorder_codec_combo, 7, 1); layout.addWidget(import_btn, 7, 2)
         return widget
 
     def _create_live_analysis_group(self, labels_dict):
@@ -1487,13 +1793,31 @@ class DSDApp(QMainWindow):
         labels_dict['recording'].setText("INACTIVE"); labels_dict['recording'].setStyleSheet("color: gray;"); layout.setColumnStretch(1, 1); layout.setColumnStretch(3, 1)
         return group
 
+    def _create_udp_stats_group(self):
+        group = QGroupBox("UDP Audio"); layout = QGridLayout(group)
+        self.udp_stats_labels = [{}, {}]; self.udp_stats_port2 = []
+        columns = ["packets", "bytes", "pps", "gaps", "late", "target", "underruns", "overruns"]
+        for col, name in enumerate(["Packets", "Bytes", "Pkt/s", "Gaps", "Late", "Jitter ms", "Under", "Over"], start=1):
+            layout.addWidget(QLabel(name), 0, col)
+        for row, labels in enumerate(self.udp_stats_labels, start=1):
+            port_label = QLabel(f"Port {row}:"); layout.addWidget(port_label, row, 0)
+            for col, key in enumerate(columns, start=1):
+                labels[key] = QLabel("0"); layout.addWidget(labels[key], row, col)
+            if row == 2: self.udp_stats_port2 = [port_label] + list(labels.values())
+        for w in self.udp_stats_port2: w.setVisible(False)
+        self.rec_stats_label = QLabel("Recorder: idle")
+        layout.addWidget(self.rec_stats_label, 3, 0, 1, len(columns) + 1)
+        self.udp_stats_timer = QTimer(self); self.udp_stats_timer.setInterval(250)
+        self.udp_stats_timer.timeout.connect(self.update_udp_stats)
+        self.udp_stats_snapshot = {}
+        return group
+
     def _create_terminal_group(self):
         outer_group = QGroupBox("Terminal Log"); layout = QGridLayout(outer_group)
         splitter = QSplitter(Qt.Horizontal)
-        self.terminal_outputs_conf = [QPlainTextEdit(), QPlainTextEdit()]
+        self.terminal_outputs_conf = [TerminalView(model) for model in self.terminal_models]
         self.terminal_conf_groups = []
         for i, term in enumerate(self.terminal_outputs_conf, start=1):
-            term.setReadOnly(True)
             port_group = QGroupBox(f"Port {i}")
             v = QVBoxLayout(port_group)
             v.addWidget(term)
@@ -1517,18 +1841,27 @@ class DSDApp(QMainWindow):
 
         # Optional debug checkbox to toggle additional log output
         self.debug_checkbox = self._add_widget('debug_check', QCheckBox("Debug"))
-        layout.addWidget(self.debug_checkbox, 3, 0, 1, 2)
+        layout.addWidget(self.debug_checkbox, 3, 0)
+        self.log_rate_label = QLabel("Log rate: --")
+        layout.addWidget(self.log_rate_label, 3, 1)
+        # lines kept in memory per port; older lines are spilled to a temp file
+        line_cap = self._add_widget('terminal_line_cap', QSpinBox(), {'range': (500, 1000000), 'value': TERMINAL_LINE_CAP, 'suffix': " lines"})
+        line_cap.setSingleStep(1000)
+        line_cap.valueChanged.connect(lambda value: [model.log.set_line_cap(value) for model in self.terminal_models])
+        layout.addWidget(QLabel("Terminal memory:"), 4, 0); layout.addWidget(line_cap, 4, 1)
+        self.log_rate_timer = QTimer(self); self.log_rate_timer.setInterval(1000)
+        self.log_rate_timer.timeout.connect(self.update_log_rate)
+        self.log_rate_snapshot = {}
 
         return outer_group
 
     def save_terminal_log(self, port):
-        if port - 1 < len(self.terminal_outputs_conf):
-            text = self.terminal_outputs_conf[port - 1].toPlainText()
+        if port - 1 < len(self.terminal_models):
             path, _ = QFileDialog.getSaveFileName(self, f"Save Port {port} Log", f"port{port}_log.txt", "Text Files (*.txt)")
             if path:
                 try:
-                    with open(path, 'w', encoding='utf-8') as f:
-                        f.write(text)
+                    self.refresh.flush('terminal')
+                    self.terminal_models[port - 1].log.save(path)
                 except Exception as e:
                     QMessageBox.warning(self, "Save Log", f"Could not save log: {e}")
 
@@ -1559,6 +1892,9 @@ class DSDApp(QMainWindow):
                 self.live_analysis_splitter_dash.setSizes([1, 1])
             else:
                 self.live_analysis_splitter_dash.setSizes([1, 0])
+        if hasattr(self, 'udp_stats_port2'):
+            for w in self.udp_stats_port2:
+                w.setVisible(enabled)
         if hasattr(self, 'key_fields_port2'):
             for w in self.key_fields_port2:
                 w.setVisible(enabled)
@@ -1573,6 +1909,20 @@ class DSDApp(QMainWindow):
         if hasattr(self, 'restart_audio_streams'):
             self.restart_audio_streams()
 
+    def append_terminal(self, idx, text):
+        """Queue ``text`` for the console of port ``idx`` (0-based), or of every port when None.
+
+        Pending text is inserted into the models once per display frame.
+        """
+        for i, pending in enumerate(self.terminal_pending):
+            if idx is None or i == idx: pending.append(text)
+        self.refresh.mark('terminal', self.flush_terminal)
+
+    def flush_terminal(self):
+        for model, pending in zip(self.terminal_models, self.terminal_pending):
+            if pending:
+                model.append_text(*pending); pending.clear()
+
     def _add_widget(self, key, widget, properties=None):
         self.widgets[key] = widget
         if isinstance(widget, QRadioButton): self.inverse_widgets[widget] = key
@@ -1581,6 +1931,7 @@ class DSDApp(QMainWindow):
             if 'range' in properties: widget.setRange(*properties['range'])
             if 'suffix' in properties: widget.setSuffix(properties['suffix'])
             if 'value' in properties: widget.setValue(properties['value'])
+            if properties.get('device'): self.device_combos.add(key)
 
         return widget
 
@@ -1594,25 +1945,23 @@ class DSDApp(QMainWindow):
         ports = [UDP_PORT + i for i in range(count)]
         for idx, port in enumerate(ports, start=1):
             thread = QThread()
-            listener = UdpListener(UDP_IP, port, idx)
+            listener = UdpListener(UDP_IP, port, idx, self.dsp.notify)
             listener.moveToThread(thread)
             thread.started.connect(listener.run)
-            listener.data_ready.connect(self.process_audio_data)
+            listener.error.connect(self.on_udp_error)
+            self.dsp.attach(idx, listener.receiver.ring)
             thread.start()
             self.udp_listener_threads.append(thread)
             self.udp_listeners.append(listener)
             # log which UDP port is used for which channel
-            msg = f"Listening on UDP {port} (Port {idx})"
-            if idx - 1 < len(self.terminal_outputs_conf):
-                self.terminal_outputs_conf[idx - 1].appendPlainText(msg)
-            if idx - 1 < len(self.terminal_outputs_dash):
-                self.terminal_outputs_dash[idx - 1].appendPlainText(msg)
+            self.append_terminal(idx - 1, f"Listening on UDP {port} (Port {idx})")
 
     def stop_udp_listeners(self):
         for listener in self.udp_listeners:
             listener.running = False
         for thread in self.udp_listener_threads:
             thread.quit(); thread.wait()
+        self.dsp.detach_all()
         self.udp_listeners.clear(); self.udp_listener_threads.clear()
 
     def build_command(self):
@@ -1620,108 +1969,15 @@ class DSDApp(QMainWindow):
             self.cmd_preview.setText("ERROR: DSD-FME path not set!")
             return []
 
-        in_type = self.widgets["-i_type"].currentText()
-        if in_type == "SDR (beta)":
-            in_type = "rtl"
-        dual = self.widgets.get('dual_tcp') and self.widgets['dual_tcp'].isChecked() and in_type == 'tcp'
-        if dual and not self.dsd_fme_path2:
-            QMessageBox.warning(self, "Dual Mode Disabled", "Second DSD-FME path not set. Only Port 1 will run.")
+        settings = self._widget_values()
+        try:
+            commands = build_commands(settings, self.dsd_fme_path, self.dsd_fme_path2,
+                                      warn=lambda title, text: QMessageBox.warning(self, title, text))
+        except ValueError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return []
+        if self.widgets['dual_tcp'].isChecked() and not settings['dual_tcp']:
             self.widgets['dual_tcp'].setChecked(False)
-            dual = False
-
-        inputs = []
-        if in_type == 'tcp':
-            primary = self.widgets['-i_tcp'].text().strip()
-            inputs.append(primary)
-            if dual:
-                secondary = self.widgets['-i_tcp2'].text().strip()
-                if not secondary:
-                    QMessageBox.warning(self, "Dual TCP Disabled", "Second TCP address is empty. Only one channel will run.")
-                    self.widgets['dual_tcp'].setChecked(False)
-                    dual = False
-                else:
-                    inputs.append(secondary)
-        else:
-            inputs.append(None)
-
-        common_flags = []
-        for flag in ["-s","-g","-V","-w","-6","-c","-C","-G","-U","-d","-r","-n","-u","-L","-Q","-M","-S","-X","-D","-v","-7","-I","-B","-t"]:
-            widget = self.widgets.get(flag)
-            if widget and hasattr(widget, 'text') and widget.text():
-                common_flags.extend([flag, widget.text()])
-            elif widget and isinstance(widget, QCheckBox) and widget.isChecked():
-                common_flags.append(flag)
-
-        for flag in ["-l","-xx","-xr","-xd","-xz","-N","-Z","-4","-0","-3","-F","-T","-Y","-p","-E","-e","-q","-z","-y","-8","-P","-a","-W"]:
-            if self.widgets.get(flag) and self.widgets[flag].isChecked():
-                common_flags.append(flag)
-
-        for btn, flag in self.inverse_widgets.items():
-            if flag and btn.isChecked():
-                common_flags.append(flag)
-
-        per_port_flags = [[], []]
-        for flag in ["-b", "-1", "-H", "-R", "-K", "-k"]:
-            w1 = self.widgets.get(f"{flag}_1")
-            w2 = self.widgets.get(f"{flag}_2")
-            if w1 and hasattr(w1, 'text') and w1.text():
-                per_port_flags[0].extend([flag, w1.text()])
-            if dual:
-                val2 = w2.text() if (w2 and hasattr(w2, 'text') and w2.text()) else (w1.text() if w1 and hasattr(w1, 'text') else '')
-                if val2:
-                    per_port_flags[1].extend([flag, val2])
-
-        commands = []
-        for idx, tcp_addr in enumerate(inputs):
-            binary = self.dsd_fme_path2 if idx == 1 and dual and self.dsd_fme_path2 else self.dsd_fme_path
-            cmd = [binary, "-o", f"udp:{UDP_IP}:{UDP_PORT + idx}"]
-            if in_type == 'tcp':
-                # Each command uses a distinct TCP input and UDP output
-                cmd.extend(["-i", f"tcp:{tcp_addr}" if tcp_addr else "tcp"])
-            elif in_type == 'wav':
-                if self.widgets['-i_wav'].text():
-                    cmd.extend(["-i", self.widgets['-i_wav'].text()])
-            elif in_type == 'm17udp':
-                addr = self.widgets['-i_m17udp'].text()
-                cmd.extend(["-i", f"m17udp:{addr}" if addr else "m17udp"])
-            elif in_type == 'audio':
-                dev_index = self.widgets["audio_in_dev"].currentData()
-                if dev_index is not None:
-                    cmd.extend(["-i", f"pa:{dev_index}"])
-                else:
-                    QMessageBox.critical(self, "Error", "No audio input device selected.")
-                    return []
-            elif in_type == 'rtl':
-                freq_text = self.widgets["rtl_freq"].text().strip()
-                if freq_text:
-                    try:
-                        freq_val = float(freq_text)
-                    except ValueError:
-                        QMessageBox.critical(self, "Error", "Invalid frequency value.")
-                        return []
-                    unit = self.widgets["rtl_unit"].currentText()
-                    freq_map = {"MHz": "M", "KHz": "K", "GHz": "G", "Hz": ""}
-                    params = [
-                        "1",
-                        f"{freq_val}{freq_map.get(unit, '')}",
-                        self.widgets["rtl_gain"].text().strip(),
-                        self.widgets["rtl_ppm"].text().strip(),
-                        self.widgets["rtl_bw"].currentText().strip(),
-                        self.widgets["rtl_sq"].text().strip(),
-                        self.widgets["rtl_vol"].text().strip(),
-                    ]
-                    while params and params[-1] == "":
-                        params.pop()
-                    cmd.extend(["-i", f"rtl:{':'.join(params)}"])
-                else:
-                    cmd.extend(["-i", "rtl:1"])
-            else:
-                cmd.extend(["-i", in_type])
-
-            cmd.extend(common_flags)
-            if idx < len(per_port_flags):
-                cmd.extend(per_port_flags[idx])
-            commands.append(list(filter(None, (str(item).strip() for item in cmd))))
 
         self.cmd_preview.setText("\n".join(subprocess.list2cmdline(c) for c in commands))
         return commands
@@ -1729,14 +1985,11 @@ class DSDApp(QMainWindow):
     def start_process(self):
         if self.processes:
             return
-        self.logbook_table.setRowCount(0)
-        self.mini_logbook_table.setRowCount(0)
-        self.is_in_transmission = [False, False]
-        self.last_logged_id = [None, None]
-        self.current_tg = [None, None]
-        self.current_id = [None, None]
-        self.current_cc = [None, None]
-        self.transmission_log.clear()
+        # give any call still open in the logbook its end before the tracker forgets it
+        self.call_tracker.end_calls()
+        self.mini_log_calls.clear(); self.refresh.mark('mini_log', self.render_mini_log)
+        self.open_log_rows.clear()
+        self.call_tracker.reset()
 
         commands = self.build_command()
         if not commands:
@@ -1751,39 +2004,18 @@ class DSDApp(QMainWindow):
 
         self.restart_audio_streams()
         self.start_udp_listeners(len(commands))
+        for model, pending in zip(self.terminal_models, self.terminal_pending):
+            pending.clear(); model.clear()
         for idx, cmd in enumerate(commands):
-            log_start_msg = f"$ {subprocess.list2cmdline(cmd)}\n\n"
-            if idx < len(self.terminal_outputs_conf):
-                self.terminal_outputs_conf[idx].clear()
-                self.terminal_outputs_conf[idx].appendPlainText(log_start_msg)
-            if idx < len(self.terminal_outputs_dash):
-                self.terminal_outputs_dash[idx].clear()
-                self.terminal_outputs_dash[idx].appendPlainText(log_start_msg)
-        for idx in range(len(commands), len(self.terminal_outputs_conf)):
-            self.terminal_outputs_conf[idx].clear()
-            if idx < len(self.terminal_outputs_dash):
-                self.terminal_outputs_dash[idx].clear()
+            self.append_terminal(idx, f"$ {subprocess.list2cmdline(cmd)}\n\n")
         try:
-            si = subprocess.STARTUPINFO()
-            si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            si.wShowWindow = subprocess.SW_HIDE
             for idx, cmd in enumerate(commands):
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    stdin=subprocess.DEVNULL,
-                    universal_newlines=True,
-                    encoding='utf-8',
-                    errors='ignore',
-                    startupinfo=si,
-                    creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0,
-                )
+                process = spawn_decoder(cmd)
                 self.processes.append(process)
                 thread = QThread()
                 worker = ProcessReader(process, idx)
                 worker.moveToThread(thread)
-                worker.line_read.connect(self.update_terminal_log)
+                worker.lines_read.connect(self.update_terminal_log)
                 thread.started.connect(worker.run)
                 worker.finished.connect(self._on_reader_finished)
                 thread.start()
@@ -1792,33 +2024,19 @@ class DSDApp(QMainWindow):
             self.set_ui_running_state(True)
 
         except Exception as e:
-            error_msg = f"\nERROR: Failed to start process: {e}"
-            for term in self.terminal_outputs_conf:
-                term.appendPlainText(error_msg)
-            for term in self.terminal_outputs_dash:
-                term.appendPlainText(error_msg)
+            self.append_terminal(None, f"\nERROR: Failed to start process: {e}")
             self.set_ui_running_state(False)
 
     def stop_process(self):
-        if any(self.is_recording.values()):
-            self.stop_internal_recording()
+        # calls on air when the decoders stop end now, so their logbook rows get an end time and duration
+        self.call_tracker.end_calls()
+        self.stop_internal_recording()
         self.stop_udp_listeners()
-        for stream in self.output_streams.values():
-            try:
-                stream.stop(); stream.close()
-            except Exception:
-                pass
-        self.output_streams = {}
-        if self.output_stream:
-            self.output_stream.stop(); self.output_stream.close(); self.output_stream = None
+        self.audio_router.close_streams()
 
         if self.processes:
             self.set_ui_running_state(False)
-            stop_msg = "\n--- SENDING STOP SIGNAL ---\n"
-            for term in self.terminal_outputs_conf:
-                term.appendPlainText(stop_msg)
-            for term in self.terminal_outputs_dash:
-                term.appendPlainText(stop_msg)
+            self.append_terminal(None, "\n--- SENDING STOP SIGNAL ---\n")
             for p in self.processes:
                 if p and p.poll() is None:
                     p.terminate()
@@ -1832,17 +2050,13 @@ class DSDApp(QMainWindow):
             self.processes.clear()
             self.reader_workers.clear()
             self.reader_threads.clear()
-            ready_msg = "\n--- READY ---\n"
-            for term in self.terminal_outputs_conf:
-                term.appendPlainText(ready_msg)
-            for term in self.terminal_outputs_dash:
-                term.appendPlainText(ready_msg)
+            self.append_terminal(None, "\n--- READY ---\n")
 
     @pyqtSlot()
     def _on_reader_finished(self):
         if not self.processes or any(p.poll() is None for p in self.processes):
             return
-        self.end_all_transmissions()
+        self.call_tracker.end_calls()
         self.set_ui_running_state(False)
         for thread in self.reader_threads:
             thread.quit()
@@ -1851,11 +2065,7 @@ class DSDApp(QMainWindow):
         self.reader_workers.clear()
         self.reader_threads.clear()
 
-        ready_msg = "\n--- READY ---\n"
-        for term in self.terminal_outputs_conf:
-            term.appendPlainText(ready_msg)
-        for term in self.terminal_outputs_dash:
-            term.appendPlainText(ready_msg)
+        self.append_terminal(None, "\n--- READY ---\n")
 
 
     def set_ui_running_state(self, is_running):
@@ -1863,329 +2073,237 @@ class DSDApp(QMainWindow):
         self.btn_stop.setEnabled(is_running)
         self.btn_start_dash.setEnabled(not is_running)
         self.btn_stop_dash.setEnabled(is_running)
+        if is_running:
+            self.log_rate_snapshot = {}; self.udp_stats_snapshot = {}
+            self.log_rate_timer.start(); self.udp_stats_timer.start()
+        else:
+            self.log_rate_timer.stop(); self.udp_stats_timer.stop()
+            self.update_udp_stats()
 
 
-    def update_terminal_log(self, idx, text):
+    def update_terminal_log(self, idx, lines, events):
         try:
-            self.parse_and_display_log(idx, text)
-            targets = []
-            if idx < len(self.terminal_outputs_conf):
-                targets.append(self.terminal_outputs_conf[idx])
-            if idx < len(self.terminal_outputs_dash):
-                targets.append(self.terminal_outputs_dash[idx])
-            for term in targets:
-                term.moveCursor(QTextCursor.End)
-                term.insertPlainText(text)
+            self.handle_decoder_events(events)
+            self.append_terminal(idx, "".join(lines))
         except RuntimeError as e:
             print(f"RuntimeError in update_terminal_log: {e}")
 
-    def parse_and_display_log(self, idx, text):
-        try:
-            panels = []
-            if idx < len(self.live_labels_conf):
-                panels.append(self.live_labels_conf[idx])
-            if idx < len(self.live_labels_dash):
-                panels.append(self.live_labels_dash[idx])
-            channel = idx + 1
-            if "TGT=" in text and "SRC=" in text:
-                self.current_tg[idx] = text.split("TGT=")[1].split(" ")[0].strip()
-                self.current_id[idx] = text.split("SRC=")[1].split(" ")[0].strip()
-                for panel in panels:
-                    panel['tg'].setText(self.aliases['tg'].get(self.current_tg[idx], self.current_tg[idx]))
-                    panel['id'].setText(self.aliases['id'].get(self.current_id[idx], self.current_id[idx]))
-                return
-            if "Sync:" in text:
-                if "Color Code=" in text:
-                    self.current_cc[idx] = text.split("Color Code=")[1].split(" ")[0].strip()
-                    for panel in panels:
-                        panel['cc'].setText(self.current_cc[idx])
-                is_voice = "VC" in text or "VLC" in text
-                timestamp = text[:8] if (len(text) > 8 and text[2] == ':') else None
-                if is_voice:
-                    self.is_in_transmission[idx] = True
-                    for panel in panels:
-                        panel['status'].setText("VOICE")
-                        panel['duration'].setText("In Progress...")
-                        if timestamp:
-                            panel['last_voice'].setText(timestamp)
-                    if self.current_id[idx] and self.current_id[idx] != self.last_logged_id[idx]:
-                        self.end_all_transmissions(end_current=False)
-                        self.start_new_log_entry(self.current_id[idx], self.current_tg[idx], self.current_cc[idx], channel)
-                        self.last_logged_id[idx] = self.current_id[idx]
-                        if self.recorder_enabled_check.isChecked():
-                            if self.is_recording.get(channel, False):
-                                self.stop_internal_recording(channel)
-                            self.start_internal_recording(self.current_id[idx], channel)
-                        self.check_for_alerts(self.current_tg[idx], self.current_id[idx], channel)
-                elif not self.is_in_transmission[idx]:
-                    for panel in panels:
-                        panel['status'].setText("SYNC")
-                        if timestamp:
-                            panel['last_sync'].setText(timestamp)
-            if "Sync: no sync" in text and self.is_in_transmission[idx]:
-                self.is_in_transmission[idx] = False
-                self.end_all_transmissions()
-                for panel in panels:
-                    panel['status'].setText("SYNC")
-                if self.is_recording.get(channel, False):
-                    self.stop_internal_recording(channel)
-
-                if self.is_recording.get(idx, False):
-                    self.stop_internal_recording(idx)
-                self.current_id[idx] = None
-                self.current_tg[idx] = None
-                self.last_logged_id[idx] = None
-        except Exception as e:
-            print(f"Log parse error: {e}")
-
-    def start_new_log_entry(self, id_val, tg_val, cc_val, channel):
-        start_time = datetime.now()
-        start_time_str = start_time.strftime("%Y-%m-%d %H:%M:%S")
-        tg_alias = self.aliases['tg'].get(tg_val, tg_val) or "N/A"
-        id_alias = self.aliases['id'].get(id_val, id_val) or "N/A"
-
-        row_items = [
-            QTableWidgetItem(start_time_str), QTableWidgetItem(""), QTableWidgetItem(""),
-            QTableWidgetItem(str(channel)), QTableWidgetItem(tg_alias), QTableWidgetItem(id_alias), QTableWidgetItem(cc_val or "N/A"),
-            QTableWidgetItem(""), QTableWidgetItem("")
-        ]
-
-        for i in range(len(row_items)):
-            if i < 7:
-                row_items[i].setFlags(row_items[i].flags() & ~Qt.ItemIsEditable)
-
-        self.logbook_table.insertRow(0)
-        for i, item in enumerate(row_items):
-            if i == 4:
-                item.setData(Qt.UserRole, tg_val)
-            elif i == 5:
-                item.setData(Qt.UserRole, id_val)
-            self.logbook_table.setItem(0, i, item)
-
-        self.mini_logbook_table.insertRow(0)
-        for i in range(7):
-            self.mini_logbook_table.setItem(0, i, row_items[i].clone())
-        if self.mini_logbook_table.rowCount() > 10:
-            self.mini_logbook_table.removeRow(10)
-
-        key = f"{id_val}_{channel}"
-        self.transmission_log[key] = {'start_time': start_time, 'tg': tg_val, 'id_alias': id_alias, 'channel': channel}
-
-
-    def end_all_transmissions(self, end_current=True):
-        end_time = datetime.now()
-        end_time_str = end_time.strftime("%Y-%m-%d %H:%M:%S")
-
+    def update_log_rate(self):
+        now = time.monotonic()
+        parts = []
+        for worker in self.reader_workers:
+            lines, batches = worker.batcher.lines_total, worker.batcher.batches_total
+            prev = self.log_rate_snapshot.get(worker.index)
+            self.log_rate_snapshot[worker.index] = (now, lines, batches)
+            if not prev:
+                continue
+            d_lines, d_batches = lines - prev[1], batches - prev[2]
+            per_batch = d_lines / d_batches if d_batches else 0.0
+            parts.append(f"P{worker.index + 1}: {d_lines / (now - prev[0]):.0f} lines/s, {per_batch:.1f} lines/batch")
+        if parts:
+            self.refresh.set_text(self.log_rate_label, "Log rate: " + " | ".join(parts))
+
+    def update_udp_stats(self):
+        now = time.monotonic()
+        for listener in self.udp_listeners:
+            stats, channel = listener.receiver.stats, listener.receiver.channel
+            labels = self.udp_stats_labels[channel - 1]
+            prev = self.udp_stats_snapshot.get(channel)
+            self.udp_stats_snapshot[channel] = (now, stats.packets)
+            if prev and now > prev[0]:
+                self.refresh.set_text(labels['pps'], f"{(stats.packets - prev[1]) / (now - prev[0]):.0f}")
+            buf = self.audio_router.buffers[channel]
+            for key, value in (('packets', stats.packets), ('bytes', stats.bytes), ('gaps', stats.gaps), ('late', stats.late),
+                               ('target', buf.target * 1000 // AUDIO_RATE), ('underruns', buf.underruns), ('overruns', buf.overruns)):
+                self.refresh.set_text(labels[key], str(value))
+        rec = self.recorder.stats()
+        self.refresh.set_text(self.rec_stats_label, f"Recorder: queue {rec['depth']} (max {rec['max_depth']}), "
+                              f"write {rec['write_ms']:.1f} ms (max {rec['max_write_ms']:.1f}), "
+                              f"{rec['bytes'] // 1024} KiB written, {rec['dropped']} dropped")
+
+    def handle_decoder_events(self, events):
+        for event in events:
+            try:
+                self.call_tracker.handle(event)
+            except Exception as e:
+                print(f"Log parse error: {e}")
+
+    def _live_panels(self, idx):
+        panels = []
+        if idx < len(self.live_labels_conf):
+            panels.append(self.live_labels_conf[idx])
+        if idx < len(self.live_labels_dash):
+            panels.append(self.live_labels_dash[idx])
+        return panels
+
+    def on_talker(self, idx, tg, id_):
+        for panel in self._live_panels(idx):
+            self.refresh.set_text(panel['tg'], self.aliases['tg'].get(tg, tg))
+            self.refresh.set_text(panel['id'], self.aliases['id'].get(id_, id_))
+
+    def on_color_code(self, idx, cc):
+        for panel in self._live_panels(idx):
+            self.refresh.set_text(panel['cc'], cc)
+
+    def on_voice(self, idx, timestamp):
+        self.dsp.set_voice(idx + 1, True)
+        for panel in self._live_panels(idx):
+            self.refresh.set_text(panel['status'], "VOICE")
+            self.refresh.set_text(panel['duration'], "In Progress...")
+            if timestamp:
+                self.refresh.set_text(panel['last_voice'], timestamp)
+
+    def on_sync(self, idx, timestamp):
+        self.dsp.set_voice(idx + 1, False)
+        for panel in self._live_panels(idx):
+            self.refresh.set_text(panel['status'], "SYNC")
+            if timestamp:
+                self.refresh.set_text(panel['last_sync'], timestamp)
+
+    def on_no_sync(self, idx):
+        self.dsp.set_voice(idx + 1, False)
+        for panel in self._live_panels(idx):
+            self.refresh.set_text(panel['status'], "SYNC")
+        self.stop_internal_recording(idx + 1)
+        if hasattr(self, 'scope') and self.spectrogram_channels()[0] == idx + 1:
+            self.scope.clear(); self.refresh.mark('scope', self.draw_scope)
+
+    def on_call_start(self, call):
+        self.start_new_log_entry(call)
+        self.mini_log_calls.appendleft(call)
+        self.refresh.mark('mini_log', self.render_mini_log)
+        if self.recorder_enabled_check.isChecked():
+            if self.recorder.is_recording(call.channel):
+                self.stop_internal_recording(call.channel)
+            self.start_internal_recording(call.radio_id, call.channel, call.tg, call.cc)
+        self.check_for_alerts(call.tg, call.radio_id, call.channel)
+
+    def on_call_end(self, call):
+        self.end_transmission(call)
+
+    def start_new_log_entry(self, call):
+        tg_alias = self.aliases['tg'].get(call.tg, call.tg) or "N/A"
+        id_alias = self.aliases['id'].get(call.radio_id, call.radio_id) or "N/A"
+        row_id = self.logbook.add_call(call, tg_alias, id_alias)
+        self.open_log_rows[(call.radio_id, call.channel)] = row_id
+        self.logbook_model.call_added(row_id)
+
+    def render_mini_log(self):
+        """Redraw the dashboard's last-calls table from ``mini_log_calls``."""
+        table = self.mini_logbook_table
+        table.setRowCount(len(self.mini_log_calls))
+        for row, call in enumerate(self.mini_log_calls):
+            texts = [call.start_time.strftime("%Y-%m-%d %H:%M:%S"),
+                     call.end_time.strftime("%H:%M:%S") if call.end_time else "",
+                     call.duration_text() if call.end_time else "", str(call.channel),
+                     self.aliases['tg'].get(call.tg, call.tg) or "N/A",
+                     self.aliases['id'].get(call.radio_id, call.radio_id) or "N/A", call.cc or "N/A"]
+            for col, text in enumerate(texts):
+                item = table.item(row, col)
+                if item is None: table.setItem(row, col, QTableWidgetItem(text))
+                elif item.text() != text: item.setText(text)
+
+    def end_transmission(self, call):
+        channel = call.channel
         dual = self.widgets.get('dual_tcp') and self.widgets['dual_tcp'].isChecked()
-        for log_data in self.transmission_log.values():
-            duration = end_time - log_data['start_time']
-            duration_str = str(duration).split('.')[0]
-            channel = log_data.get('channel', 1)
-            dur_text = f"{duration_str} (P{channel})" if dual else duration_str
-            if len(self.live_labels_conf) >= channel and self.live_labels_conf[channel-1]:
-                self.live_labels_conf[channel-1]['duration'].setText(dur_text)
-            if len(self.live_labels_dash) >= channel and self.live_labels_dash[channel-1]:
-                self.live_labels_dash[channel-1]['duration'].setText(dur_text)
-            for r in range(self.logbook_table.rowCount()):
-                if (self.logbook_table.item(r,5) and self.logbook_table.item(r,5).text() == log_data['id_alias'] and
-                    self.logbook_table.item(r,3) and self.logbook_table.item(r,3).text() == str(channel) and
-                    (not self.logbook_table.item(r,1) or not self.logbook_table.item(r,1).text())):
-                    end_item = QTableWidgetItem(end_time_str)
-                    end_item.setFlags(end_item.flags() & ~Qt.ItemIsEditable)
-                    self.logbook_table.setItem(r, 1, end_item)
-
-                    dur_item = QTableWidgetItem(duration_str)
-                    dur_item.setFlags(dur_item.flags() & ~Qt.ItemIsEditable)
-                    self.logbook_table.setItem(r, 2, dur_item)
-                    break
-            for r in range(self.mini_logbook_table.rowCount()):
-                if (self.mini_logbook_table.item(r,5) and self.mini_logbook_table.item(r,5).text() == log_data['id_alias'] and
-                    self.mini_logbook_table.item(r,3) and self.mini_logbook_table.item(r,3).text() == str(channel) and
-                    (not self.mini_logbook_table.item(r,1) or not self.mini_logbook_table.item(r,1).text())):
-                    self.mini_logbook_table.setItem(r,1,QTableWidgetItem(end_time_str.split(" ")[1]))
-                    self.mini_logbook_table.setItem(r,2,QTableWidgetItem(duration_str))
-                    break
-        if end_current:
-            self.transmission_log.clear()
-            self.last_logged_id = [None, None]
-            hasattr(self, 'scope_curve') and self.scope_curve.setData([])
-
-    def start_internal_recording(self, id_, channel):
+        dur_text = f"{call.duration_text()} (P{channel})" if dual else call.duration_text()
+        for panel in self._live_panels(channel - 1):
+            self.refresh.set_text(panel['duration'], dur_text)
+        row_id = self.open_log_rows.pop((call.radio_id, call.channel), None)
+        if row_id is not None:
+            self.logbook.set_end(row_id, call); self.logbook_model.call_updated(row_id)
+        # dsd-fme finishes its per-call file as the call ends, which the directory watcher does not see
+        if self.widgets['-P'].isChecked(): self.recording_scan_timer.start()
+        self.refresh.mark('mini_log', self.render_mini_log)
+
+    def start_internal_recording(self, id_, channel, tg=None, cc=None):
         rec_edit = self.recorder_dir_edits.get(channel)
-        rec_dir = rec_edit.text() if rec_edit else ""
-        _id = id_.replace('/', '-')
-        if not rec_dir or not os.path.isdir(rec_dir):
-            return
-        filepath = os.path.join(rec_dir, datetime.now().strftime("%Y-%m-%d_%H%M%S") + f"_ch{channel}_ID_{_id}.wav")
-        try:
-            wav = wave.open(filepath, 'wb')
-            wav.setnchannels(WAV_CHANNELS)
-            wav.setsampwidth(WAV_SAMPWIDTH)
-            wav.setframerate(AUDIO_RATE)
-            self.wav_files[channel] = wav
-            self.is_recording[channel] = True
+        if self.recorder.start(channel, rec_edit.text() if rec_edit else "", id_, tg, cc):
             for panel in self.live_labels_conf + self.live_labels_dash:
-                panel and (panel['recording'].setText("ACTIVE"), panel['recording'].setStyleSheet("color: #ffaa00; font-weight: bold;"))
-        except Exception as e:
-            print(f"Error starting recording: {e}")
-            self.wav_files[channel] = None
-            self.is_recording[channel] = False
+                panel and (self.refresh.set_text(panel['recording'], "ACTIVE"), self.refresh.set_style(panel['recording'], "color: #ffaa00; font-weight: bold;"))
 
     def stop_internal_recording(self, channel=None):
-        channels = [channel] if channel else list(self.wav_files.keys())
-        for ch in channels:
-            wav = self.wav_files.get(ch)
-            if wav:
-                try:
-                    wav.close()
-                except Exception as e:
-                    print(f"Error closing wav file: {e}")
-            self.wav_files[ch] = None
-            self.is_recording[ch] = False
+        self.recorder.stop(channel)
         for panel in self.live_labels_conf + self.live_labels_dash:
-            panel and (panel['recording'].setText("INACTIVE"), panel['recording'].setStyleSheet("color: gray;"))
-
-    def process_audio_data(self, channel, raw_data):
-        if raw_data.startswith(b"ERROR:"):
-            QMessageBox.critical(self, "UDP Error", raw_data.decode())
-            self.close()
-            return
+            panel and (self.refresh.set_text(panel['recording'], "INACTIVE"), self.refresh.set_style(panel['recording'], "color: gray;"))
 
-        # Temporary debug logging to verify dual-channel traffic
-        # Debug: show incoming byte counts in GUI terminals
-        msg = f"Channel {channel} received {len(raw_data)} bytes"
-        if channel - 1 < len(self.terminal_outputs_conf):
-            self.terminal_outputs_conf[channel - 1].appendPlainText(msg)
-        if channel - 1 < len(self.terminal_outputs_dash):
-            self.terminal_outputs_dash[channel - 1].appendPlainText(msg)
+    def on_udp_error(self, channel, message):
+        QMessageBox.critical(self, "UDP Error", message)
+        self.close()
 
-        clean_num_bytes = (len(raw_data) // np.dtype(AUDIO_DTYPE).itemsize) * np.dtype(AUDIO_DTYPE).itemsize
-        if clean_num_bytes == 0:
+    def drain_monitors(self):
+        """Frame job: take whatever the DSP worker queued for display since the last frame."""
+        if not hasattr(self, 'spec_source_combo'):
             return
-        audio_samples = np.frombuffer(raw_data[:clean_num_bytes], dtype=AUDIO_DTYPE)
-
-        try:
-            filtered_samples = self.apply_filters(audio_samples.copy(), channel)
-        except KeyError as e:
-            print(f"Filter widget not ready, skipping filtering. Error: {e}")
-            filtered_samples = audio_samples
-
-        self.channel_buffers[channel] = np.concatenate((self.channel_buffers[channel], filtered_samples))
-
-        dual = self.widgets.get('dual_tcp') and self.widgets['dual_tcp'].isChecked() and self.output_streams
-        if dual:
-            data = self.channel_buffers[channel]
-            self.channel_buffers[channel] = np.array([], dtype=AUDIO_DTYPE)
-            if self.is_recording.get(channel) and self.wav_files.get(channel):
-                stereo = np.column_stack((data, np.zeros_like(data))) if channel == 1 else np.column_stack((np.zeros_like(data), data))
-                self.wav_files[channel].writeframes(stereo.astype(AUDIO_DTYPE).tobytes())
-            mute_map = {1: getattr(self, 'mute_check1', None), 2: getattr(self, 'mute_check2', None)}
-            mute = mute_map.get(channel)
-            if (not mute or not mute.isChecked()) and channel in self.output_streams:
-                try:
-                    self.output_streams[channel].write((data * self.volume).astype(AUDIO_DTYPE))
-                except Exception:
-                    pass
-# audio device selectors are created later; define placeholders so
-# early audio initialisation does not crash if they are accessed
-        else:
-            frames = []
-            n = min(len(self.channel_buffers[1]), len(self.channel_buffers[2]))
-            if n > 0:
-                left = self.channel_buffers[1][:n]
-                right = self.channel_buffers[2][:n]
-                self.channel_buffers[1] = self.channel_buffers[1][n:]
-                self.channel_buffers[2] = self.channel_buffers[2][n:]
-                frames.append(np.column_stack((left, right)))
-
-            for ch in (1, 2):
-                other = 2 if ch == 1 else 1
-                if len(self.channel_buffers[ch]) > 0 and len(self.channel_buffers[other]) == 0:
-                    data = self.channel_buffers[ch]
-                    self.channel_buffers[ch] = np.array([], dtype=AUDIO_DTYPE)
-                    if ch == 1:
-                        frames.append(np.column_stack((data, np.zeros_like(data))))
-                    else:
-                        frames.append(np.column_stack((np.zeros_like(data), data)))
-
-            for ch in (1, 2):
-                if self.is_recording.get(ch) and self.wav_files.get(ch):
-                    for frame in frames:
-                        self.wav_files[ch].writeframes(frame.astype(AUDIO_DTYPE).tobytes())
-
-            if self.output_stream:
-                for frame in frames:
-                    if getattr(self, 'mute_check1', None) and self.mute_check1.isChecked():
-                        frame[:, 0] = 0
-                    if getattr(self, 'mute_check2', None) and self.mute_check2.isChecked():
-                        frame[:, 1] = 0
-                    try:
-                        self.output_stream.write((frame * self.volume).astype(AUDIO_DTYPE))
-                    except Exception:
-                        pass
-
-        show_visuals = not hasattr(self, 'spec_source_combo') or self.spec_source_combo.currentIndex() + 1 == channel
-        if show_visuals:
-            if hasattr(self, 'scope_curve'):
-                self.scope_curve.setData(audio_samples)
-
-            audio_samples_float = audio_samples.astype(np.float32) / 32768.0
-
-            if hasattr(self, 'rms_label'):
-                self.rms_label.setText(f"RMS: {np.sqrt(np.mean(audio_samples_float**2)):.4f}")
-
-            if len(audio_samples_float) < CHUNK_SAMPLES:
-                audio_samples_float = np.pad(audio_samples_float, (0, CHUNK_SAMPLES - len(audio_samples_float)))
-
-            with np.errstate(divide='ignore', invalid='ignore'):
-                magnitude = np.abs(np.fft.fft(audio_samples_float)[:CHUNK_SAMPLES // 2])
-                log_magnitude = 20 * np.log10(magnitude + 1e-12)
-            log_magnitude = np.nan_to_num(log_magnitude, nan=MIN_DB, posinf=MAX_DB, neginf=MIN_DB)
-
-            if hasattr(self, 'peak_freq_label'):
-                self.peak_freq_label.setText(f"Peak: {np.argmax(log_magnitude) * (AUDIO_RATE / CHUNK_SAMPLES):.0f} Hz")
-
-            if hasattr(self, 'spec_data') and hasattr(self, 'imv'):
-                self.spec_data = np.roll(self.spec_data, -1, axis=0)
-                self.spec_data[-1, :] = log_magnitude
-                self.imv.setImage(np.rot90(self.spec_data), autoLevels=False, levels=(MIN_DB, MAX_DB))
+        blocks = {}
+        for channel, monitor in self.dsp.monitors.items():
+            chunk = self.monitor_chunks[channel]
+            n = monitor.read_into(chunk)
+            if n: blocks[channel] = chunk[:n].astype(np.float32) / 32768.0
+        if not blocks:
+            return
+        shown = self.spectrogram_channels()
+        if shown[0] in blocks:
+            # scope and RMS follow the first displayed port
+            self.scope.feed(self.monitor_chunks[shown[0]][:len(blocks[shown[0]])]); self.draw_scope()
+            self.refresh.set_text(self.rms_label, f"RMS: {np.sqrt(np.mean(blocks[shown[0]]**2)):.4f}")
+        new_rows = self.spectrograms.feed(blocks)
+        if any(channel in new_rows for channel in shown):
+            self.draw_spectrogram()
+
+    def spectrogram_channels(self):
+        index = self.spec_source_combo.currentIndex()
+        return [1, 2] if index == 2 else [index + 1]
+
+    def spectrogram_image(self):
+        """Image for the selected source: one port's history, or both with a bright divider."""
+        shown = self.spectrogram_channels()
+        if len(shown) == 1:
+            return self.spectrograms[shown[0]].view().T[::-1]
+        bins, rows = self.spectrograms[1].bins, self.spectrograms[1].rows
+        if self.spec_composite is None or self.spec_composite.shape != (2 * bins + 1, rows):
+            self.spec_composite = np.full((2 * bins + 1, rows), MAX_DB, dtype=np.float32)
+        self.spec_composite[:bins] = self.spectrograms[1].view().T[::-1]
+        self.spec_composite[bins + 1:] = self.spectrograms[2].view().T[::-1]
+        return self.spec_composite
+
+    def draw_spectrogram(self):
+        # levels stay whatever the histogram set
+        self.imv.imageItem.setImage(self.spectrogram_image(), autoLevels=False)
+        peaks = " | ".join(f"P{ch} {self.spectrograms[ch].peak_hz():.0f} Hz" for ch in self.spectrogram_channels())
+        self.refresh.set_text(self.peak_freq_label, f"Peak: {peaks}")
+
+    def switch_spectrogram_source(self, *args):
+        self.scope.clear(); self.draw_scope()
+        self.imv.setImage(self.spectrogram_image(), autoLevels=False, levels=self.imv.imageItem.getLevels())
+
+    def draw_scope(self):
+        # one min/max pair per pixel column of the plot area
+        columns = int(self.scope_widget.getPlotItem().getViewBox().width()) or 400
+        self.scope_curve.setData(*self.scope.envelope(columns))
+
+    def configure_scope(self, text):
+        self.scope.configure(float(text.split()[0]))
+        self.scope_widget.setXRange(-self.scope.seconds, 0, padding=0)
+        self.draw_scope()
+
+    def configure_spectrogram(self, *args):
+        overlap = int(self.spec_overlap_combo.currentText().rstrip('%')) / 100.0
+        self.spectrograms.configure(int(self.spec_fft_combo.currentText()), overlap)
+        self.imv.setImage(self.spectrogram_image(), autoLevels=False, levels=(MIN_DB, MAX_DB))
 
     def search_in_log(self):
-        term = self.terminal_outputs_conf[0]
-        if term.find(self.search_input.text()): return
-        cursor = term.textCursor(); cursor.movePosition(QTextCursor.Start); term.setTextCursor(cursor)
-        if not term.find(self.search_input.text()): QMessageBox.information(self, "Search", f"Phrase '{self.search_input.text()}' not found.")
+        self.refresh.flush('terminal')
+        term, model = self.terminal_outputs_conf[0], self.terminal_models[0]
+        current = term.currentIndex()
+        row = model.log.find(self.search_input.text(), current.row() + 1 if current.isValid() else 0)
+        if row < 0: QMessageBox.information(self, "Search", f"Phrase '{self.search_input.text()}' not found."); return
+        index = model.index(row); term.setCurrentIndex(index); term.scrollTo(index, QAbstractItemView.PositionAtCenter)
 
     def filter_logbook(self):
-        search_text = self.logbook_search_input.text().lower()
-        start_date = self.logbook_start_date.date()
-        end_date = self.logbook_end_date.date()
-
-        for row in range(self.logbook_table.rowCount()):
-            is_hidden = False
-
-            date_item = self.logbook_table.item(row, 0)
-            if date_item:
-                try:
-                    row_date = datetime.strptime(date_item.text(), "%Y-%m-%d %H:%M:%S").date()
-                    if not (start_date.toPyDate() <= row_date <= end_date.toPyDate()):
-                        is_hidden = True
-                except ValueError:
-                    is_hidden = True
-            else:
-                is_hidden = True
-
-            if not is_hidden and search_text:
-                text_match = False
-                for col in range(self.logbook_table.columnCount()):
-                    item = self.logbook_table.item(row, col)
-                    if item and search_text in item.text().lower():
-                        text_match = True
-                        break
-                if not text_match:
-                    is_hidden = True
-
-            self.logbook_table.setRowHidden(row, is_hidden)
+        self.logbook_filter_timer.stop()
+        self.logbook_model.set_filters(start_date=self.logbook_start_date.date().toPyDate(), end_date=self.logbook_end_date.date().toPyDate(),
+                                       text=self.logbook_search_input.text().strip())
 
 
     def load_aliases(self):
@@ -2225,45 +2343,9 @@ class DSDApp(QMainWindow):
         start_date = self.stats_start_date.date().toPyDate()
         end_date = self.stats_end_date.date().toPyDate()
 
-        tg_counts = Counter()
-        id_counts = Counter()
-        time_data = []
-        total_duration = timedelta()
-        filtered_rows = 0
-
-        for row in range(self.logbook_table.rowCount()):
-            date_item = self.logbook_table.item(row, 0)
-            if not date_item: continue
-
-            try:
-                row_date = datetime.strptime(date_item.text(), "%Y-%m-%d %H:%M:%S").date()
-                if not (start_date <= row_date <= end_date):
-                    continue
-            except (ValueError, TypeError):
-                continue
-
-            filtered_rows += 1
-
-            tg_item = self.logbook_table.item(row, 4)
-            id_item = self.logbook_table.item(row, 5)
-            if tg_item and tg_item.data(Qt.UserRole):
-                tg_counts[tg_item.data(Qt.UserRole)] += 1
-            if id_item and id_item.data(Qt.UserRole):
-                id_counts[id_item.data(Qt.UserRole)] += 1
-
-            try:
-                dt_obj = datetime.strptime(date_item.text(), "%Y-%m-%d %H:%M:%S")
-                time_data.append(dt_obj.timestamp())
-            except (ValueError, TypeError):
-                pass
-
-            duration_item = self.logbook_table.item(row, 2)
-            if duration_item and duration_item.text():
-                try:
-                    h, m, s = map(int, duration_item.text().split(':'))
-                    total_duration += timedelta(hours=h, minutes=m, seconds=s)
-                except ValueError:
-                    pass
+        stats = self.logbook.stats(start_date, end_date)
+        tg_counts = Counter({tg: calls for tg, calls, _ in stats['tg']}); id_counts = Counter({id_: calls for id_, calls, _ in stats['id']})
+        total_duration = timedelta(seconds=stats['airtime']); filtered_rows = stats['total_calls']
 
         stats_data = {
             "summary": {
@@ -2274,7 +2356,8 @@ class DSDApp(QMainWindow):
             },
             "tg_chart": tg_counts.most_common(10),
             "id_chart": id_counts.most_common(10),
-            "time_chart": sorted(time_data)
+            "time_chart": [hour for hour, _ in stats['hours']],
+            "time_weights": [calls for _, calls in stats['hours']]
         }
 
         self.display_statistics(stats_data)
@@ -2314,7 +2397,7 @@ class DSDApp(QMainWindow):
         self.time_chart.clear()
         time_data_points = data.get("time_chart", [])
         if time_data_points:
-            y, x = np.histogram(time_data_points, bins=100)
+            y, x = np.histogram(time_data_points, bins=100, weights=data.get("time_weights"))
             self.time_chart.plot(x, y, stepMode=True, fillLevel=0, brush=(0,0,255,150), pen=pg.mkPen(color=self.palette().highlight().color(), width=2))
         self.time_chart.getAxis('left').setGrid(128)
         self.time_chart.getAxis('bottom').setGrid(128)
@@ -2397,19 +2480,69 @@ class DSDApp(QMainWindow):
             edit = self.recorder_dir_edits.get(channel)
             if edit:
                 edit.setText(path)
-            self.fs_watcher.addPath(path)
             self.update_recording_list()
 
     def update_recording_list(self):
-        self.recording_list.clear()
-        rec_dir = self.recorder_dir_edit1.text()
-        if rec_dir and os.path.exists(rec_dir):
-            self.recording_list.addItems(QDir(rec_dir).entryList(["*.wav"], QDir.Files | QDir.NoDotAndDotDot, QDir.Time))
+        dirs = [edit.text() for edit in self.recorder_dir_edits.values()]
+        self.recording_model.reload(dirs)
+        if self.recording_watcher.directories(): self.recording_watcher.removePaths(self.recording_watcher.directories())
+        watched = [d for d in dict.fromkeys(dirs) if d and os.path.isdir(d)]
+        if watched: self.recording_watcher.addPaths(watched)
+
+    def scan_recordings(self):
+        """Catalog settled files that appeared in the recording directories, off the GUI thread."""
+        dirs = self.recording_watcher.directories()
+        def run():
+            for rec_dir in dirs:
+                try:
+                    for path in self.recording_catalog.import_directory(rec_dir, settle=RECORDING_SETTLE_SECONDS):
+                        self.recording_cataloged.emit(path)
+                except Exception as e:
+                    print(f"Could not scan recordings in {rec_dir}: {e}")
+        if dirs: threading.Thread(target=run, daemon=True).start()
+
+    def selected_recordings(self):
+        return [index.data(Qt.UserRole) for index in sorted(self.recording_list.selectionModel().selectedRows(), key=lambda i: i.row())]
+
+    def import_recordings(self):
+        dirs = [edit.text() for edit in self.recorder_dir_edits.values() if edit.text() and os.path.isdir(edit.text())]
+        if not dirs: QMessageBox.information(self, "Import", "Select a recording directory first."); return
+        def run():
+            added = 0
+            for rec_dir in dict.fromkeys(dirs):
+                try:
+                    self.recording_catalog.remove_missing([rec_dir])
+                    added += len(self.recording_catalog.import_directory(rec_dir))
+                except Exception as e:
+                    print(f"Could not import recordings from {rec_dir}: {e}")
+            self.recordings_imported.emit(added)
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_recordings_imported(self, added):
+        self.update_recording_list()
+        QMessageBox.information(self, "Import", f"{added} recordings added to the catalog.")
 
     def play_recording(self):
-        selected = self.recording_list.selectedItems()
-        path = os.path.join(self.recorder_dir_edit1.text(), (selected[0] if selected else self.recording_list.item(0)).text()) if self.recording_list.count() > 0 else None
-        if path and os.path.exists(path): QSound.play(path)
+        selected = self.selected_recordings()
+        path = selected[0] if selected else (self.recording_model.rows[0]['path'] if self.recording_model.rows else None)
+        if not path or not os.path.exists(path): return
+        if path.lower().endswith(".wav"): QSound.play(path); return
+        try:
+            # QSound only plays WAV; compressed recordings are decoded and played through sounddevice
+            frames, rate = read_recording(path)
+            sd.play(frames, rate)
+        except Exception as e:
+            QMessageBox.warning(self, "Playback", f"Could not play recording: {e}")
+
+    def export_stereo_recording(self):
+        paths = self.selected_recordings()[:2]
+        if not paths: QMessageBox.information(self, "Export", "Select one recording, or one per port, to export."); return
+        out_path, _ = QFileDialog.getSaveFileName(self, "Export Stereo WAV", os.path.splitext(paths[0])[0] + "_stereo.wav", "WAV Files (*.wav)")
+        if out_path:
+            try:
+                export_stereo(paths, out_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Could not export recording: {e}")
 
     def import_csv_to_logbook(self):
         path, _ = QFileDialog.getOpenFileName(self, "Import CSV", "", "CSV Files (*.csv)");
@@ -2417,19 +2550,11 @@ class DSDApp(QMainWindow):
             try:
                 with open(path, 'r', newline='', encoding='utf-8') as f:
                     reader = csv.reader(f)
-                    self.logbook_table.setRowCount(0)
-                    header = next(reader, None)
-                    self.logbook_table.setSortingEnabled(False)
-                    for row_data in reader:
-                        row = self.logbook_table.rowCount()
-                        self.logbook_table.insertRow(row)
-                        for i, data in enumerate(row_data):
-                            item = QTableWidgetItem(data)
-                            if i < 7:
-                                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                            self.logbook_table.setItem(row, i, item)
-                    self.logbook_table.setSortingEnabled(True)
-                QMessageBox.information(self, "Success", "Logbook has been imported.")
+                    next(reader, None)
+                    count, skipped = self.logbook.import_rows(reader)
+                self.logbook_model.reload()
+                QMessageBox.information(self, "Success", f"{count} logbook entries have been imported."
+                                        + (f"\n{skipped} malformed rows were skipped." if skipped else ""))
             except Exception as e:
                 QMessageBox.critical(self, "Import Error", f"Could not import CSV file:\n{e}")
 
@@ -2439,14 +2564,10 @@ class DSDApp(QMainWindow):
             try:
                 with open(path, 'w', newline='', encoding='utf-8') as f:
                     writer = csv.writer(f)
-                    header_labels = [self.logbook_table.horizontalHeaderItem(i).text() for i in range(self.logbook_table.columnCount())]
-                    writer.writerow(header_labels)
-                    for row in range(self.logbook_table.rowCount()):
-                        row_data = []
-                        for col in range(self.logbook_table.columnCount()):
-                            item = self.logbook_table.item(row, col)
-                            row_data.append(item.text() if item else "")
-                        writer.writerow(row_data)
+                    writer.writerow(LOGBOOK_HEADER)
+                    duration_col = LOGBOOK_COLUMNS.index("duration") + 1
+                    for row in self.logbook.rows(*self.logbook_model.order, limit=None):
+                        writer.writerow([format_duration(v) if i == duration_col else ("" if v is None else v) for i, v in enumerate(row)][1:])
                 QMessageBox.information(self, "Success", f"Logbook successfully saved to {os.path.basename(path)}")
             except Exception as e:
                 QMessageBox.critical(self, "Save Error", f"Could not save CSV file:\n{e}")
@@ -2499,14 +2620,9 @@ class DSDApp(QMainWindow):
             QSound.play(sound_path)
 
     def check_for_alerts(self, tg, id, port=None):
-        if not tg or not id:
-            return
-        for alert in self.alerts:
-            if ((alert['type'] == 'TG' and alert['value'] == tg) or (alert['type'] == 'ID' and alert['value'] == id)) and (
-                alert.get('port', 0) in (0, port if port is not None else 0)
-            ):
-                self.play_alert_sound(alert['sound'])
-                break
+        alert = find_alert(self.alerts, tg, id, port)
+        if alert:
+            self.play_alert_sound(alert['sound'])
 
     def populate_audio_devices(self, combo):
         try:
@@ -2518,144 +2634,20 @@ class DSDApp(QMainWindow):
             print(f"Could not query audio devices: {e}")
 
     def restart_audio_streams(self):
-        # Close existing streams
-        if hasattr(self, 'output_streams'):
-            for stream in self.output_streams.values():
-                try:
-                    stream.stop(); stream.close()
-                except Exception:
-                    pass
-        self.output_streams = {}
-        if self.output_stream:
-            try:
-                self.output_stream.stop(); self.output_stream.close()
-            except Exception:
-                pass
-            self.output_stream = None
-
-        self.filter_states.clear()
-        self.channel_buffers = {1: np.array([], dtype=AUDIO_DTYPE), 2: np.array([], dtype=AUDIO_DTYPE)}
-
+        self.dsp.reset_filters()
         dual = self.widgets.get('dual_tcp') and self.widgets['dual_tcp'].isChecked()
         if self.device_combo1 is None:
             print("Audio devices not initialized")
             return
-        try:
-            if dual:
-                for ch, combo in ((1, self.device_combo1), (2, self.device_combo2)):
-                    device = combo.currentData()
-                    if device is None:
-                        continue
-                    stream = sd.OutputStream(samplerate=AUDIO_RATE, device=device, channels=1,
-                                            dtype=AUDIO_DTYPE, blocksize=CHUNK_SAMPLES)
-                    stream.start()
-                    self.output_streams[ch] = stream
-            else:
-                device = self.device_combo1.currentData()
-                self.output_stream = sd.OutputStream(samplerate=AUDIO_RATE, device=device, channels=2,
-                                                    dtype=AUDIO_DTYPE, blocksize=CHUNK_SAMPLES)
-                self.output_stream.start()
-        except Exception as e:
-            print(f"Error opening audio stream: {e}")
-
-    def set_volume(self, value): self.volume = value / 100.0
-
-    def apply_filters(self, samples, channel=1):
-        samples_float = samples.astype(np.float32)
-
-        if self.widgets['agc_check'].isChecked():
-            samples_float_normalized = samples_float / 32768.0
-
-            strength = self.widgets['agc_strength_slider'].value() / 100.0
-            target_rms = 0.1
-
-            current_rms = np.sqrt(np.mean(samples_float_normalized**2))
-            if current_rms > 1e-6:
-                gain = target_rms / current_rms
-                gain = np.clip(gain, 0.1, 10.0)
-
-                if 'agc_gain' not in self.filter_states: self.filter_states['agc_gain'] = 1.0
-                self.filter_states['agc_gain'] = (1.0 - strength) * self.filter_states['agc_gain'] + strength * gain
-
-                samples_float *= self.filter_states['agc_gain']
-
-        if self.widgets["hp_filter_check"].isChecked():
-            cutoff = self.widgets["hp_cutoff_spin"].value()
-            b, a = signal.butter(4, cutoff, 'highpass', fs=AUDIO_RATE)
-            if 'hp_filter' not in self.filter_states: self.filter_states['hp_filter'] = signal.lfilter_zi(b,a)
-            samples_float, self.filter_states['hp_filter'] = signal.lfilter(b, a, samples_float, zi=self.filter_states['hp_filter'])
-
-
-        if self.widgets["lp_filter_check"].isChecked():
-            cutoff = self.widgets["lp_cutoff_spin"].value()
-            b, a = signal.butter(4, cutoff, 'lowpass', fs=AUDIO_RATE)
-            if 'lp_filter' not in self.filter_states: self.filter_states['lp_filter'] = signal.lfilter_zi(b,a)
-            samples_float, self.filter_states['lp_filter'] = signal.lfilter(b, a, samples_float, zi=self.filter_states['lp_filter'])
-
-        if self.widgets["bp_filter_check"].isChecked():
-            low = self.widgets["bp_center_spin"].value() - self.widgets["bp_width_spin"].value() / 2
-            high = self.widgets["bp_center_spin"].value() + self.widgets["bp_width_spin"].value() / 2
-            b, a = signal.butter(4, [low, high], 'bandpass', fs=AUDIO_RATE)
-            if 'bp_filter' not in self.filter_states: self.filter_states['bp_filter'] = signal.lfilter_zi(b,a)
-            samples_float, self.filter_states['bp_filter'] = signal.lfilter(b, a, samples_float, zi=self.filter_states['bp_filter'])
-
-        if self.widgets["notch_filter_check"].isChecked():
-            freq = self.widgets["notch_freq_spin"].value()
-            q = self.widgets["notch_q_spin"].value()
-            b, a = signal.iirnotch(freq, q, fs=AUDIO_RATE)
-            if 'notch_filter' not in self.filter_states: self.filter_states['notch_filter'] = signal.lfilter_zi(b,a)
-            samples_float, self.filter_states['notch_filter'] = signal.lfilter(b, a, samples_float, zi=self.filter_states['notch_filter'])
-
-        if hasattr(self, 'eq_sliders'):
-            eq_bands = [100, 300, 600, 1000, 3000, 6000]
-            mode = getattr(self, 'eq_mode', 'both_same')
-            if mode == 'both_same':
-                sliders = self.eq_sliders[1]
-            elif mode == 'separate':
-                sliders = self.eq_sliders.get(channel, [])
-            elif mode == 'port1':
-                sliders = self.eq_sliders[1] if channel == 1 else []
-            elif mode == 'port2':
-                sliders = self.eq_sliders[2] if channel == 2 else []
-            else:
-                sliders = self.eq_sliders.get(channel, [])
-            if any(abs(s.value()) > 0.1 for s in sliders):
-                original = samples_float.copy()
-                for i, slider in enumerate(sliders):
-                    gain_db = slider.value()
-                    if abs(gain_db) <= 0.1:
-                        continue
-                    center_freq = eq_bands[i]
-                    q_factor = 3.0
-                    b, a = signal.iirpeak(center_freq, q_factor, fs=AUDIO_RATE)
-                    gain = 10 ** (gain_db / 20.0)
-
-                    filter_name = f'eq_filter_{channel}_{i}'
-                    if filter_name not in self.filter_states:
-                        self.filter_states[filter_name] = signal.lfilter_zi(b, a)
-                    band, self.filter_states[filter_name] = signal.lfilter(
-                        b, a, original, zi=self.filter_states[filter_name])
-                    samples_float += (gain - 1.0) * band
-
-
-        if self.widgets['nr_check'].isChecked():
-            strength = self.widgets['nr_strength_slider'].value() / 100.0
-
-            spec = np.fft.fft(samples_float)
-            mag = np.abs(spec)
-            phase = np.angle(spec)
+        self.audio_router.open_streams(bool(dual), {1: self.device_combo1.currentData(), 2: self.device_combo2.currentData()})
 
-            if 'noise_profile' not in self.filter_states:
-                self.filter_states['noise_profile'] = np.mean(mag)
+    def publish_filter_params(self, *args):
+        self.dsp.set_params(filter_params(self._widget_values(), self.eq_mode))
 
-            self.filter_states['noise_profile'] = (1 - 0.01) * self.filter_states['noise_profile'] + 0.01 * np.mean(mag)
+    def set_volume(self, value): self.audio_router.volume = value / 100.0
 
-            mag_denoised = np.maximum(0, mag - self.filter_states['noise_profile'] * strength)
-            spec_denoised = mag_denoised * np.exp(1j * phase)
-            samples_float = np.fft.ifft(spec_denoised).real
+    def set_mute(self, channel, state): self.audio_router.muted[channel] = state
 
-        np.clip(samples_float, -32767, 32767, out=samples_float)
-        return samples_float.astype(AUDIO_DTYPE)
     #</editor-fold>
 
 if __name__ == '__main__':
@@ -0,0 +1,2292 @@
+"""Qt-free decoding core shared by the GUI and the headless runner.
+
+Everything in this module works without a display: building the dsd-fme
+command lines, spawning the decoders, turning their console output into call
+events, routing the UDP audio to the sound card and recording it.
+
+Run ``python -m dsd_core`` to decode headless with the settings stored in
+``dsd-fme-gui-config.json``.
+"""
+import sys
+import os
+import wave
+import json
+import csv
+import socket
+import subprocess
+import threading
+import time
+import argparse
+import tempfile
+import re
+import queue
+import sqlite3
+from functools import lru_cache
+from array import array
+from datetime import datetime, timedelta
+
+import numpy as np
+
+try:
+    import sounddevice as sd
+    SOUNDDEVICE_AVAILABLE = True
+except ImportError:
+    SOUNDDEVICE_AVAILABLE = False
+
+try:
+    from scipy import signal
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDFILE_AVAILABLE = False
+
+# --- AppData Storage ---
+APP_NAME = "DSD-FME-GUI"
+if sys.platform == "win32":
+    APP_DATA_DIR = os.path.join(os.environ['APPDATA'], APP_NAME)
+else:
+    APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.config', APP_NAME)
+os.makedirs(APP_DATA_DIR, exist_ok=True)
+
+
+def resource_path(relative_path):
+    if getattr(sys, "_MEIPASS", None):
+        base_path = sys._MEIPASS
+    else:
+        base_path = os.path.abspath(".")
+
+    local_path = os.path.join(base_path, relative_path)
+    appdata_path = os.path.join(APP_DATA_DIR, relative_path)
+
+    if not os.path.exists(appdata_path) and os.path.exists(local_path) and relative_path not in ['dsd-fme.exe', 'dsd-fme']:
+        import shutil
+        try:
+            shutil.copy2(local_path, appdata_path)
+        except Exception as e:
+            print(f"Could not copy file {relative_path} to AppData: {e}")
+            return local_path
+
+    if relative_path in ['dsd-fme.exe', 'dsd-fme']:
+        return os.path.join(os.path.abspath("."), relative_path)
+
+    if relative_path.endswith('.json') or relative_path.endswith('.html'):
+        return appdata_path
+
+    return local_path
+
+CONFIG_FILE = resource_path('dsd-fme-gui-config.json')
+ALIASES_FILE = resource_path('dsd-fme-aliases.json')
+RECORDINGS_DB = os.path.join(APP_DATA_DIR, 'recordings.db'); RECORDING_PAGE_SIZE = 200
+RECORDING_SETTLE_SECONDS = 2.0
+LOGBOOK_DB = os.path.join(APP_DATA_DIR, 'logbook.db'); LOGBOOK_PAGE_SIZE = 256
+UDP_IP = "127.0.0.1"; UDP_PORT = 23456
+UDP_GAP_SECONDS = 0.25; UDP_LATE_FACTOR = 1.5
+UDP_RECV_TIMEOUT = 0.1; UDP_RING_SLOTS = 64
+CHUNK_SAMPLES = 1024
+AUDIO_RATE = 16000; AUDIO_DTYPE = np.int16
+WAV_CHANNELS = 2; WAV_SAMPWIDTH = 2
+RECORD_LAYOUTS = {"stereo": "Stereo (port in its own channel)", "mono": "Mono per port"}
+# codec -> (label, file extension, soundfile format, soundfile subtype); "wav" needs no soundfile
+RECORD_CODECS = {"wav": ("WAV (PCM)", ".wav", None, None), "flac": ("FLAC", ".flac", "FLAC", "PCM_16"),
+                 "opus": ("Ogg Opus", ".opus", "OGG", "OPUS")}
+RECORDING_EXTENSIONS = [codec[1] for codec in RECORD_CODECS.values()]
+RECORD_QUEUE_SIZE = 256; RECORD_FLUSH_BYTES = 256 * 1024; RECORD_IDLE_FLUSH = 0.5
+AUDIO_BUFFER_SAMPLES = AUDIO_RATE * 2
+JITTER_TARGET_MIN = CHUNK_SAMPLES; JITTER_TARGET_MAX = AUDIO_RATE // 2; JITTER_RELAX_SAMPLES = AUDIO_RATE * 10
+LINE_BATCH_MAX_LINES = 256; LINE_BATCH_MAX_DELAY = 0.03
+TERMINAL_LINE_CAP = 5000; TERMINAL_SPILL_BLOCK = 1024
+
+DECODER_MODES = {
+    "-fa":"Auto", "-fA":"Analog", "-ft":"Trunk P25/DMR", "-fs":"DMR Simplex",
+    "-f1":"P25 P1", "-f2":"P25 P2", "-fd":"D-STAR", "-fx":"X2-TDMA",
+    "-fy":"YSF", "-fz":"M17", "-fU": "M17 UDP Frame", "-fi":"NXDN48", "-fn":"NXDN96",
+    "-fp":"ProVoice", "-fe":"EDACS EA", "-fE":"EDACS EA w/ESK", "-fh": "EDACS Std/PV", "-fH": "EDACS Std/PV w/ESK",
+    "-fm": "dPMR", "-fZ": "M17 Stream Encoder", "-fP": "M17 Packet Encoder", "-fB": "M17 BERT Encoder"
+}
+MODULATIONS = {"-ma":"Auto","-mc":"C4FM (default)","-mg":"GFSK","-mq":"QPSK","-m2":"P25p2 QPSK"}
+VALUE_FLAGS = ["-s","-g","-V","-w","-6","-c","-C","-G","-U","-d","-r","-n","-u","-L","-Q","-M","-S","-X","-D","-v","-7","-I","-B","-t"]
+SWITCH_FLAGS = ["-l","-xx","-xr","-xd","-xz","-N","-Z","-4","-0","-3","-F","-T","-Y","-p","-E","-e","-q","-z","-y","-8","-P","-a","-W"]
+PER_PORT_FLAGS = ["-b", "-1", "-H", "-R", "-K", "-k"]
+EQ_BANDS = [100, 300, 600, 1000, 3000, 6000]; EQ_Q = 3.0
+FILTER_ORDER = 4; FILTER_CACHE_SIZE = 64
+SPEC_WIDTH = 400; SPEC_FFT_SIZE = CHUNK_SAMPLES; MIN_DB = -70; MAX_DB = 50
+SCOPE_SECONDS = 2.0
+NR_FRAME = 512; NR_HOP = NR_FRAME // 2; NR_FLOOR = 0.05; NR_PROFILE_ALPHA = 0.05; VOICE_HOLD_SECONDS = 0.5
+FILTER_DEFAULTS = {
+    "agc_check": False, "agc_strength_slider": 50, "nr_check": False, "nr_strength_slider": 50,
+    "hp_filter_check": False, "hp_cutoff_spin": 300, "lp_filter_check": False, "lp_cutoff_spin": 3400,
+    "bp_filter_check": False, "bp_center_spin": 1500, "bp_width_spin": 1000,
+    "notch_filter_check": False, "notch_freq_spin": 1000, "notch_q_spin": 30,
+}
+LOGBOOK_HEADER = ["Start Time","End Time","Duration","Port","Talkgroup","Radio ID","Color Code", "Tags", "Notes"]
+# calls table column behind each LOGBOOK_HEADER entry
+LOGBOOK_COLUMNS = ["start", "end", "duration", "channel", "tg_alias", "id_alias", "cc", "tags", "notes"]
+LOGBOOK_SEARCH_COLUMNS = ("tg", "radio_id", "tg_alias", "id_alias", "tags", "notes")
+LOGBOOK_SCAN_HITS = 4096
+
+
+#<editor-fold desc="Configuration">
+def load_config(path=None):
+    """Read the GUI config, preferring a copy next to the executable."""
+    if path is None:
+        local_config_path = os.path.join(os.path.abspath("."), 'dsd-fme-gui-config.json')
+        path = local_config_path if os.path.exists(local_config_path) else CONFIG_FILE
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f: return json.load(f)
+    except json.JSONDecodeError:
+        return {}
+
+def load_aliases(path=ALIASES_FILE):
+    aliases = {'tg': {}, 'id': {}}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f: aliases = json.load(f)
+            aliases.setdefault('tg', {}); aliases.setdefault('id', {})
+        except (json.JSONDecodeError, TypeError): aliases = {'tg': {}, 'id': {}}
+    return aliases
+
+def find_alert(alerts, tg, id, port=None):
+    """Return the first configured alert matching the call, or None."""
+    if not tg or not id:
+        return None
+    for alert in alerts:
+        if ((alert['type'] == 'TG' and alert['value'] == tg) or (alert['type'] == 'ID' and alert['value'] == id)) and (
+            alert.get('port', 0) in (0, port if port is not None else 0)
+        ):
+            return alert
+    return None
+#</editor-fold>
+
+
+#<editor-fold desc="Command Building">
+def audio_device_index(value, kind='input', fallback=None):
+    """Resolve a saved audio device to a sounddevice index, or None.
+
+    ``value`` is a device name as the GUI lists it, optionally followed by
+    " (Default)", or an index (int or digit string). Names are looked up
+    among the devices that have ``kind`` ('input' or 'output') channels, as
+    indexes change when devices are reconnected; ``fallback``, the index
+    saved alongside the name, is used when the name is not found.
+    """
+    fallback = fallback if isinstance(fallback, int) else None
+    if isinstance(value, int): return value
+    if not isinstance(value, str) or not value: return fallback
+    if value.isdigit(): return int(value)
+    if not SOUNDDEVICE_AVAILABLE: return fallback
+    name = value.removesuffix(" (Default)")
+    try:
+        devices = sd.query_devices()
+    except Exception as e:
+        print(f"Could not query audio devices: {e}")
+        return fallback
+    for i, device in enumerate(devices):
+        if device['name'] == name and device[f'max_{kind}_channels'] > 0:
+            return i
+    return fallback
+
+def build_commands(settings, dsd_fme_path, dsd_fme_path2=None, warn=None):
+    """Return one dsd-fme argument list per decoder port.
+
+    ``settings`` uses the keys of the ``ui_settings`` config block: text
+    options map to strings, check boxes and radio buttons to booleans.
+    Problems that only cost the second port are passed to ``warn(title, text)``
+    and clear ``settings['dual_tcp']``; unusable input settings raise ValueError.
+    """
+    warn = warn or (lambda title, text: print(f"{title}: {text}"))
+    if not dsd_fme_path:
+        raise ValueError("DSD-FME path not set!")
+
+    def text(key):
+        value = settings.get(key)
+        return value.strip() if isinstance(value, str) else ""
+
+    in_type = settings.get("-i_type") or "tcp"
+    if in_type == "SDR (beta)":
+        in_type = "rtl"
+    dual = bool(settings.get('dual_tcp')) and in_type == 'tcp'
+    if dual and not dsd_fme_path2:
+        warn("Dual Mode Disabled", "Second DSD-FME path not set. Only Port 1 will run.")
+        settings['dual_tcp'] = False
+        dual = False
+
+    inputs = []
+    if in_type == 'tcp':
+        inputs.append(text('-i_tcp'))
+        if dual:
+            secondary = text('-i_tcp2')
+            if not secondary:
+                warn("Dual TCP Disabled", "Second TCP address is empty. Only one channel will run.")
+                settings['dual_tcp'] = False
+                dual = False
+            else:
+                inputs.append(secondary)
+    else:
+        inputs.append(None)
+
+    common_flags = []
+    for flag in VALUE_FLAGS:
+        value = settings.get(flag)
+        if isinstance(value, str) and value:
+            common_flags.extend([flag, value])
+        elif value is True:
+            common_flags.append(flag)
+
+    for flag in SWITCH_FLAGS:
+        if settings.get(flag) is True:
+            common_flags.append(flag)
+
+    for flag in list(DECODER_MODES) + list(MODULATIONS):
+        if settings.get(flag) is True:
+            common_flags.append(flag)
+
+    per_port_flags = [[], []]
+    for flag in PER_PORT_FLAGS:
+        val1 = settings.get(f"{flag}_1") or ""
+        val2 = settings.get(f"{flag}_2") or ""
+        if val1:
+            per_port_flags[0].extend([flag, val1])
+        if dual:
+            val2 = val2 or val1
+            if val2:
+                per_port_flags[1].extend([flag, val2])
+
+    commands = []
+    for idx, tcp_addr in enumerate(inputs):
+        binary = dsd_fme_path2 if idx == 1 and dual and dsd_fme_path2 else dsd_fme_path
+        cmd = [binary, "-o", f"udp:{UDP_IP}:{UDP_PORT + idx}"]
+        if in_type == 'tcp':
+            # Each command uses a distinct TCP input and UDP output
+            cmd.extend(["-i", f"tcp:{tcp_addr}" if tcp_addr else "tcp"])
+        elif in_type == 'wav':
+            if text('-i_wav'):
+                cmd.extend(["-i", text('-i_wav')])
+        elif in_type == 'm17udp':
+            addr = text('-i_m17udp')
+            cmd.extend(["-i", f"m17udp:{addr}" if addr else "m17udp"])
+        elif in_type == 'audio':
+            dev_index = audio_device_index(settings.get("audio_in_dev"), 'input', settings.get("audio_in_dev_index"))
+            if dev_index is not None:
+                cmd.extend(["-i", f"pa:{dev_index}"])
+            else:
+                raise ValueError("No audio input device selected.")
+        elif in_type == 'rtl':
+            freq_text = text("rtl_freq")
+            if freq_text:
+                try:
+                    freq_val = float(freq_text)
+                except ValueError:
+                    raise ValueError("Invalid frequency value.")
+                unit = settings.get("rtl_unit") or "MHz"
+                freq_map = {"MHz": "M", "KHz": "K", "GHz": "G", "Hz": ""}
+                params = [
+                    "1",
+                    f"{freq_val}{freq_map.get(unit, '')}",
+                    text("rtl_gain"),
+                    text("rtl_ppm"),
+                    text("rtl_bw"),
+                    text("rtl_sq"),
+                    text("rtl_vol"),
+                ]
+                while params and params[-1] == "":
+                    params.pop()
+                cmd.extend(["-i", f"rtl:{':'.join(params)}"])
+            else:
+                cmd.extend(["-i", "rtl:1"])
+        else:
+            cmd.extend(["-i", in_type])
+
+        cmd.extend(common_flags)
+        if idx < len(per_port_flags):
+            cmd.extend(per_port_flags[idx])
+        commands.append(list(filter(None, (str(item).strip() for item in cmd))))
+    return commands
+
+def spawn_decoder(cmd):
+    """Start dsd-fme with its console merged into a text pipe."""
+    kwargs = {}
+    if os.name == 'nt':
+        si = subprocess.STARTUPINFO()
+        si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        si.wShowWindow = subprocess.SW_HIDE
+        kwargs = {'startupinfo': si, 'creationflags': subprocess.CREATE_NO_WINDOW}
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        universal_newlines=True,
+        encoding='utf-8',
+        errors='ignore',
+        **kwargs
+    )
+
+def read_process_lines(process, on_line):
+    """Pass every console line of ``process`` to ``on_line`` until EOF."""
+    if process and process.stdout:
+        for line in iter(process.stdout.readline, ''):
+            on_line(line)
+
+class LineBatcher:
+    """Hands console lines on in batches of at most ``max_lines`` lines,
+    flushed no later than ``max_delay`` seconds after the first one arrived.
+
+    ``add`` is called from the reading thread; ``on_batch`` runs on the
+    batcher's own thread so a slow consumer never blocks the pipe.
+    """
+
+    def __init__(self, on_batch, max_lines=LINE_BATCH_MAX_LINES, max_delay=LINE_BATCH_MAX_DELAY):
+        self.on_batch = on_batch
+        self.max_lines, self.max_delay = max_lines, max_delay
+        self.lines_total = 0; self.batches_total = 0
+        self._pending = []; self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add(self, line):
+        with self._cond:
+            self._pending.append(line)
+            if len(self._pending) == 1 or len(self._pending) >= self.max_lines:
+                self._cond.notify()
+
+    def close(self):
+        """Flush what is pending and stop the batcher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.max_delay
+                while len(self._pending) < self.max_lines and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_lines]
+                del self._pending[:self.max_lines]
+            self.lines_total += len(batch); self.batches_total += 1
+            self.on_batch(batch)
+#</editor-fold>
+
+
+#<editor-fold desc="Terminal Log">
+class TerminalLog:
+    """Console history of one decoder port.
+
+    Only the newest ``line_cap`` lines are kept in memory. Older lines are
+    spilled to a temporary file with one offset per ``TERMINAL_SPILL_BLOCK``
+    lines, so every line of the session can still be read back by its index,
+    searched and saved while memory use stays bounded.
+    """
+
+    def __init__(self, line_cap=TERMINAL_LINE_CAP):
+        self.line_cap = max(1, int(line_cap))
+        self._lines = []; self._spilled = 0
+        self._spill = None; self._offsets = array('q')
+        self._block = (None, [])
+
+    def __len__(self):
+        return self._spilled + len(self._lines)
+
+    def append_lines(self, lines):
+        self._lines.extend(lines)
+        # Spill in chunks of a quarter cap so trimming the list stays amortised O(1).
+        if len(self._lines) > self.line_cap + self.line_cap // 4:
+            self._spill_oldest(len(self._lines) - self.line_cap)
+
+    def set_line_cap(self, line_cap):
+        self.line_cap = max(1, int(line_cap))
+        if len(self._lines) > self.line_cap:
+            self._spill_oldest(len(self._lines) - self.line_cap)
+
+    def line(self, index):
+        if index >= self._spilled:
+            return self._lines[index - self._spilled]
+        block, offset = divmod(index, TERMINAL_SPILL_BLOCK)
+        if self._block[0] != block:
+            self._block = (block, self._read_block(block))
+        return self._block[1][offset]
+
+    def iter_lines(self, start=0):
+        """Yield ``(index, line)`` from ``start`` to the newest line."""
+        index = max(0, start)
+        if index < self._spilled:
+            block = index // TERMINAL_SPILL_BLOCK
+            self._spill.seek(self._offsets[block])
+            pos = block * TERMINAL_SPILL_BLOCK
+            for raw in self._spill:
+                if pos >= self._spilled: break
+                if pos >= index: yield pos, raw[:-1].decode('utf-8', 'replace')
+                pos += 1
+            index = self._spilled
+        for i in range(index - self._spilled, len(self._lines)):
+            yield self._spilled + i, self._lines[i]
+
+    def find(self, needle, start=0):
+        """Index of the next line containing ``needle`` (case-insensitive),
+        wrapping around to the oldest line; -1 when there is none."""
+        needle = needle.lower()
+        if not needle: return -1
+        for index, line in self.iter_lines(start):
+            if needle in line.lower(): return index
+        for index, line in self.iter_lines(0):
+            if index >= start: break
+            if needle in line.lower(): return index
+        return -1
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for _, line in self.iter_lines():
+                f.write(line); f.write("\n")
+
+    def clear(self):
+        self._lines = []; self._spilled = 0
+        self._offsets = array('q'); self._block = (None, [])
+        if self._spill:
+            self._spill.seek(0); self._spill.truncate()
+
+    def close(self):
+        if self._spill:
+            self._spill.close(); self._spill = None
+        self._lines = []; self._spilled = 0
+        self._offsets = array('q'); self._block = (None, [])
+
+    def _spill_oldest(self, count):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix="dsd-terminal-")
+        f = self._spill; f.seek(0, os.SEEK_END); pos = f.tell()
+        chunk = []
+        for i, line in enumerate(self._lines[:count], start=self._spilled):
+            if i % TERMINAL_SPILL_BLOCK == 0: self._offsets.append(pos)
+            raw = line.replace("\n", " ").encode('utf-8', 'replace') + b"\n"
+            chunk.append(raw); pos += len(raw)
+        f.write(b"".join(chunk))
+        del self._lines[:count]
+        self._spilled += count; self._block = (None, [])
+
+    def _read_block(self, block):
+        self._spill.seek(self._offsets[block])
+        count = min(TERMINAL_SPILL_BLOCK, self._spilled - block * TERMINAL_SPILL_BLOCK)
+        return [self._spill.readline()[:-1].decode('utf-8', 'replace') for _ in range(count)]
+#</editor-fold>
+
+
+#<editor-fold desc="Event Parsing">
+class DecoderEvent:
+    """Base of the compact records the parser produces; ``port`` is 0-based."""
+    __slots__ = ('port',)
+
+    def __init__(self, port):
+        self.port = port
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ()))
+        return f"{type(self).__name__}({fields})"
+
+
+class TalkerEvent(DecoderEvent):
+    """Group/source pair of the current transmission (``TGT=`` / ``SRC=``)."""
+    __slots__ = ('tg', 'src')
+
+    def __init__(self, port, tg, src):
+        self.port, self.tg, self.src = port, tg, src
+
+
+class ColorCodeEvent(DecoderEvent):
+    __slots__ = ('cc',)
+
+    def __init__(self, port, cc):
+        self.port, self.cc = port, cc
+
+
+class SyncEvent(DecoderEvent):
+    """Frame sync without voice; ``timestamp`` is the console HH:MM:SS or None."""
+    __slots__ = ('timestamp',)
+
+    def __init__(self, port, timestamp):
+        self.port, self.timestamp = port, timestamp
+
+
+class VoiceEvent(SyncEvent):
+    __slots__ = ()
+
+
+class NoSyncEvent(SyncEvent):
+    __slots__ = ()
+
+
+def _field(text, key):
+    """Value after ``key`` up to the next space, like ``split(key)[1].split(" ")[0]``."""
+    start = text.find(key) + len(key)
+    end = text.find(" ", start)
+    return (text[start:end] if end >= 0 else text[start:]).strip()
+
+def _timestamp(text):
+    """Console ``HH:MM:SS`` at the start of ``text``, or None."""
+    return text[:8] if (len(text) > 8 and text[2] == ':') else None
+
+def parse_line(port, text):
+    """Return the events carried by one dsd-fme console line.
+
+    Lines without ``Sync:`` or ``TGT=`` (payload dumps, banners, ...) are
+    rejected by two substring checks before any field is extracted. Lines
+    that do carry events cost more than the old split-chain scan, since each
+    event is a typed record; readers use ``parse_lines``, which drops those
+    records before they are built.
+    """
+    has_sync = "Sync:" in text
+    if not has_sync and "TGT=" not in text:
+        return ()
+    if "SRC=" in text and "TGT=" in text:
+        return (TalkerEvent(port, _field(text, "TGT="), _field(text, "SRC=")),)
+    if not has_sync:
+        return ()
+    timestamp = _timestamp(text)
+    if "Sync: no sync" in text:
+        event = NoSyncEvent(port, timestamp)
+    elif "VC" in text or "VLC" in text:
+        event = VoiceEvent(port, timestamp)
+    else:
+        event = SyncEvent(port, timestamp)
+    if "Color Code=" in text:
+        return (ColorCodeEvent(port, _field(text, "Color Code=")), event)
+    return (event,)
+
+def parse_lines(port, lines):
+    """Parse a batch of lines, collapsing repeated state.
+
+    One list comprehension drops every line without ``Sync:`` or ``TGT=``
+    before any per-line Python code runs. A colour code equal to the
+    previous one is dropped and a run of sync or voice events keeps only its
+    latest member; a run is held as its class and last line, and only that
+    member is ever built. The call tracker reacts to the result exactly as
+    it would to the full sequence from ``parse_line``.
+    """
+    events = []; append = events.append
+    last_cc = None; cc_key = None; run_cls = run_text = None
+    for text in [line for line in lines if "Sync:" in line or "TGT=" in line]:
+        if "SRC=" in text and "TGT=" in text:
+            if run_cls: append(run_cls(port, _timestamp(run_text))); run_cls = None
+            append(TalkerEvent(port, _field(text, "TGT="), _field(text, "SRC=")))
+            continue
+        if "Sync:" not in text:
+            continue
+        start = text.find("Color Code=")
+        # the common case, the colour code seen last followed by a space, needs no slicing
+        if start >= 0 and not (cc_key and text.startswith(cc_key, start)):
+            start += 11; end = text.find(" ", start)
+            cc = (text[start:end] if end >= 0 else text[start:]).strip()
+            if cc != last_cc:
+                if run_cls: append(run_cls(port, _timestamp(run_text))); run_cls = None
+                append(ColorCodeEvent(port, cc)); last_cc = cc; cc_key = f"Color Code={cc} "
+        if "Sync: no sync" in text:
+            if run_cls: append(run_cls(port, _timestamp(run_text))); run_cls = None
+            append(NoSyncEvent(port, _timestamp(text)))
+            continue
+        cls = VoiceEvent if ("VC" in text or "VLC" in text) else SyncEvent
+        if run_cls is not cls:
+            if run_cls: append(run_cls(port, _timestamp(run_text)))
+            run_cls = cls
+        run_text = text
+    if run_cls: append(run_cls(port, _timestamp(run_text)))
+    return events
+#</editor-fold>
+
+
+#<editor-fold desc="Call Tracking">
+class CallRecord:
+    """One logged transmission on one decoder port."""
+    __slots__ = ('radio_id', 'tg', 'cc', 'channel', 'start_time', 'end_time')
+
+    def __init__(self, radio_id, tg, cc, channel, start_time=None):
+        self.radio_id, self.tg, self.cc, self.channel = radio_id, tg, cc, channel
+        self.start_time = start_time or datetime.now()
+        self.end_time = None
+
+    @property
+    def duration(self):
+        return (self.end_time or datetime.now()) - self.start_time
+
+    def duration_text(self):
+        return str(self.duration).split('.')[0]
+
+
+class CallTracker:
+    """Turns parsed decoder events into call start/end decisions.
+
+    The listener may implement any of ``on_talker(idx, tg, id)``,
+    ``on_color_code(idx, cc)``, ``on_voice(idx, timestamp)``,
+    ``on_sync(idx, timestamp)``, ``on_call_start(call)``, ``on_call_end(call)``
+    and ``on_no_sync(idx)``. Port indexes are 0-based, call channels 1-based.
+    """
+
+    def __init__(self, listener, ports=2):
+        self.listener = listener
+        self.ports = ports
+        self._handlers = {
+            TalkerEvent: self._on_talker, ColorCodeEvent: self._on_color_code,
+            SyncEvent: self._on_sync, VoiceEvent: self._on_voice, NoSyncEvent: self._on_no_sync,
+        }
+        self.reset()
+
+    def reset(self):
+        self.is_in_transmission = [False] * self.ports
+        self.current_tg = [None] * self.ports
+        self.current_id = [None] * self.ports
+        self.current_cc = [None] * self.ports
+        self.last_logged_id = [None] * self.ports
+        # (radio ID, channel) -> open CallRecord, plus the key of each channel's open call
+        self.open_calls = {}; self._open_keys = {}
+
+    def _notify(self, name, *args):
+        handler = getattr(self.listener, name, None)
+        if handler:
+            handler(*args)
+
+    def feed(self, idx, text):
+        for event in parse_line(idx, text):
+            self.handle(event)
+
+    def handle(self, event):
+        self._handlers[type(event)](event)
+
+    def _on_talker(self, event):
+        idx = event.port
+        self.current_tg[idx], self.current_id[idx] = event.tg, event.src
+        self._notify('on_talker', idx, event.tg, event.src)
+
+    def _on_color_code(self, event):
+        self.current_cc[event.port] = event.cc
+        self._notify('on_color_code', event.port, event.cc)
+
+    def _on_voice(self, event):
+        idx = event.port
+        self.is_in_transmission[idx] = True
+        self._notify('on_voice', idx, event.timestamp)
+        if self.current_id[idx] and self.current_id[idx] != self.last_logged_id[idx]:
+            self.end_calls(idx + 1)
+            call = CallRecord(self.current_id[idx], self.current_tg[idx], self.current_cc[idx], idx + 1)
+            key = (call.radio_id, call.channel)
+            self.open_calls[key] = call; self._open_keys[call.channel] = key
+            self.last_logged_id[idx] = self.current_id[idx]
+            self._notify('on_call_start', call)
+
+    def _on_sync(self, event):
+        if not self.is_in_transmission[event.port]:
+            self._notify('on_sync', event.port, event.timestamp)
+
+    def _on_no_sync(self, event):
+        idx = event.port
+        if not self.is_in_transmission[idx]:
+            self._on_sync(event)
+            return
+        self.is_in_transmission[idx] = False
+        self.end_calls(idx + 1)
+        self.current_id[idx] = None
+        self.current_tg[idx] = None
+        self.last_logged_id[idx] = None
+        self._notify('on_no_sync', idx)
+
+    def end_calls(self, channel=None):
+        """Close the open call of one channel (or of all of them)."""
+        end_time = datetime.now()
+        channels = list(self._open_keys) if channel is None else [channel]
+        for ch in channels:
+            key = self._open_keys.pop(ch, None)
+            call = self.open_calls.pop(key, None) if key else None
+            if call:
+                call.end_time = end_time
+                self._notify('on_call_end', call)
+#</editor-fold>
+
+
+#<editor-fold desc="Logbook">
+def format_duration(seconds):
+    """``H:MM:SS`` like ``CallRecord.duration_text``; empty for an open call."""
+    return "" if seconds is None else str(timedelta(seconds=int(seconds)))
+
+
+def parse_duration(text):
+    try:
+        h, m, sec = map(int, text.split(':'))
+        return h * 3600 + m * 60 + sec
+    except (ValueError, AttributeError):
+        return None
+
+
+class Logbook:
+    """Persistent call log in SQLite (WAL), one row per transmission.
+
+    The GUI reads it a page at a time through ``rows``; sorting and the
+    date/text filter are turned into SQL so only the visible window is ever
+    loaded. Every column the logbook can be sorted on is indexed, and the
+    date filter is a range on the indexed ``start`` text
+    (``YYYY-MM-DD HH:MM:SS`` sorts chronologically).
+
+    Text search is split on whitespace and every word must occur,
+    case-insensitively and anywhere inside the value, in at least one of
+    ``LOGBOOK_SEARCH_COLUMNS`` (so "003" finds radio ID 1003); it is a
+    substring match, not a word or prefix match. Words of three or more
+    characters go through ``calls_fts``, a trigram FTS5 index over those
+    columns kept in step with ``calls`` by triggers. Shorter words cannot
+    use trigrams and are checked with LIKE, on the rows the longer words
+    matched or, when every word is short, on the whole table. The ids a
+    search matched are kept in the ``search_hits`` temp table until the
+    text or the log changes, so paging and re-sorting a result probe that
+    table instead of running the search again: a small result is sorted
+    outright, a large one (over ``LOGBOOK_SCAN_HITS``) by walking the sort
+    column's index and probing each row. SQLite builds without FTS5 have no
+    index or ``search_hits`` and check every word with LIKE over the shown
+    columns as well as the searched ones, scanning the table each time.
+
+    Statistics come from aggregate tables rather than ``calls``: each call
+    that gets a duration adds itself to its start hour in ``stats_hourly``
+    and to its day's row in ``stats_tg``/``stats_id`` (calls and airtime),
+    so a date range costs a sum over at most 24 rows per day. Calls without
+    a duration yet (still on air, or imported without one) are read from
+    ``calls`` through the ``duration`` index and counted with no airtime.
+
+    With ``check_same_thread=False`` the connection may be used from several
+    threads as long as the caller serialises the calls, as the headless
+    ``DecoderSession`` does under its lock.
+    """
+
+    def __init__(self, path=LOGBOOK_DB, check_same_thread=True):
+        self.db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("""CREATE TABLE IF NOT EXISTS calls (
+                id INTEGER PRIMARY KEY, start TEXT NOT NULL, end TEXT, duration INTEGER, channel INTEGER,
+                tg TEXT, radio_id TEXT, tg_alias TEXT, id_alias TEXT, cc TEXT,
+                tags TEXT NOT NULL DEFAULT '', notes TEXT NOT NULL DEFAULT '')""")
+            for column in LOGBOOK_COLUMNS[:7]:
+                self.db.execute(f"CREATE INDEX IF NOT EXISTS idx_calls_{column} ON calls({column})")
+            stats_exist = self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'stats_hourly'").fetchone()
+            self.db.execute("CREATE TABLE IF NOT EXISTS stats_hourly (hour TEXT PRIMARY KEY, calls INTEGER NOT NULL, airtime INTEGER NOT NULL)")
+            for key in ("tg", "radio_id"):
+                self.db.execute(f"""CREATE TABLE IF NOT EXISTS stats_{key.replace('radio_', '')} (day TEXT NOT NULL, {key} TEXT NOT NULL,
+                    calls INTEGER NOT NULL, airtime INTEGER NOT NULL, PRIMARY KEY (day, {key}))""")
+            if not stats_exist:
+                self.rebuild_stats()
+        self.fts = self._create_fts(); self._search_query = None; self._hits = 0
+        if self.fts:
+            self.db.execute("CREATE TEMP TABLE search_hits (id INTEGER PRIMARY KEY)")
+
+    def _create_fts(self):
+        columns = ", ".join(LOGBOOK_SEARCH_COLUMNS)
+        new, old = (", ".join(f"{prefix}.{c}" for c in LOGBOOK_SEARCH_COLUMNS) for prefix in ("new", "old"))
+        table = self.db.execute("SELECT sql FROM sqlite_master WHERE name = 'calls_fts'").fetchone()
+        exists = table and "trigram" in table[0]
+        try:
+            with self.db:
+                if table and not exists:
+                    self.db.execute("DROP TABLE calls_fts")
+                self.db.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS calls_fts USING fts5({columns},
+                    content='calls', content_rowid='id', tokenize='trigram')""")
+                self.db.execute(f"""CREATE TRIGGER IF NOT EXISTS calls_fts_insert AFTER INSERT ON calls BEGIN
+                    INSERT INTO calls_fts(rowid, {columns}) VALUES (new.id, {new}); END""")
+                self.db.execute(f"""CREATE TRIGGER IF NOT EXISTS calls_fts_delete AFTER DELETE ON calls BEGIN
+                    INSERT INTO calls_fts(calls_fts, rowid, {columns}) VALUES ('delete', old.id, {old}); END""")
+                self.db.execute(f"""CREATE TRIGGER IF NOT EXISTS calls_fts_update AFTER UPDATE OF {columns} ON calls BEGIN
+                    INSERT INTO calls_fts(calls_fts, rowid, {columns}) VALUES ('delete', old.id, {old});
+                    INSERT INTO calls_fts(rowid, {columns}) VALUES (new.id, {new}); END""")
+                if not exists:
+                    self.db.execute("INSERT INTO calls_fts(calls_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, using plain search: {e}")
+            with self.db:
+                for trigger in ("insert", "delete", "update"):
+                    self.db.execute(f"DROP TRIGGER IF EXISTS calls_fts_{trigger}")
+                self.db.execute("DROP TABLE IF EXISTS calls_fts")
+            return False
+
+    def add_call(self, call, tg_alias, id_alias):
+        """Insert an open call; returns its row id."""
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO calls (start, channel, tg, radio_id, tg_alias, id_alias, cc) VALUES (?,?,?,?,?,?,?)",
+                (call.start_time.strftime("%Y-%m-%d %H:%M:%S"), call.channel, call.tg, call.radio_id, tg_alias, id_alias, call.cc or "N/A"))
+        self._rematch(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def set_end(self, row_id, call):
+        duration = int(call.duration.total_seconds())
+        with self.db:
+            self.db.execute("UPDATE calls SET end = ?, duration = ? WHERE id = ?",
+                            (call.end_time.strftime("%Y-%m-%d %H:%M:%S"), duration, row_id))
+            self._aggregate([(call.start_time.strftime("%Y-%m-%d %H:%M:%S"), duration, call.tg, call.radio_id)])
+
+    def _aggregate(self, calls):
+        """Add ``(start, duration, tg, radio_id)`` calls to the statistics tables; run inside a transaction."""
+        calls = [c for c in calls if c[1] is not None]
+        self.db.executemany("""INSERT INTO stats_hourly VALUES (?, 1, ?)
+            ON CONFLICT(hour) DO UPDATE SET calls = calls + 1, airtime = airtime + excluded.airtime""",
+                            [(start[:13], duration) for start, duration, _, _ in calls])
+        for table, key, position in (("stats_tg", "tg", 2), ("stats_id", "radio_id", 3)):
+            self.db.executemany(f"""INSERT INTO {table} VALUES (?, ?, 1, ?)
+                ON CONFLICT(day, {key}) DO UPDATE SET calls = calls + 1, airtime = airtime + excluded.airtime""",
+                                [(c[0][:10], c[position], c[1]) for c in calls if c[position] is not None])
+
+    def rebuild_stats(self):
+        """Recompute the statistics tables from every call that has a duration."""
+        with self.db:
+            for table in ("stats_hourly", "stats_tg", "stats_id"):
+                self.db.execute(f"DELETE FROM {table}")
+            self.db.execute("""INSERT INTO stats_hourly SELECT substr(start, 1, 13), COUNT(*), SUM(duration) FROM calls
+                WHERE duration IS NOT NULL GROUP BY 1""")
+            for table, key in (("stats_tg", "tg"), ("stats_id", "radio_id")):
+                self.db.execute(f"""INSERT INTO {table} SELECT substr(start, 1, 10), {key}, COUNT(*), SUM(duration) FROM calls
+                    WHERE duration IS NOT NULL AND {key} IS NOT NULL GROUP BY 1, 2""")
+
+    def set_field(self, row_id, column, value):
+        if column not in ("tags", "notes"):
+            raise ValueError(f"{column} is not editable")
+        with self.db:
+            self.db.execute(f"UPDATE calls SET {column} = ? WHERE id = ?", (value, row_id))
+        self._rematch(row_id)
+
+    def import_rows(self, rows):
+        """Append rows laid out like ``LOGBOOK_HEADER`` (e.g. from a CSV export).
+
+        Rows with the wrong number of columns, or whose start, end or
+        duration does not parse, are skipped. Returns ``(imported, skipped)``.
+        """
+        records = []; skipped = 0
+        for row in rows:
+            if len(row) != len(LOGBOOK_HEADER):
+                skipped += 1; continue
+            start, end, duration, port, tg_alias, id_alias, cc, tags, notes = row
+            seconds = parse_duration(duration) if duration else None
+            try:
+                datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+                if end: datetime.strptime(end, "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                skipped += 1; continue
+            if duration and seconds is None:
+                skipped += 1; continue
+            records.append((start, end or None, seconds, int(port) if port.isdigit() else None,
+                            tg_alias, id_alias, cc, tags, notes))
+        with self.db:
+            self.db.executemany("""INSERT INTO calls (start, end, duration, channel, tg_alias, id_alias, cc, tags, notes)
+                VALUES (?,?,?,?,?,?,?,?,?)""", records)
+            self._aggregate([(r[0], r[2], None, None) for r in records])
+        self._search_query = None
+        return len(records), skipped
+
+    def _search(self, words):
+        long_words = [w for w in words if len(w) >= 3]
+        clauses, args = [], []
+        if long_words:
+            clauses.append("id IN (SELECT rowid FROM calls_fts WHERE calls_fts MATCH ?)")
+            args.append(" ".join('"' + word.replace('"', '""') + '"' for word in long_words))
+        for word in words:
+            if len(word) < 3:
+                clauses.append("(" + " OR ".join(f"{column} LIKE ?" for column in LOGBOOK_SEARCH_COLUMNS) + ")")
+                args.extend([f"%{word}%"] * len(LOGBOOK_SEARCH_COLUMNS))
+        if len(clauses) == 1 and long_words:
+            search = ("SELECT rowid FROM calls_fts WHERE calls_fts MATCH ?", args, "rowid")
+        else:
+            search = ("SELECT id FROM calls WHERE " + " AND ".join(clauses), args, "id")
+        if search != self._search_query:
+            with self.db:
+                self.db.execute("DELETE FROM search_hits")
+                self._hits = self.db.execute(f"INSERT INTO search_hits {search[0]}", search[1]).rowcount
+            self._search_query = search
+        return self._hits
+
+    def _rematch(self, row_id):
+        """Bring one call's entry in ``search_hits`` up to date after it was inserted or edited."""
+        if self._search_query is None: return
+        with self.db:
+            self._hits -= self.db.execute("DELETE FROM search_hits WHERE id = ?", (row_id,)).rowcount
+            sql, args, id_column = self._search_query
+            self._hits += self.db.execute(f"INSERT INTO search_hits {sql} AND {id_column} = ?", args + [row_id]).rowcount
+
+    def _where(self, start_date=None, end_date=None, text=None, order=None):
+        clauses, args = [], []
+        if start_date:
+            clauses.append("start >= ?"); args.append(f"{start_date:%Y-%m-%d}")
+        if end_date:
+            clauses.append("start < ?"); args.append(f"{end_date + timedelta(days=1):%Y-%m-%d}")
+        words = text.split() if text else []
+        if words and self.fts:
+            if self._search(words) > LOGBOOK_SCAN_HITS and order in LOGBOOK_COLUMNS[:7]:
+                clauses.append("EXISTS (SELECT 1 FROM search_hits WHERE search_hits.id = calls.id)")
+            else:
+                clauses.append("id IN (SELECT id FROM search_hits)")
+        elif words:
+            # every word somewhere in a shown or searchable column, as with the index
+            columns = LOGBOOK_COLUMNS + [c for c in LOGBOOK_SEARCH_COLUMNS if c not in LOGBOOK_COLUMNS]
+            for word in words:
+                clauses.append("(" + " OR ".join(f"{column} LIKE ?" for column in columns) + ")")
+                args.extend([f"%{word}%"] * len(columns))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def count(self, **filters):
+        where, args = self._where(**filters)
+        return self.db.execute(f"SELECT COUNT(*) FROM calls{where}", args).fetchone()[0]
+
+    def matches(self, row_id, **filters):
+        where, args = self._where(**filters)
+        where = (where + " AND" if where else " WHERE") + " id = ?"
+        return self.db.execute(f"SELECT 1 FROM calls{where}", args + [row_id]).fetchone() is not None
+
+    def rows(self, order="start", descending=True, offset=0, limit=LOGBOOK_PAGE_SIZE, **filters):
+        """``(id, *LOGBOOK_COLUMNS)`` tuples for one page of the filtered, sorted log."""
+        if order not in LOGBOOK_COLUMNS:
+            raise ValueError(f"cannot sort by {order}")
+        where, args = self._where(order=order, **filters)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT id, {', '.join(LOGBOOK_COLUMNS)} FROM calls{where} ORDER BY {order} {direction}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"; args = args + [limit, offset]
+        return self.db.execute(sql, args)
+
+    def row(self, row_id):
+        return self.db.execute(f"SELECT id, {', '.join(LOGBOOK_COLUMNS)} FROM calls WHERE id = ?", (row_id,)).fetchone()
+
+    def stats(self, start_date, end_date, top=10):
+        """Totals, busiest TGs/IDs as ``(key, calls, airtime)`` and ``(hour timestamp, calls)`` pairs for the statistics tab."""
+        first = f"{start_date:%Y-%m-%d}" if start_date else ""
+        last = f"{end_date + timedelta(days=1):%Y-%m-%d}" if end_date else "9999"
+        # calls without a duration are not in the aggregates yet; count them from the calls table
+        pending = "FROM calls WHERE duration IS NULL AND start >= ? AND start < ?"
+        args = (first, last, first, last)
+        total, airtime = self.db.execute(f"""SELECT COALESCE(SUM(calls), 0), COALESCE(SUM(airtime), 0) FROM (
+            SELECT calls, airtime FROM stats_hourly WHERE hour >= ? AND hour < ? UNION ALL SELECT 1, 0 {pending})""", args).fetchone()
+        def busiest(table, key):
+            return self.db.execute(f"""SELECT key, SUM(calls), SUM(airtime) FROM (
+                SELECT {key} AS key, calls, airtime FROM {table} WHERE day >= ? AND day < ?
+                UNION ALL SELECT {key}, 1, 0 {pending} AND {key} IS NOT NULL)
+                GROUP BY key ORDER BY 2 DESC LIMIT ?""", args + (top,)).fetchall()
+        hours = self.db.execute(f"""SELECT CAST(strftime('%s', hour || ':00', 'utc') AS INTEGER), SUM(calls) FROM (
+            SELECT hour, calls FROM stats_hourly WHERE hour >= ? AND hour < ? UNION ALL SELECT substr(start, 1, 13), 1 {pending})
+            GROUP BY hour ORDER BY hour""", args).fetchall()
+        return {'total_calls': total, 'airtime': airtime, 'tg': busiest('stats_tg', 'tg'), 'id': busiest('stats_id', 'radio_id'), 'hours': hours}
+
+    def close(self):
+        self.db.close()
+#</editor-fold>
+
+
+#<editor-fold desc="Audio">
+class PacketStats:
+    """Plain integer counters for one UDP audio channel, bumped by the receiving thread.
+
+    A *gap* is a pause longer than ``UDP_GAP_SECONDS`` (dsd-fme stops sending
+    between calls); a *late* packet arrived more than ``UDP_LATE_FACTOR`` times
+    the previous packet's audio duration after it, without being a gap.
+    """
+    __slots__ = ('packets', 'bytes', 'gaps', 'late', '_last_arrival', '_expected')
+
+    def __init__(self):
+        self.packets = self.bytes = self.gaps = self.late = 0
+        self._last_arrival = None; self._expected = 0.0
+
+    def record(self, nbytes, now):
+        self.packets += 1; self.bytes += nbytes
+        if self._last_arrival is not None:
+            delta = now - self._last_arrival
+            if delta > UDP_GAP_SECONDS: self.gaps += 1
+            elif delta > self._expected * UDP_LATE_FACTOR: self.late += 1
+        self._last_arrival = now
+        self._expected = nbytes / (np.dtype(AUDIO_DTYPE).itemsize * AUDIO_RATE)
+
+class PacketRing:
+    """Preallocated int16 slots, one datagram each, that the UDP thread receives straight into.
+
+    Single producer (``receive``) and single consumer (``drain``). The
+    producer never waits: when the consumer falls more than ``slots - 1``
+    packets behind, the oldest packets are skipped and counted in ``dropped``.
+    Slices handed out by ``drain`` are views into the ring and stay valid
+    until the producer laps them, so consumers must not hold on to them.
+    """
+
+    def __init__(self, slots=UDP_RING_SLOTS, slot_samples=CHUNK_SAMPLES):
+        self.samples = np.zeros((slots, slot_samples), dtype=AUDIO_DTYPE)
+        self.lengths = [0] * slots
+        self._views = [memoryview(row).cast('B') for row in self.samples]
+        self.written = 0; self.read = 0; self.dropped = 0
+        self.signalled = False
+
+    def receive(self, sock):
+        slot = self.written % len(self.lengths)
+        nbytes = sock.recv_into(self._views[slot])
+        self.lengths[slot] = nbytes // self.samples.itemsize
+        self.written += 1
+        return nbytes
+
+    def drain(self):
+        """Yield the int16 samples of every packet received since the last drain."""
+        self.signalled = False
+        slots = len(self.lengths)
+        while self.read < self.written:
+            behind = self.written - self.read
+            if behind >= slots:
+                self.dropped += behind - slots + 1; self.read += behind - slots + 1
+            slot = self.read % slots
+            self.read += 1
+            if self.lengths[slot]:
+                yield self.samples[slot, :self.lengths[slot]]
+
+class UdpReceiver:
+    """Receives the raw PCM datagrams dsd-fme sends to one UDP port into a PacketRing.
+
+    ``on_data(channel)`` carries no payload; it is called once when packets
+    become available and again only after the consumer has drained the ring.
+    """
+
+    def __init__(self, ip, port, channel, on_data, on_error=None):
+        self.ip, self.port, self.channel = ip, port, channel
+        self.on_data, self.on_error = on_data, on_error
+        self.stats = PacketStats()
+        self.ring = PacketRing()
+        self.running = True
+
+    def run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.bind((self.ip, self.port))
+            sock.settimeout(UDP_RECV_TIMEOUT)
+        except OSError as e:
+            sock.close()
+            if self.on_error:
+                self.on_error(self.channel, f"ERROR: Port {self.port} is already in use. {e}")
+            return
+        ring = self.ring
+        while self.running:
+            try:
+                nbytes = ring.receive(sock)
+            except socket.timeout:
+                continue
+            if nbytes:
+                self.stats.record(nbytes, time.monotonic())
+                if not ring.signalled:
+                    ring.signalled = True
+                    self.on_data(self.channel)
+        sock.close()
+
+
+class WavRecorder:
+    """Per-channel voice-activated WAV recordings, written on a background thread.
+
+    ``start``, ``write`` and ``stop`` only queue work, so a slow disk or
+    network share never stalls the caller. The writer thread owns the files:
+    it coalesces queued audio per channel into ``RECORD_FLUSH_BYTES`` chunks
+    (or flushes after ``RECORD_IDLE_FLUSH`` seconds of quiet), writes into a
+    ``.part`` file and renames it to the final name once closed. The queue is
+    bounded; audio that does not fit is dropped and counted rather than
+    blocking the audio path.
+
+    ``stats()`` reports queue depth, dropped blocks and flush latency. With a
+    ``catalog`` every finished file is added to it, with its duration and RMS
+    level measured by the writer as the audio goes past, and then
+    ``on_cataloged(path)`` is called on the writer thread.
+
+    ``layout`` (a ``RECORD_LAYOUTS`` key) applies from the next ``start``:
+    "stereo" keeps the legacy 2-channel files, "mono" stores each port's own
+    audio as a 1-channel stream; ``export_stereo`` builds the stereo mixdown
+    from those when it is needed. ``codec`` (a ``RECORD_CODECS`` key) picks
+    plain WAV or a compressed format, which the writer thread encodes as the
+    chunks arrive.
+    """
+
+    def __init__(self, layout="stereo", codec="wav", catalog=None, on_cataloged=None):
+        self.catalog = catalog; self.on_cataloged = on_cataloged
+        self.wav_files = {1: None, 2: None}
+        self.mono = {1: False, 2: False}
+        self.set_layout(layout)
+        self.set_codec(codec)
+        self._queue = queue.Queue(maxsize=RECORD_QUEUE_SIZE)
+        self.max_depth = 0; self.dropped = 0; self.bytes_written = 0
+        self.last_write_ms = 0.0; self.max_write_ms = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def set_layout(self, layout):
+        """Accepts a ``RECORD_LAYOUTS`` key or its label."""
+        self.layout = next((key for key, label in RECORD_LAYOUTS.items() if layout in (key, label)), "stereo")
+
+    def set_codec(self, codec):
+        """Accepts a ``RECORD_CODECS`` key or its label; falls back to WAV when it cannot be encoded here."""
+        codecs = available_codecs()
+        self.codec = next((key for key, entry in codecs.items() if codec in (key, entry[0])), "wav")
+
+    def is_recording(self, channel):
+        return self.wav_files.get(channel) is not None
+
+    def is_mono(self, channel):
+        return self.is_recording(channel) and self.mono[channel]
+
+    def start(self, channel, rec_dir, id_, tg=None, cc=None):
+        """Queue a new recording for ``channel`` and return its final path, or None."""
+        self.stop(channel)
+        if not rec_dir or not os.path.isdir(rec_dir):
+            return None
+        _id = str(id_).replace('/', '-')
+        codec = self.codec
+        filepath = os.path.join(rec_dir, datetime.now().strftime("%Y-%m-%d_%H%M%S") + f"_ch{channel}_ID_{_id}" + RECORD_CODECS[codec][1])
+        self.mono[channel] = self.layout == "mono"
+        self.wav_files[channel] = filepath
+        info = {'channel': channel, 'tg': tg, 'radio_id': id_, 'cc': cc, 'start': datetime.now()}
+        self._queue.put(('open', channel, (filepath, 1 if self.mono[channel] else WAV_CHANNELS, codec, info)))
+        return filepath
+
+    def write(self, channel, frames):
+        if not self.wav_files.get(channel):
+            return
+        try:
+            self._queue.put_nowait(('write', channel, frames.astype(AUDIO_DTYPE, copy=False).tobytes()))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def stop(self, channel=None):
+        channels = [channel] if channel else list(self.wav_files.keys())
+        for ch in channels:
+            if self.wav_files.get(ch):
+                self._queue.put(('close', ch, None))
+            self.wav_files[ch] = None
+
+    def close(self, timeout=5):
+        """Finish every recording and stop the writer thread."""
+        self.stop()
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def stats(self):
+        return {'depth': self._queue.qsize(), 'max_depth': self.max_depth, 'dropped': self.dropped,
+                'bytes': self.bytes_written, 'write_ms': self.last_write_ms, 'max_write_ms': self.max_write_ms}
+
+    def _run(self):
+        files = {}; pending = {}
+        while True:
+            try:
+                item = self._queue.get(timeout=RECORD_IDLE_FLUSH)
+            except queue.Empty:
+                for ch in list(pending):
+                    self._flush(files, pending, ch)
+                continue
+            if item is None:
+                for ch in list(files):
+                    self._close(files, pending, ch)
+                return
+            op, ch, payload = item
+            if op == 'write':
+                if ch in files:
+                    buf = pending.setdefault(ch, bytearray())
+                    buf += payload
+                    if len(buf) >= RECORD_FLUSH_BYTES:
+                        self._flush(files, pending, ch)
+            elif op == 'open':
+                self._close(files, pending, ch)
+                self._open(files, ch, *payload)
+            elif op == 'close':
+                self._close(files, pending, ch)
+
+    def _open(self, files, ch, filepath, nchannels, codec, info):
+        part = filepath + ".part"
+        _, _, fmt, subtype = RECORD_CODECS[codec]
+        try:
+            raw = open(part, 'wb', buffering=RECORD_FLUSH_BYTES)
+            if fmt:
+                out = sf.SoundFile(raw, 'w', samplerate=AUDIO_RATE, channels=nchannels, format=fmt, subtype=subtype)
+            else:
+                out = wave.open(raw, 'wb')
+                out.setnchannels(nchannels)
+                out.setsampwidth(WAV_SAMPWIDTH)
+                out.setframerate(AUDIO_RATE)
+        except Exception as e:
+            print(f"Error starting recording: {e}")
+            return
+        info['frames'] = 0; info['sumsq'] = 0.0
+        files[ch] = (out, raw, part, filepath, nchannels, info)
+
+    def _flush(self, files, pending, ch):
+        data = pending.pop(ch, None)
+        if not data or ch not in files:
+            return
+        out, nchannels, info = files[ch][0], files[ch][4], files[ch][5]
+        samples = np.frombuffer(data, dtype=AUDIO_DTYPE)
+        info['frames'] += len(samples) // nchannels
+        info['sumsq'] += float(np.dot(samples, samples.astype(np.float64)))
+        began = time.perf_counter()
+        try:
+            if isinstance(out, wave.Wave_write):
+                # raw frames: the header is patched once, on close
+                out.writeframesraw(data)
+            else:
+                out.write(samples.reshape(-1, nchannels))
+        except Exception as e:
+            print(f"Error writing recording: {e}")
+            return
+        self.last_write_ms = (time.perf_counter() - began) * 1000
+        self.max_write_ms = max(self.max_write_ms, self.last_write_ms)
+        self.bytes_written += len(data)
+
+    def _close(self, files, pending, ch):
+        self._flush(files, pending, ch)
+        entry = files.pop(ch, None)
+        if not entry:
+            return
+        out, raw, part, filepath, nchannels, info = entry
+        try:
+            out.close(); raw.close()
+            os.replace(part, filepath)
+        except Exception as e:
+            print(f"Error closing wav file: {e}")
+            return
+        if self.catalog:
+            samples = info['frames'] * nchannels
+            rms = (info['sumsq'] / samples) ** 0.5 / 32768.0 if samples else 0.0
+            try:
+                self.catalog.add(filepath, info['channel'], info['tg'], info['radio_id'], info['cc'],
+                                 info['start'], info['frames'] / AUDIO_RATE, rms)
+            except sqlite3.Error as e:
+                print(f"Could not catalog recording: {e}")
+                return
+            if self.on_cataloged:
+                self.on_cataloged(filepath)
+
+
+def available_codecs():
+    """``RECORD_CODECS`` entries this installation can encode."""
+    if not SOUNDFILE_AVAILABLE:
+        return {"wav": RECORD_CODECS["wav"]}
+    return {key: entry for key, entry in RECORD_CODECS.items()
+            if entry[2] is None or entry[3] in sf.available_subtypes(entry[2])}
+
+
+def read_recording(path):
+    """Frames (samples x channels, int16) and sample rate of a WAV or compressed recording."""
+    if os.path.splitext(path)[1].lower() == ".wav":
+        with wave.open(path, 'rb') as wav:
+            nchannels = wav.getnchannels()
+            return np.frombuffer(wav.readframes(wav.getnframes()), dtype=AUDIO_DTYPE).reshape(-1, nchannels), wav.getframerate()
+    if not SOUNDFILE_AVAILABLE:
+        raise RuntimeError("reading compressed recordings needs the soundfile package")
+    return sf.read(path, dtype='int16', always_2d=True)
+
+
+def recording_channel(path):
+    """Port number encoded in a recording's file name, or None."""
+    match = re.search(r"_ch(\d)_", os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def export_stereo(paths, out_path):
+    """Mix one or two recordings down to a stereo WAV, port 1 left and port 2 right.
+
+    Each input goes to the column of the port in its file name (in the given
+    order when that is missing or ambiguous). Multi-channel inputs are summed
+    to mono first, so legacy stereo files export unchanged.
+    """
+    paths = list(paths)[:2]
+    columns = [recording_channel(p) for p in paths]
+    if None in columns or len(set(columns)) < len(columns) or not set(columns) <= {1, 2}:
+        columns = [1, 2][:len(paths)]
+    tracks = []
+    for path in paths:
+        data, _ = read_recording(path)
+        tracks.append(np.clip(data.sum(axis=1, dtype=np.int32), -32768, 32767).astype(AUDIO_DTYPE))
+    frames = np.zeros((max((len(t) for t in tracks), default=0), 2), dtype=AUDIO_DTYPE)
+    for col, track in zip(columns, tracks):
+        frames[:len(track), col - 1] = track
+    with wave.open(out_path, 'wb') as wav:
+        wav.setnchannels(2); wav.setsampwidth(WAV_SAMPWIDTH); wav.setframerate(AUDIO_RATE)
+        wav.writeframes(frames.tobytes())
+    return len(frames)
+
+
+class JitterBuffer:
+    """Fixed-capacity single-producer/single-consumer sample ring for one channel.
+
+    The producer only advances ``_write`` and counts overruns (writes that do
+    not fit are cut); everything else, ``_read``, ``target`` and the underrun
+    count included, belongs to the consumer, so no lock is needed.
+
+    ``pull`` is the paced consumer side: it waits until ``target`` samples are
+    queued before playing, and when it runs dry and sees audio again within
+    ``UDP_GAP_SECONDS`` (late packets rather than the end of a call) it counts
+    an underrun and doubles the target. After ``JITTER_RELAX_SAMPLES`` without
+    one the target shrinks again, and a backlog well above the target is
+    skipped so latency cannot creep up.
+    """
+
+    def __init__(self, capacity=AUDIO_BUFFER_SAMPLES, min_target=JITTER_TARGET_MIN, max_target=JITTER_TARGET_MAX):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=AUDIO_DTYPE)
+        self._write = 0; self._read = 0
+        self.min_target, self.max_target = min_target, max_target
+        self.target = min_target
+        self.underruns = 0; self.overruns = 0
+        self._primed = False; self._stable = 0; self._starved_at = None
+
+    def available(self):
+        return self._write - self._read
+
+    def write(self, samples):
+        n = len(samples); free = self.capacity - (self._write - self._read)
+        if n > free:
+            self.overruns += 1; n = free
+        pos = self._write % self.capacity; first = min(n, self.capacity - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[:n - first] = samples[first:n]
+        self._write += n
+        return n
+
+    def read_into(self, out):
+        """Copy up to ``len(out)`` queued samples into ``out``; returns the count."""
+        n = min(len(out), self._write - self._read)
+        pos = self._read % self.capacity; first = min(n, self.capacity - pos)
+        out[:first] = self._data[pos:pos + first]
+        out[first:n] = self._data[:n - first]
+        self._read += n
+        return n
+
+    def pull(self, out):
+        """Fill ``out`` for playback, padding with silence; returns the samples played."""
+        queued = self._write - self._read
+        if self._starved_at is not None and queued:
+            if time.monotonic() - self._starved_at < UDP_GAP_SECONDS:
+                self.underruns += 1; self.target = min(self.max_target, self.target * 2)
+            self._starved_at = None
+        if not self._primed:
+            if queued < self.target:
+                out[:] = 0; return 0
+            self._primed = True
+        if queued > 2 * self.target + len(out):
+            self._read += queued - self.target
+        n = self.read_into(out)
+        if n < len(out):
+            out[n:] = 0
+            self._primed = False; self._stable = 0; self._starved_at = time.monotonic()
+        else:
+            self._stable += n
+            if self._stable >= JITTER_RELAX_SAMPLES:
+                self._stable = 0; self.target = max(self.min_target, self.target * 3 // 4)
+        return n
+
+    def clear(self):
+        self._read = self._write
+        self._primed = False; self._stable = 0; self._starved_at = None
+
+
+class AudioRouter:
+    """Sends decoded port audio to the output device(s) and the recorder.
+
+    In dual mode each port plays on its own mono stream; otherwise both ports
+    are interleaved into one stereo stream (port 1 left, port 2 right).
+
+    ``route`` only queues samples in one JitterBuffer per channel. The output
+    streams run in callback mode and pull from those rings on the audio
+    thread, applying volume and mute there, so playback timing does not
+    depend on whoever calls ``route``. Recording stays on the routing side,
+    using a second pair of rings to interleave stereo frames into
+    preallocated buffers; mono-layout recordings get each port's samples
+    as they are.
+    """
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+        self.volume = 1.0
+        self.muted = {1: False, 2: False}
+        self.dual = False
+        self.output_stream = None; self.output_streams = {}
+        self._lock = threading.Lock()
+        self._playing = set()
+        self.buffers = {1: JitterBuffer(), 2: JitterBuffer()}
+        self.record_buffers = {1: JitterBuffer(), 2: JitterBuffer()}
+        self._frames = np.zeros((AUDIO_BUFFER_SAMPLES, 2), dtype=AUDIO_DTYPE)
+        # callback scratch, one set per channel since dual-mode streams may call back concurrently
+        self._pulled = {ch: np.zeros(AUDIO_BUFFER_SAMPLES, dtype=AUDIO_DTYPE) for ch in (1, 2)}
+        self._scaled = {ch: np.zeros(AUDIO_BUFFER_SAMPLES, dtype=np.float32) for ch in (1, 2)}
+        self.reset_buffers()
+
+    def reset_buffers(self):
+        for buf in list(self.buffers.values()) + list(self.record_buffers.values()):
+            buf.clear()
+
+    def open_streams(self, dual, devices):
+        """(Re)open the output streams; ``devices`` maps channel to device index."""
+        self.close_streams()
+        self.dual = dual
+        self.reset_buffers()
+        if not SOUNDDEVICE_AVAILABLE:
+            return
+        try:
+            if dual:
+                for ch in (1, 2):
+                    device = devices.get(ch)
+                    if device is None:
+                        continue
+                    stream = sd.OutputStream(samplerate=AUDIO_RATE, device=device, channels=1, dtype=AUDIO_DTYPE,
+                                             blocksize=CHUNK_SAMPLES, callback=self._mono_callback(ch))
+                    stream.start()
+                    self.output_streams[ch] = stream
+                    self._playing.add(ch)
+            else:
+                self.output_stream = sd.OutputStream(samplerate=AUDIO_RATE, device=devices.get(1), channels=2, dtype=AUDIO_DTYPE,
+                                                     blocksize=CHUNK_SAMPLES, callback=self._stereo_callback)
+                self.output_stream.start()
+                self._playing.update((1, 2))
+        except Exception as e:
+            print(f"Error opening audio stream: {e}")
+
+    def close_streams(self):
+        self._playing.clear()
+        for stream in self.output_streams.values():
+            try:
+                stream.stop(); stream.close()
+            except Exception:
+                pass
+        self.output_streams = {}
+        if self.output_stream:
+            try:
+                self.output_stream.stop(); self.output_stream.close()
+            except Exception:
+                pass
+            self.output_stream = None
+
+    def route(self, channel, samples):
+        with self._lock:
+            if channel in self._playing:
+                self.buffers[channel].write(samples)
+            if not self.recorder:
+                return
+            if self.recorder.is_mono(channel):
+                self.recorder.write(channel, samples)
+            if self.dual:
+                self._record_dual(channel, samples)
+            else:
+                self.record_buffers[channel].write(samples)
+                self._record_stereo()
+
+    def _record_dual(self, channel, samples):
+        if not self.recorder.is_recording(channel) or self.recorder.is_mono(channel):
+            return
+        col = channel - 1
+        for start in range(0, len(samples), len(self._frames)):
+            chunk = samples[start:start + len(self._frames)]
+            frames = self._frames[:len(chunk)]
+            frames[:, col] = chunk; frames[:, 1 - col] = 0
+            self.recorder.write(channel, frames)
+
+    def _record_stereo(self):
+        left, right = self.record_buffers[1], self.record_buffers[2]
+        recording = [ch for ch in (1, 2) if self.recorder.is_recording(ch) and not self.recorder.is_mono(ch)]
+        while left.available() or right.available():
+            # equal windows from both rings; a port with nothing queued is padded with silence
+            if left.available() and right.available():
+                frames = self._frames[:min(left.available(), right.available(), len(self._frames))]
+                left.read_into(frames[:, 0]); right.read_into(frames[:, 1])
+            else:
+                buf, col = (left, 0) if left.available() else (right, 1)
+                frames = self._frames[:min(buf.available(), len(self._frames))]
+                frames[:, 1 - col] = 0
+                buf.read_into(frames[:, col])
+            for ch in recording:
+                self.recorder.write(ch, frames)
+
+    def _mono_callback(self, channel):
+        def callback(outdata, frames, time_info, status):
+            self._play(channel, outdata[:, 0])
+        return callback
+
+    def _stereo_callback(self, outdata, frames, time_info, status):
+        self._play(1, outdata[:, 0]); self._play(2, outdata[:, 1])
+
+    def _play(self, channel, out):
+        """Fill one output column from the channel's ring (audio thread)."""
+        n = len(out); pulled = self._pulled[channel][:n]
+        self.buffers[channel].pull(pulled)
+        if self.muted.get(channel):
+            out[:] = 0
+            return
+        scaled = self._scaled[channel][:n]
+        np.multiply(pulled, self.volume, out=scaled)
+        np.clip(scaled, -32768, 32767, out=scaled)
+        out[:] = scaled
+#</editor-fold>
+
+
+#<editor-fold desc="Recordings Catalog">
+RECORDING_NAME = re.compile(r"^(\d{4}-\d{2}-\d{2}_\d{6})_ch(\d)_ID_(.*)$")
+
+
+class RecordingCatalog:
+    """SQLite index of finished recordings, so listing them never rescans a directory.
+
+    Rows are added by the recorder's writer thread as each file is closed and
+    read in pages by the GUI; the connection is shared behind a lock. Queries
+    filter on the directory and order by start time, both covered by
+    ``idx_recordings_dir_start``.
+    """
+
+    def __init__(self, path=RECORDINGS_DB):
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS recordings (
+                id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, dir TEXT NOT NULL, channel INTEGER,
+                tg TEXT, radio_id TEXT, cc TEXT, start TEXT, duration REAL, rms REAL, size INTEGER)""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_recordings_dir_start ON recordings(dir, start)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_recordings_tg ON recordings(tg)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_recordings_radio_id ON recordings(radio_id)")
+
+    @staticmethod
+    def _row(path, channel, tg, radio_id, cc, start, duration, rms):
+        path = os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        start = start.strftime("%Y-%m-%d %H:%M:%S") if isinstance(start, datetime) else start
+        return (path, os.path.dirname(path), channel, tg, radio_id, cc, start, duration, rms, size)
+
+    def add(self, path, channel, tg, radio_id, cc, start, duration, rms):
+        self.add_many([self._row(path, channel, tg, radio_id, cc, start, duration, rms)])
+
+    def add_many(self, rows):
+        with self._lock, self.db:
+            self.db.executemany("""INSERT OR REPLACE INTO recordings
+                (path, dir, channel, tg, radio_id, cc, start, duration, rms, size) VALUES (?,?,?,?,?,?,?,?,?,?)""", rows)
+
+    def _where(self, dirs):
+        dirs = [os.path.abspath(d) for d in dirs if d]
+        return f"dir IN ({','.join('?' * len(dirs))})", dirs
+
+    def count(self, dirs):
+        where, args = self._where(dirs)
+        with self._lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM recordings WHERE {where}", args).fetchone()[0]
+
+    def page(self, dirs, offset=0, limit=RECORDING_PAGE_SIZE):
+        """Newest-first rows as dicts for the recordings in ``dirs``."""
+        where, args = self._where(dirs)
+        with self._lock:
+            cursor = self.db.execute(f"""SELECT path, channel, tg, radio_id, cc, start, duration, rms FROM recordings
+                WHERE {where} ORDER BY start DESC, id DESC LIMIT ? OFFSET ?""", args + [limit, offset])
+            names = [c[0] for c in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def get(self, path):
+        """The row of one recording as ``page`` returns it, or None."""
+        with self._lock:
+            cursor = self.db.execute("SELECT path, channel, tg, radio_id, cc, start, duration, rms, dir FROM recordings WHERE path = ?",
+                                     (os.path.abspath(path),))
+            row = cursor.fetchone()
+            return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def remove_missing(self, dirs):
+        """Drop rows whose file no longer exists; returns how many went."""
+        where, args = self._where(dirs)
+        with self._lock:
+            paths = [row[0] for row in self.db.execute(f"SELECT path FROM recordings WHERE {where}", args)]
+        gone = [(p,) for p in paths if not os.path.exists(p)]
+        with self._lock, self.db:
+            self.db.executemany("DELETE FROM recordings WHERE path = ?", gone)
+        return len(gone)
+
+    def import_directory(self, rec_dir, settle=0.0):
+        """Catalog the recordings in ``rec_dir`` that are not in it yet; returns their paths.
+
+        Channel, ID and start come from the file name, duration from the file
+        header. TG, CC and RMS are unknown for these and stay NULL. Files
+        modified less than ``settle`` seconds ago are left for a later call,
+        as another program (dsd-fme's per-call ``-P`` files) may still be
+        writing them.
+        """
+        rec_dir = os.path.abspath(rec_dir)
+        newest = time.time() - settle
+        with self._lock:
+            known = {row[0] for row in self.db.execute("SELECT path FROM recordings WHERE dir = ?", (rec_dir,))}
+        rows = []
+        with os.scandir(rec_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if not entry.is_file() or ext.lower() not in RECORDING_EXTENSIONS or entry.path in known:
+                    continue
+                if settle and entry.stat().st_mtime > newest:
+                    continue
+                match = RECORDING_NAME.match(stem)
+                channel, radio_id, start = None, None, None
+                if match:
+                    start = datetime.strptime(match.group(1), "%Y-%m-%d_%H%M%S")
+                    channel, radio_id = int(match.group(2)), match.group(3)
+                else:
+                    start = datetime.fromtimestamp(entry.stat().st_mtime)
+                rows.append(self._row(entry.path, channel, None, radio_id, None, start, recording_duration(entry.path), None))
+        if rows:
+            self.add_many(rows)
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+def recording_duration(path):
+    """Length in seconds from the file header, or None if it cannot be read."""
+    try:
+        if path.lower().endswith(".wav"):
+            with wave.open(path, 'rb') as wav:
+                return wav.getnframes() / wav.getframerate()
+        if SOUNDFILE_AVAILABLE:
+            return sf.info(path).duration
+    except Exception:
+        pass
+    return None
+#</editor-fold>
+
+
+#<editor-fold desc="Audio Processing">
+def filter_params(values, eq_mode='both_same'):
+    """Snapshot of the Audio-Lab settings the FilterChain reads.
+
+    ``values`` uses the GUI widget keys (``FILTER_DEFAULTS`` plus
+    ``eq{port}_band_{i}``). The EQ mode is resolved here into per-channel band
+    gains, so the chain never has to know about it. Treat the result as
+    read-only: it is published whole and swapped, never edited in place.
+    """
+    params = {key: values.get(key, default) for key, default in FILTER_DEFAULTS.items()}
+    bands = {port: tuple(float(values.get(f'eq{port}_band_{i}', 0) or 0) for i in range(len(EQ_BANDS))) for port in (1, 2)}
+    flat = (0.0,) * len(EQ_BANDS)
+    params['eq'] = {
+        'both_same': {1: bands[1], 2: bands[1]},
+        'port1': {1: bands[1], 2: flat},
+        'port2': {1: flat, 2: bands[2]},
+    }.get(eq_mode, bands)
+    return params
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def design_filter(kind, order, cutoffs, q, fs, gain_db=0.0):
+    """Second-order sections for one filter stage.
+
+    ``kind`` is a scipy butter type ('highpass', 'lowpass', 'bandpass'),
+    'notch' or 'eq' (a peaking biquad boosting or cutting ``gain_db`` around
+    ``cutoffs``); ``cutoffs`` is a frequency or a (low, high) tuple. The chain
+    asks for the same designs on every packet, so they are cached and only
+    recomputed when a control actually changes the key.
+    """
+    if kind == 'notch':
+        return signal.tf2sos(*signal.iirnotch(cutoffs, q, fs=fs))
+    if kind == 'eq':
+        # RBJ audio EQ cookbook peaking filter: unity gain away from the band
+        a_gain = 10 ** (gain_db / 40.0)
+        w0 = 2 * np.pi * cutoffs / fs; alpha = np.sin(w0) / (2 * q); cos_w0 = np.cos(w0)
+        a0 = 1 + alpha / a_gain
+        return np.array([[(1 + alpha * a_gain) / a0, -2 * cos_w0 / a0, (1 - alpha * a_gain) / a0,
+                          1.0, -2 * cos_w0 / a0, (1 - alpha / a_gain) / a0]])
+    return signal.butter(order, cutoffs, kind, fs=fs, output='sos')
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def design_cascade(designs):
+    """``(sos, zi, offsets)`` of the stages in ``designs`` (a tuple of design_filter keys) run as one cascade.
+
+    Stage ``i`` owns rows ``offsets[i]:offsets[i + 1]`` of ``sos`` and ``zi``.
+    """
+    stages = [design_filter(*design) for design in designs]
+    sos = np.vstack(stages)
+    return sos, signal.sosfilt_zi(sos), np.cumsum([0] + [len(stage) for stage in stages])
+
+
+class SpectralDenoiser:
+    """Streaming spectral subtraction for one channel.
+
+    Frames of ``NR_FRAME`` samples with 50 % overlap are windowed with a
+    periodic sqrt-Hann window on both analysis and synthesis, so overlap-add
+    reconstructs the input exactly when nothing is subtracted. The per-bin
+    noise profile only learns from frames marked as non-voice; until it has
+    seen one the signal passes through unchanged. Output lags the input by
+    ``NR_FRAME`` samples.
+    """
+
+    _window = np.sqrt(0.5 - 0.5 * np.cos(2 * np.pi * np.arange(NR_FRAME) / NR_FRAME))
+
+    def __init__(self, max_block=AUDIO_BUFFER_SAMPLES):
+        self.noise = np.zeros(NR_FRAME // 2 + 1); self.learned = False
+        self._in = np.zeros(NR_FRAME + max_block); self._in_fill = NR_FRAME - NR_HOP
+        self._out = np.zeros(NR_HOP + max_block + NR_FRAME); self._out_fill = NR_HOP
+        self._ola = np.zeros(NR_FRAME)
+        self._frame = np.zeros(NR_FRAME); self._mag = np.zeros(NR_FRAME // 2 + 1); self._gain = np.zeros(NR_FRAME // 2 + 1)
+
+    def process(self, samples, strength, voice):
+        n = len(samples)
+        self._in[self._in_fill:self._in_fill + n] = samples; self._in_fill += n
+        start = 0
+        while self._in_fill - start >= NR_FRAME:
+            np.multiply(self._in[start:start + NR_FRAME], self._window, out=self._frame)
+            spec = np.fft.rfft(self._frame)
+            np.abs(spec, out=self._mag)
+            if not voice:
+                if self.learned:
+                    self.noise *= 1 - NR_PROFILE_ALPHA; self.noise += NR_PROFILE_ALPHA * self._mag
+                else:
+                    self.noise[:] = self._mag; self.learned = True
+            if self.learned:
+                # gain = max(1 - strength * noise / |X|, floor), computed in place
+                np.maximum(self._mag, 1e-9, out=self._gain)
+                np.divide(self.noise, self._gain, out=self._gain)
+                self._gain *= -strength; self._gain += 1
+                np.maximum(self._gain, NR_FLOOR, out=self._gain)
+                spec *= self._gain
+            self._ola += np.fft.irfft(spec, NR_FRAME) * self._window
+            self._out[self._out_fill:self._out_fill + NR_HOP] = self._ola[:NR_HOP]; self._out_fill += NR_HOP
+            self._ola[:-NR_HOP] = self._ola[NR_HOP:]; self._ola[-NR_HOP:] = 0
+            start += NR_HOP
+        if start:
+            remaining = self._in_fill - start
+            self._in[:remaining] = self._in[start:self._in_fill]; self._in_fill = remaining
+        ready = min(n, self._out_fill)
+        result = np.zeros(n, dtype=np.float32)
+        result[n - ready:] = self._out[:ready]
+        self._out[:self._out_fill - ready] = self._out[ready:self._out_fill]; self._out_fill -= ready
+        return result
+
+
+class FilterChain:
+    """AGC, HP/LP/BP/notch filters, 6-band EQ and noise reduction, with state kept per channel."""
+
+    def __init__(self):
+        self.states = {1: {}, 2: {}}
+
+    def reset(self):
+        self.states = {1: {}, 2: {}}
+
+    def process(self, channel, samples, params, voice=False):
+        state = self.states.setdefault(channel, {})
+        samples_float = samples.astype(np.float32)
+        p = params
+
+        if p['agc_check']:
+            strength = p['agc_strength_slider'] / 100.0
+            current_rms = np.sqrt(np.mean((samples_float / 32768.0) ** 2))
+            if current_rms > 1e-6:
+                gain = np.clip(0.1 / current_rms, 0.1, 10.0)
+                state['agc_gain'] = (1.0 - strength) * state.get('agc_gain', 1.0) + strength * gain
+                samples_float *= state['agc_gain']
+
+        if SCIPY_AVAILABLE:
+            # filters and EQ bands are all biquads in series, so they share one cascade
+            designs = self._iir_designs(p) + self._eq_designs(p['eq'].get(channel, ()))
+            if designs:
+                samples_float = self._sosfilt(state, 'iir', designs, samples_float)
+
+        if p['nr_check']:
+            if 'denoiser' not in state: state['denoiser'] = SpectralDenoiser()
+            samples_float = state['denoiser'].process(samples_float, p['nr_strength_slider'] / 100.0, voice)
+
+        np.clip(samples_float, -32767, 32767, out=samples_float)
+        return samples_float.astype(AUDIO_DTYPE)
+
+    @staticmethod
+    def _iir_designs(p):
+        """Design keys of the enabled HP, LP, BP and notch stages, in chain order."""
+        nyquist = AUDIO_RATE / 2 - 1
+        designs = []
+        if p['hp_filter_check']:
+            designs.append(('highpass', FILTER_ORDER, min(p['hp_cutoff_spin'], nyquist), None, AUDIO_RATE))
+        if p['lp_filter_check']:
+            designs.append(('lowpass', FILTER_ORDER, min(p['lp_cutoff_spin'], nyquist), None, AUDIO_RATE))
+        if p['bp_filter_check']:
+            low = max(1, p['bp_center_spin'] - p['bp_width_spin'] / 2)
+            high = min(nyquist, p['bp_center_spin'] + p['bp_width_spin'] / 2)
+            designs.append(('bandpass', FILTER_ORDER, (low, high), None, AUDIO_RATE))
+        if p['notch_filter_check']:
+            designs.append(('notch', 2, min(p['notch_freq_spin'], nyquist), p['notch_q_spin'], AUDIO_RATE))
+        return tuple(designs)
+
+    @staticmethod
+    def _eq_designs(gains):
+        """One peaking biquad per EQ band that is not flat."""
+        return tuple(('eq', 2, freq, EQ_Q, AUDIO_RATE, float(gain_db)) for freq, gain_db in zip(EQ_BANDS, gains) if abs(gain_db) > 0.1)
+
+    @staticmethod
+    def _sosfilt(state, name, designs, x):
+        """Run a cascade in one sosfilt pass.
+
+        When the designs change, every stage whose design key is still in the
+        cascade keeps its own state rows, so moving an EQ slider does not
+        restart the HP/LP sections; only new or changed stages start from
+        the steady state for ``x[0]``.
+        """
+        sos, zi, offsets = design_cascade(designs)
+        entry = state.get(name)
+        if entry is None:
+            z = zi * x[0]
+        elif entry[0] != designs:
+            z = zi * x[0]
+            old_designs, old_z = entry
+            old_offsets = design_cascade(old_designs)[2]
+            unused = list(range(len(old_designs)))
+            for i, design in enumerate(designs):
+                j = next((j for j in unused if old_designs[j] == design), None)
+                if j is not None:
+                    unused.remove(j)
+                    z[offsets[i]:offsets[i + 1]] = old_z[old_offsets[j]:old_offsets[j + 1]]
+        else:
+            z = entry[1]
+        y, zf = signal.sosfilt(sos, x, zi=z)
+        state[name] = (designs, zf)
+        return y
+
+
+class DspWorker:
+    """Pipeline stage between the UDP packet rings and the AudioRouter.
+
+    ``notify(channel)`` (called on the UDP thread) wakes the worker, which
+    drains that channel's PacketRing, runs the FilterChain, routes the result
+    and, when ``monitor`` is set, copies the unfiltered samples into a
+    per-channel ``monitors`` ring that the display polls once per frame.
+    Settings arrive as whole ``filter_params`` snapshots through
+    ``set_params``, so the worker never touches GUI objects.
+
+    scipy and numpy release the GIL inside their filter and FFT kernels, so a
+    thread is enough to keep this work off the caller's thread.
+    """
+
+    def __init__(self, router, params=None, monitor=False):
+        self.router = router
+        self.chain = FilterChain()
+        self.params = params or filter_params({})
+        self.rings = {}
+        self.monitor = monitor
+        self.monitors = {1: JitterBuffer(), 2: JitterBuffer()}
+        self.voice_until = {1: 0.0, 2: 0.0}
+        self._pending = set(); self._reset = False; self._running = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2); self._thread = None
+
+    def attach(self, channel, ring):
+        self.rings[channel] = ring
+
+    def detach_all(self):
+        self.rings = {}
+
+    def set_params(self, params):
+        self.params = params
+
+    def set_voice(self, channel, active):
+        """Mark decoder voice activity; it lapses ``VOICE_HOLD_SECONDS`` after the last voice frame."""
+        self.voice_until[channel] = time.monotonic() + VOICE_HOLD_SECONDS if active else 0.0
+
+    def reset_filters(self):
+        """Drop filter state before the next block (the worker owns the chain)."""
+        self._reset = True
+
+    def notify(self, channel):
+        with self._cond:
+            self._pending.add(channel)
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and self._running:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                channels, self._pending = self._pending, set()
+            if self._reset:
+                self._reset = False; self.chain.reset()
+            params = self.params; now = time.monotonic()
+            for channel in channels:
+                ring = self.rings.get(channel)
+                if ring is None:
+                    continue
+                voice = now < self.voice_until.get(channel, 0.0)
+                for samples in ring.drain():
+                    try:
+                        filtered = self.chain.process(channel, samples, params, voice)
+                    except Exception as e:
+                        print(f"Audio filter error: {e}")
+                        filtered = samples
+                    self.router.route(channel, filtered)
+                    if self.monitor:
+                        self.monitors[channel].write(samples)
+#</editor-fold>
+
+
+#<editor-fold desc="Spectrum">
+@lru_cache(maxsize=8)
+def spectrum_window(size):
+    """Hann window normalised to unit mean, so dB levels match an unwindowed FFT of a tone."""
+    window = np.hanning(size).astype(np.float32)
+    return window / window.mean()
+
+
+class Spectrogram:
+    """Log-magnitude history of one signal for a scrolling spectrogram.
+
+    Each row is written at ``index`` and again ``rows`` further on, so
+    ``view()`` is always one contiguous slice from oldest to newest row and
+    nothing is rolled or copied when a frame arrives. Frames are
+    ``fft_size`` samples apart by ``hop``; all frames completed by one
+    ``feed`` go through a single 2-D ``rfft``.
+    """
+
+    def __init__(self, rows=SPEC_WIDTH, fft_size=SPEC_FFT_SIZE, overlap=0.0):
+        self.rows = rows
+        self.configure(fft_size, overlap)
+
+    def configure(self, fft_size, overlap=0.0):
+        self.fft_size = int(fft_size)
+        self.hop = max(1, int(round(self.fft_size * (1.0 - overlap))))
+        self.bins = self.fft_size // 2 + 1
+        self._data = np.full((2 * self.rows, self.bins), MIN_DB, dtype=np.float32)
+        self._fifo = np.zeros(self.fft_size + AUDIO_BUFFER_SAMPLES, dtype=np.float32)
+        self._fill = 0
+        self.index = 0
+
+    def clear(self):
+        self._data.fill(MIN_DB); self._fill = 0; self.index = 0
+
+    def view(self):
+        return self._data[self.index:self.index + self.rows]
+
+    def last_row(self):
+        return self._data[self.index + self.rows - 1]
+
+    def peak_hz(self):
+        return int(np.argmax(self.last_row())) * AUDIO_RATE / self.fft_size
+
+    def feed(self, samples):
+        """Queue normalised float samples; returns the number of new rows."""
+        frames = self.take_frames(samples)
+        if len(frames):
+            self.write_rows(np.fft.rfft(frames, axis=1))
+        return len(frames)
+
+    def take_frames(self, samples):
+        """Queue normalised float samples and return the windowed frames they complete."""
+        n = min(len(samples), len(self._fifo) - self._fill)
+        self._fifo[self._fill:self._fill + n] = samples[:n]; self._fill += n
+        if self._fill < self.fft_size:
+            return np.empty((0, self.fft_size), dtype=np.float32)
+        count = (self._fill - self.fft_size) // self.hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(self._fifo[:self._fill], self.fft_size)[::self.hop][:count]
+        frames = frames * spectrum_window(self.fft_size)
+        consumed = count * self.hop
+        self._fifo[:self._fill - consumed] = self._fifo[consumed:self._fill]; self._fill -= consumed
+        return frames
+
+    def write_rows(self, spectra):
+        """Append complex spectra (one row per frame) as clipped dB rows."""
+        rows = np.abs(spectra)
+        rows += 1e-12
+        np.log10(rows, out=rows); rows *= 20
+        np.clip(rows, MIN_DB, MAX_DB, out=rows)
+        rows = rows[-self.rows:]
+        positions = (self.index + np.arange(len(rows))) % self.rows
+        self._data[positions] = rows; self._data[positions + self.rows] = rows
+        self.index = (self.index + len(rows)) % self.rows
+
+
+class SpectrogramBank:
+    """One Spectrogram per port, all kept up to date whichever one is shown.
+
+    ``feed`` collects the frames completed on every port and runs them through
+    one stacked 2-D ``rfft`` before handing each port its rows, so a display
+    frame costs a single FFT call however many ports are active.
+    """
+
+    def __init__(self, channels=(1, 2), rows=SPEC_WIDTH, fft_size=SPEC_FFT_SIZE, overlap=0.0):
+        self.spectrograms = {channel: Spectrogram(rows, fft_size, overlap) for channel in channels}
+
+    def __getitem__(self, channel):
+        return self.spectrograms[channel]
+
+    def configure(self, fft_size, overlap=0.0):
+        for spectrogram in self.spectrograms.values():
+            spectrogram.configure(fft_size, overlap)
+
+    def clear(self):
+        for spectrogram in self.spectrograms.values():
+            spectrogram.clear()
+
+    def feed(self, blocks):
+        """``blocks`` maps channel to normalised float samples; returns the new rows per channel."""
+        framed = {channel: self.spectrograms[channel].take_frames(samples) for channel, samples in blocks.items()}
+        framed = {channel: frames for channel, frames in framed.items() if len(frames)}
+        if framed:
+            spectra = np.fft.rfft(np.concatenate(list(framed.values())), axis=1)
+            start = 0
+            for channel, frames in framed.items():
+                self.spectrograms[channel].write_rows(spectra[start:start + len(frames)]); start += len(frames)
+        return {channel: len(frames) for channel, frames in framed.items()}
+
+
+class Scope:
+    """Rolling window of the latest samples for the oscilloscope.
+
+    Like the Spectrogram store, every sample is written twice into a
+    double-length array so the window is always one contiguous slice.
+    ``envelope`` reduces it to a min/max pair per display column, which draws
+    the same outline as plotting every sample at a fraction of the points.
+    """
+
+    def __init__(self, seconds=SCOPE_SECONDS, rate=AUDIO_RATE):
+        self.rate = rate
+        self.configure(seconds)
+
+    def configure(self, seconds):
+        self.seconds = seconds
+        self.size = max(1, int(seconds * self.rate))
+        self._data = np.zeros(2 * self.size, dtype=AUDIO_DTYPE)
+        self.index = 0
+
+    def clear(self):
+        self._data[:] = 0
+
+    def view(self):
+        """The window, oldest sample first."""
+        return self._data[self.index:self.index + self.size]
+
+    def feed(self, samples):
+        samples = samples[-self.size:]; n = len(samples)
+        first = min(n, self.size - self.index); rest = n - first
+        for base in (self.index, self.index + self.size):
+            self._data[base:base + first] = samples[:first]
+        for base in (0, self.size):
+            self._data[base:base + rest] = samples[first:]
+        self.index = (self.index + n) % self.size
+
+    def envelope(self, columns):
+        """Time axis (seconds, ending at 0) and min/max outline for ``columns`` display columns."""
+        columns = max(1, min(int(columns), self.size))
+        per = self.size // columns
+        blocks = self.view()[self.size - per * columns:].reshape(columns, per)
+        y = np.empty((columns, 2), dtype=np.float32)
+        y[:, 0] = blocks.min(axis=1); y[:, 1] = blocks.max(axis=1)
+        x = np.repeat(np.arange(-columns, 0, dtype=np.float32) * (per / self.rate), 2)
+        return x, y.ravel()
+#</editor-fold>
+
+
+#<editor-fold desc="Headless Session">
+class DecoderSession:
+    """Runs the decoders, call tracking, audio and recording without Qt."""
+
+    def __init__(self, commands, settings=None, aliases=None, alerts=None, log_path=None,
+                 play_audio=True, echo=False, out=None, logbook=None):
+        self.commands = commands
+        self.settings = settings or {}
+        self.aliases = aliases or {'tg': {}, 'id': {}}
+        self.alerts = alerts or []
+        self.log_path = log_path
+        # calls go into the Logbook like the GUI's; the CSV at log_path is an extra export
+        self.logbook = logbook; self.open_log_rows = {}
+        self.play_audio = play_audio
+        self.echo = echo
+        self.out = out or sys.stdout
+        self.processes = []
+        self.threads = []; self.readers = []
+        self.receivers = []
+        self.recorder = WavRecorder(self.settings.get('recorder_layout', "stereo"), self.settings.get('recorder_codec', "wav"),
+                                    RecordingCatalog())
+        self.router = AudioRouter(self.recorder)
+        self.dsp = DspWorker(self.router, filter_params(self.settings))
+        self.tracker = CallTracker(self)
+        self._lock = threading.RLock()
+
+    def _print(self, text):
+        with self._lock:
+            print(text, file=self.out, flush=True)
+
+    def _alias(self, kind, value):
+        return self.aliases[kind].get(value, value) or "N/A"
+
+    @property
+    def dual(self):
+        return len(self.commands) > 1
+
+    def start(self):
+        if self.play_audio:
+            devices = {ch: audio_device_index(self.settings.get(f'output_device{ch}'), 'output', self.settings.get(f'output_device{ch}_index'))
+                       for ch in (1, 2)}
+            self.router.open_streams(self.dual, devices)
+        else:
+            self.router.dual = self.dual
+        self.dsp.start()
+        for idx in range(len(self.commands)):
+            receiver = UdpReceiver(UDP_IP, UDP_PORT + idx, idx + 1, self.dsp.notify, self._on_udp_error)
+            self.dsp.attach(idx + 1, receiver.ring)
+            self.receivers.append(receiver)
+            self._start_thread(receiver.run)
+            self._print(f"Listening on UDP {UDP_PORT + idx} (Port {idx + 1})")
+        for idx, cmd in enumerate(self.commands):
+            self._print(f"$ {subprocess.list2cmdline(cmd)}")
+            process = spawn_decoder(cmd)
+            self.processes.append(process)
+            self._start_thread(lambda p=process, i=idx: self._read(p, i), reader=True)
+
+    def _start_thread(self, target, reader=False):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        (self.readers if reader else self.threads).append(thread)
+
+    def is_running(self):
+        return any(p.poll() is None for p in self.processes)
+
+    def wait(self):
+        try:
+            while self.is_running():
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self):
+        for p in self.processes:
+            if p.poll() is None:
+                p.terminate()
+                try:
+                    p.wait(timeout=1)
+                except Exception:
+                    pass
+        # let the readers hand on their last batch before the open calls are closed
+        for thread in self.readers:
+            thread.join(timeout=2)
+        for receiver in self.receivers:
+            receiver.running = False
+        self.dsp.stop()
+        with self._lock:
+            self.tracker.end_calls()
+        self.recorder.close()
+        self.router.close_streams()
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    def _read(self, process, idx):
+        """Reader thread of one decoder: lines go out in batches, parsed like the GUI's ProcessReader does."""
+        batcher = LineBatcher(lambda lines: self._on_lines(idx, lines))
+        read_process_lines(process, batcher.add)
+        batcher.close()
+
+    def _on_lines(self, idx, lines):
+        if self.echo:
+            self._print("\n".join(f"[P{idx + 1}] {line.rstrip()}" for line in lines))
+        events = parse_lines(idx, lines)
+        with self._lock:
+            for event in events:
+                self.tracker.handle(event)
+
+    def _on_udp_error(self, channel, message):
+        print(message, file=sys.stderr)
+
+    def on_call_start(self, call):
+        tg_alias, id_alias = self._alias('tg', call.tg), self._alias('id', call.radio_id)
+        self._print(f"{call.start_time:%Y-%m-%d %H:%M:%S} P{call.channel} CALL TG={tg_alias} ID={id_alias} CC={call.cc or 'N/A'}")
+        if self.logbook:
+            try:
+                self.open_log_rows[(call.radio_id, call.channel)] = self.logbook.add_call(call, tg_alias, id_alias)
+            except sqlite3.Error as e:
+                print(f"Could not write logbook: {e}", file=sys.stderr)
+        if self.settings.get('recorder_enabled_check'):
+            path = self.recorder.start(call.channel, self.settings.get(f'recorder_dir{call.channel}', ''), call.radio_id, call.tg, call.cc)
+            if path:
+                self._print(f"  recording {path}")
+        alert = find_alert(self.alerts, call.tg, call.radio_id, call.channel)
+        if alert:
+            self._print(f"\a  ALERT {alert['type']} {alert['value']}")
+
+    def on_call_end(self, call):
+        self._print(f"{call.end_time:%Y-%m-%d %H:%M:%S} P{call.channel} END  ID={self._alias('id', call.radio_id)} ({call.duration_text()})")
+        row_id = self.open_log_rows.pop((call.radio_id, call.channel), None)
+        if row_id is not None:
+            try:
+                self.logbook.set_end(row_id, call)
+            except sqlite3.Error as e:
+                print(f"Could not write logbook: {e}", file=sys.stderr)
+        if self.log_path:
+            write_header = not os.path.exists(self.log_path)
+            try:
+                with open(self.log_path, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if write_header:
+                        writer.writerow(LOGBOOK_HEADER)
+                    writer.writerow([call.start_time.strftime("%Y-%m-%d %H:%M:%S"), call.end_time.strftime("%Y-%m-%d %H:%M:%S"),
+                                     call.duration_text(), str(call.channel), self._alias('tg', call.tg),
+                                     self._alias('id', call.radio_id), call.cc or "N/A", "", ""])
+            except OSError as e:
+                print(f"Could not write logbook: {e}", file=sys.stderr)
+
+    def on_voice(self, idx, timestamp):
+        self.dsp.set_voice(idx + 1, True)
+
+    def on_sync(self, idx, timestamp):
+        self.dsp.set_voice(idx + 1, False)
+
+    def on_no_sync(self, idx):
+        self.dsp.set_voice(idx + 1, False)
+        self.recorder.stop(idx + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dsd_core", description="Run DSD-FME decoders headless using the GUI configuration.")
+    parser.add_argument("--config", help="config file (default: the GUI's dsd-fme-gui-config.json)")
+    parser.add_argument("--logbook", default=LOGBOOK_DB, help="logbook database to record calls in (default: the GUI's logbook.db)")
+    parser.add_argument("--no-logbook", action="store_true", help="do not record calls in the logbook database")
+    parser.add_argument("--log", help="also append finished calls to this CSV file")
+    parser.add_argument("--no-audio", action="store_true", help="do not open any sound output device")
+    parser.add_argument("--echo", action="store_true", help="print the decoder console output")
+    parser.add_argument("--dry-run", action="store_true", help="print the decoder command lines and exit")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    settings = dict(config.get('ui_settings', {}))
+    try:
+        commands = build_commands(settings, config.get('dsd_fme_path'), config.get('dsd_fme_path2'))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.dry_run:
+        for cmd in commands:
+            print(subprocess.list2cmdline(cmd))
+        return 0
+
+    logbook = None if args.no_logbook else Logbook(args.logbook, check_same_thread=False)
+    session = DecoderSession(commands, settings, load_aliases(), config.get('alerts', []),
+                             log_path=args.log, play_audio=not args.no_audio, echo=args.echo, logbook=logbook)
+    session.start()
+    session.wait()
+    session.stop()
+    if logbook:
+        logbook.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
+#</editor-fold>
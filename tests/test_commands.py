@@ -0,0 +1,44 @@
+import pytest
+
+import dsd_core
+from dsd_core import audio_device_index, build_commands
+
+DEVICES = [{'name': "Speakers", 'max_input_channels': 0, 'max_output_channels': 2},
+           {'name': "USB Audio", 'max_input_channels': 1, 'max_output_channels': 2},
+           {'name': "Line In", 'max_input_channels': 2, 'max_output_channels': 0}]
+
+
+class FakeSounddevice:
+    @staticmethod
+    def query_devices():
+        return DEVICES
+
+
+@pytest.fixture
+def devices(monkeypatch):
+    monkeypatch.setattr(dsd_core, "SOUNDDEVICE_AVAILABLE", True)
+    monkeypatch.setattr(dsd_core, "sd", FakeSounddevice, raising=False)
+
+
+def test_device_names_win_over_saved_indexes(devices):
+    assert audio_device_index("Line In", 'input', 0) == 2
+    assert audio_device_index("USB Audio (Default)", 'output', 2) == 1
+    assert audio_device_index("Line In", 'output') is None
+    # a device that is gone falls back to the index saved with it
+    assert audio_device_index("Headset", 'input', 1) == 1
+    assert audio_device_index(None, 'input', 1) == 1 and audio_device_index("", 'input') is None
+    assert audio_device_index(3) == 3 and audio_device_index("3") == 3
+
+
+def input_device(settings):
+    cmd = build_commands(settings, "dsd-fme")[0]
+    return cmd[cmd.index("-i") + 1]
+
+
+def test_audio_input_command_uses_the_device_name(devices):
+    settings = {"-i_type": "audio", "audio_in_dev": "Line In", "audio_in_dev_index": 1}
+    assert input_device(settings) == "pa:2"
+    settings["audio_in_dev"] = "Unplugged Mic"
+    assert input_device(settings) == "pa:1"
+    with pytest.raises(ValueError):
+        build_commands({"-i_type": "audio", "audio_in_dev": "Unplugged Mic"}, "dsd-fme")
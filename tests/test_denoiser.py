@@ -0,0 +1,36 @@
+import numpy as np
+
+from dsd_core import SpectralDenoiser, NR_FRAME, CHUNK_SAMPLES
+
+
+def run(denoiser, signal, strength, voice, block=CHUNK_SAMPLES):
+    return np.concatenate([denoiser.process(signal[i:i + block], strength, voice) for i in range(0, len(signal), block)])
+
+
+def test_passthrough_until_noise_is_learned():
+    signal = np.random.default_rng(1).uniform(-20000, 20000, CHUNK_SAMPLES * 20)
+    denoiser = SpectralDenoiser()
+    out = run(denoiser, signal, 1.0, voice=True)
+    assert not denoiser.learned
+    assert len(out) == len(signal) and out.dtype == np.float32
+    assert np.allclose(out[:NR_FRAME], 0)
+    np.testing.assert_allclose(out[NR_FRAME:], signal[:-NR_FRAME], atol=0.05)
+
+
+def test_reconstructs_when_nothing_is_subtracted():
+    rng = np.random.default_rng(2)
+    signal = rng.uniform(-20000, 20000, CHUNK_SAMPLES * 20)
+    denoiser = SpectralDenoiser()
+    # odd block sizes so frames straddle the blocks
+    out = np.concatenate([denoiser.process(signal[i:i + 300], 0.0, voice=False) for i in range(0, len(signal), 300)])
+    assert denoiser.learned
+    np.testing.assert_allclose(out[NR_FRAME:], signal[:-NR_FRAME], atol=0.05)
+
+
+def test_subtracts_learned_noise():
+    rng = np.random.default_rng(3)
+    noise = rng.normal(0, 2000, CHUNK_SAMPLES * 40)
+    denoiser = SpectralDenoiser()
+    out = run(denoiser, noise, 1.0, voice=False)
+    tail = slice(len(noise) // 2, None)
+    assert np.sqrt(np.mean(out[tail] ** 2)) < 0.5 * np.sqrt(np.mean(noise[tail] ** 2))
@@ -0,0 +1,64 @@
+import numpy as np
+from scipy import signal
+
+from dsd_core import FilterChain, filter_params, design_filter, design_cascade, CHUNK_SAMPLES, EQ_BANDS
+
+FILTERS = {"hp_filter_check": True, "lp_filter_check": True, "notch_filter_check": True}
+
+
+def blocks(count, seed=1):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(-8000, 8000, CHUNK_SAMPLES).astype(np.int16) for _ in range(count)]
+
+
+def eq(gains):
+    return {f"eq1_band_{i}": gain for i, gain in enumerate(gains)}
+
+
+def test_everything_off_passes_samples_through():
+    chain = FilterChain()
+    for block in blocks(3):
+        assert np.array_equal(chain.process(1, block, filter_params({})), block)
+
+
+def test_cascade_matches_stages_run_one_after_another():
+    params = filter_params(dict(FILTERS, **eq([0, 6, 0, -6, 0, 0])))
+    designs = FilterChain._iir_designs(params) + FilterChain._eq_designs(params['eq'][1])
+    assert len(designs) == 5
+    x = np.concatenate(blocks(4)).astype(np.float64)
+    expected = x
+    for design in designs:
+        sos = design_filter(*design)
+        expected = signal.sosfilt(sos, expected, zi=signal.sosfilt_zi(sos) * expected[0])[0]
+    # steady-state starts differ between the two, so compare once they have decayed
+    state = {}
+    y = FilterChain._sosfilt(state, 'iir', designs, x)
+    np.testing.assert_allclose(y[CHUNK_SAMPLES * 2:], expected[CHUNK_SAMPLES * 2:], atol=1e-3)
+
+
+def test_eq_change_keeps_filter_state():
+    plain, moved = FilterChain(), FilterChain()
+    before = filter_params(dict(FILTERS, **eq([0, 3, 0, 0, 0, 0])))
+    after = filter_params(dict(FILTERS, **eq([0, 9, 0, -4, 0, 0])))
+    data = blocks(6, seed=2)
+    for block in data[:3]:
+        plain.process(1, block, before); moved.process(1, block, before)
+    for block in data[3:]:
+        plain.process(1, block, before); moved.process(1, block, after)
+    designs, zf = moved.states[1]['iir']
+    old_designs, old_zf = plain.states[1]['iir']
+    stages = len(FilterChain._iir_designs(before))
+    assert designs[:stages] == old_designs[:stages]
+    rows = design_cascade(designs)[2][stages]
+    np.testing.assert_array_equal(zf[:rows], old_zf[:rows])
+
+
+def test_channels_keep_separate_state():
+    chain = FilterChain()
+    params = filter_params(dict(FILTERS, **eq([0] * len(EQ_BANDS))))
+    data = blocks(4, seed=3)
+    for block in data[:2]:
+        chain.process(1, block, params)
+    alone = FilterChain()
+    for block in data[2:]:
+        assert np.array_equal(chain.process(2, block, params), alone.process(2, block, params))
@@ -0,0 +1,53 @@
+import numpy as np
+
+import dsd_core
+from dsd_core import JitterBuffer, CHUNK_SAMPLES, UDP_GAP_SECONDS
+
+
+def test_ring_wraps_and_cuts_overruns():
+    buf = JitterBuffer(capacity=10)
+    out = np.zeros(6, dtype=np.int16)
+    assert buf.write(np.arange(6)) == 6 and buf.read_into(out) == 6
+    assert buf.write(np.arange(6, 14)) == 8
+    assert buf.write(np.arange(14, 20)) == 2 and buf.overruns == 1
+    out = np.zeros(12, dtype=np.int16)
+    assert buf.read_into(out) == 10
+    assert list(out[:10]) == list(range(6, 16)) and not out[10:].any()
+
+
+def test_pull_waits_for_target_then_plays():
+    buf = JitterBuffer()
+    out = np.ones(CHUNK_SAMPLES // 2, dtype=np.int16)
+    buf.write(np.full(buf.target - 1, 7))
+    assert buf.pull(out) == 0 and not out.any()
+    buf.write(np.full(1, 7))
+    assert buf.pull(out) == len(out) and (out == 7).all()
+
+
+def test_late_audio_grows_target(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(dsd_core.time, "monotonic", lambda: now[0])
+    buf = JitterBuffer()
+    out = np.zeros(CHUNK_SAMPLES, dtype=np.int16)
+    target = buf.target
+    buf.write(np.ones(target)); buf.pull(out)
+    assert buf.pull(out) == 0 and buf.underruns == 0
+    # the writer alone never touches the target
+    now[0] += UDP_GAP_SECONDS / 2
+    buf.write(np.ones(CHUNK_SAMPLES))
+    assert buf.target == target and buf.underruns == 0
+    buf.pull(out)
+    assert buf.target == 2 * target and buf.underruns == 1
+    # audio after a longer gap is a new call, not a late packet
+    buf.clear(); buf.write(np.ones(buf.target)); buf.pull(out); buf.pull(out)
+    now[0] += UDP_GAP_SECONDS * 2
+    buf.write(np.ones(CHUNK_SAMPLES)); buf.pull(out)
+    assert buf.target == 2 * target and buf.underruns == 1
+
+
+def test_backlog_is_skipped():
+    buf = JitterBuffer()
+    out = np.zeros(CHUNK_SAMPLES, dtype=np.int16)
+    buf.write(np.ones(buf.target * 4 + CHUNK_SAMPLES))
+    buf.pull(out)
+    assert buf.available() == buf.target - CHUNK_SAMPLES
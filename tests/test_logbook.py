@@ -0,0 +1,162 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from dsd_core import Logbook, CallRecord, LOGBOOK_COLUMNS
+
+
+@pytest.fixture(params=["UTC", "Europe/Warsaw", "America/New_York"])
+def local_tz(request, monkeypatch):
+    """Run under a local time zone; stats() turns the stored local hours into epoch seconds."""
+    if not hasattr(time, "tzset"):
+        pytest.skip("time zones can only be switched on Unix")
+    monkeypatch.setenv("TZ", request.param); time.tzset()
+    yield request.param
+    monkeypatch.undo(); time.tzset()
+
+
+@pytest.fixture
+def logbook(tmp_path):
+    book = Logbook(str(tmp_path / "logbook.db"))
+    yield book
+    book.close()
+
+
+def log_call(book, radio_id, tg, start, seconds=None, tg_alias="", id_alias="", channel=1):
+    call = CallRecord(radio_id, tg, "01", channel, start_time=start)
+    row_id = book.add_call(call, tg_alias, id_alias)
+    if seconds is not None:
+        call.end_time = start + timedelta(seconds=seconds)
+        book.set_end(row_id, call)
+    return row_id
+
+
+def ids(book, **filters):
+    return sorted(row[0] for row in book.rows(limit=None, **filters))
+
+
+def test_search_matches_substrings(logbook):
+    start = datetime(2024, 5, 1, 12)
+    a = log_call(logbook, "1003", "91", start, 5, tg_alias="World Wide")
+    b = log_call(logbook, "2004", "9", start, 5, id_alias="Base 003x")
+    log_call(logbook, "5555", "3100", start, 5)
+    assert logbook.count(text="003") == 2 and ids(logbook, text="003") == [a, b]
+    assert ids(logbook, text="wide") == [a]
+    assert ids(logbook, text="world 1003") == [a]
+    assert logbook.count(text="world 2004") == 0
+
+
+def test_search_short_words(logbook):
+    start = datetime(2024, 5, 1, 12)
+    a = log_call(logbook, "1003", "91", start, 5)
+    b = log_call(logbook, "2004", "9", start, 5)
+    assert ids(logbook, text="9") == [a, b]
+    assert ids(logbook, text="91") == [a]
+    assert ids(logbook, text="91 1003") == [a]
+    assert ids(logbook, text="91 2004") == []
+
+
+def test_search_follows_edits_and_new_calls(logbook):
+    start = datetime(2024, 5, 1, 12)
+    a = log_call(logbook, "1003", "91", start, 5)
+    b = log_call(logbook, "2004", "9", start, 5)
+    assert logbook.count(text="emergency") == 0
+    logbook.set_field(b, "notes", "Emergency traffic")
+    assert ids(logbook, text="emergency") == [b] and logbook.matches(b, text="emergency")
+    c = log_call(logbook, "7", "1", start, None, tg_alias="EMERGENCY")
+    assert ids(logbook, text="emergency") == [b, c]
+    logbook.set_field(b, "notes", "")
+    assert ids(logbook, text="emergency") == [c] and not logbook.matches(a, text="emergency")
+
+
+def test_search_with_date_range_and_sort(logbook):
+    day = datetime(2024, 5, 1, 12)
+    rows = [log_call(logbook, f"10{i:02}", "91", day + timedelta(days=i), i + 1) for i in range(5)]
+    found = logbook.rows(order="duration", descending=False, limit=None, text="91",
+                         start_date=(day + timedelta(days=1)).date(), end_date=(day + timedelta(days=3)).date())
+    assert [row[0] for row in found] == rows[1:4]
+    assert [row[1 + LOGBOOK_COLUMNS.index("duration")] for row in logbook.rows(text="91", order="duration", limit=2)] == [5, 4]
+
+
+def test_search_without_fts_falls_back_to_like(logbook):
+    start = datetime(2024, 5, 1, 12)
+    a = log_call(logbook, "1003", "91", start, 5, tg_alias="World Wide")
+    logbook.fts = False
+    assert ids(logbook, text="003") == [a] and ids(logbook, text="wide") == [a]
+    assert ids(logbook, text="1003 world") == [a] and ids(logbook, text="1003 base") == []
+
+
+def expected_stats(calls, first, last):
+    """Statistics computed straight from ``(start, seconds, tg, radio_id)`` calls."""
+    inside = [c for c in calls if first <= c[0].date() <= last]
+    busiest = {}
+    for key, position in (("tg", 2), ("id", 3)):
+        totals = {}
+        for call in inside:
+            count, airtime = totals.get(call[position], (0, 0))
+            totals[call[position]] = (count + 1, airtime + (call[1] or 0))
+        busiest[key] = totals
+    hours = {}
+    for call in inside:
+        hour = int(call[0].replace(minute=0, second=0).timestamp())
+        hours[hour] = hours.get(hour, 0) + 1
+    return len(inside), sum(c[1] or 0 for c in inside), busiest, sorted(hours.items())
+
+
+def check_stats(book, calls, first, last):
+    total, airtime, busiest, hours = expected_stats(calls, first, last)
+    stats = book.stats(first, last, top=1000)
+    assert (stats['total_calls'], stats['airtime'], stats['hours']) == (total, airtime, hours)
+    for key in ("tg", "id"):
+        assert {k: (n, a) for k, n, a in stats[key]} == busiest[key]
+
+
+def test_stats_match_a_direct_count(local_tz, logbook):
+    rng = random.Random(5)
+    day = datetime(2024, 5, 1)
+    calls = []
+    for _ in range(400):
+        start = day + timedelta(seconds=rng.randrange(5 * 86400))
+        seconds = None if rng.random() < 0.1 else rng.randint(0, 120)
+        tg, radio_id = str(rng.choice([91, 92, 3100, 9])), str(rng.randint(1000, 1030))
+        log_call(logbook, radio_id, tg, start, seconds)
+        calls.append((start, seconds, tg, radio_id))
+    for first, last in ((day.date(), (day + timedelta(days=4)).date()), ((day + timedelta(days=1)).date(), (day + timedelta(days=2)).date())):
+        check_stats(logbook, calls, first, last)
+    logbook.rebuild_stats()
+    check_stats(logbook, calls, day.date(), (day + timedelta(days=4)).date())
+
+
+def test_stats_count_open_calls(logbook):
+    start = datetime(2024, 5, 1, 10, 30)
+    log_call(logbook, "1003", "91", start, 30)
+    log_call(logbook, "1004", "91", start + timedelta(minutes=1))
+    stats = logbook.stats(start.date(), start.date())
+    assert (stats['total_calls'], stats['airtime']) == (2, 30)
+    assert stats['tg'] == [("91", 2, 30)]
+    assert sorted(stats['id']) == [("1003", 1, 30), ("1004", 1, 0)]
+
+
+def test_stats_survive_reopening(tmp_path):
+    path = str(tmp_path / "logbook.db")
+    book = Logbook(path)
+    log_call(book, "1003", "91", datetime(2024, 5, 1, 10), 30)
+    book.close()
+    book = Logbook(path)
+    assert book.stats(None, None)['total_calls'] == 1
+    book.close()
+
+
+def test_import_rows_validates(logbook):
+    good = ["2024-05-01 10:00:00", "2024-05-01 10:00:30", "0:00:30", "1", "TG 91", "1003", "01", "", "imported"]
+    open_call = ["2024-05-01 11:00:00", "", "", "2", "TG 92", "1004", "01", "", ""]
+    bad = [["bad"], good[:-1], ["yesterday"] + good[1:], good[:1] + ["later"] + good[2:], good[:2] + ["30s"] + good[3:]]
+    assert logbook.import_rows([good, open_call] + bad) == (2, len(bad))
+    assert [row[1:] for row in logbook.rows(order="start", descending=False, limit=None)] == [
+        ("2024-05-01 10:00:00", "2024-05-01 10:00:30", 30, 1, "TG 91", "1003", "01", "", "imported"),
+        ("2024-05-01 11:00:00", None, None, 2, "TG 92", "1004", "01", "", "")]
+    stats = logbook.stats(None, None)
+    assert (stats['total_calls'], stats['airtime']) == (2, 30)
+    assert logbook.count(text="imported") == 1
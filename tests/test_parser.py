@@ -0,0 +1,103 @@
+import random
+
+from bench_parser import legacy_scan, synthetic_corpus
+from dsd_core import (parse_line, parse_lines, CallTracker, TalkerEvent, ColorCodeEvent, SyncEvent, VoiceEvent,
+                      NoSyncEvent, LINE_BATCH_MAX_LINES)
+
+EDGE_LINES = [
+    "12:00:01 Sync: +DMR  [slot1]  slot2  | Color Code=07 | VLC\n",
+    "12:00:02 Sync: +DMR  [slot1]  slot2  | Color Code=07 | VC3\n",
+    "12:00:03 Sync: +DMR  slot1  [slot2]  | Color Code=07\n",
+    "12:00:04 Sync: +DMR  slot1  [slot2]  | Color Code=07",
+    "Sync: no sync | Color Code=02 \n",
+    "Sync: no sync\n",
+    "Sync: +NXDN48 RDCH\n",
+    " SLOT 2 TGT=16777215 SRC=12345\n",
+    " SLOT 2 TGT=91\n",
+    " SLOT 2 SRC=1234 TGT=91 Group Call\n",
+    " DMR PDU Payload [00][11][22]\n",
+    "",
+]
+
+
+def scan_events(text):
+    """What the legacy scan found on one line, in the shape parse_line reports it."""
+    result = legacy_scan(0, text)
+    if result is None:
+        return []
+    no_sync = len(result) == 2 and result[1] is True
+    if len(result) == 2 and not no_sync:
+        return [(TalkerEvent, result[0], result[1])]
+    cc, is_voice, timestamp = result[0] if no_sync else result
+    events = [(ColorCodeEvent, cc)] if cc is not None else []
+    cls = NoSyncEvent if no_sync else VoiceEvent if is_voice else SyncEvent
+    return events + [(cls, timestamp)]
+
+
+def fields(event):
+    if isinstance(event, TalkerEvent):
+        return (TalkerEvent, event.tg, event.src)
+    if isinstance(event, ColorCodeEvent):
+        return (ColorCodeEvent, event.cc)
+    return (type(event), event.timestamp)
+
+
+def test_parse_line_matches_legacy_scan():
+    for text in synthetic_corpus(20000) + EDGE_LINES:
+        assert [fields(e) for e in parse_line(0, text)] == scan_events(text), text
+
+
+def test_parse_line_keeps_port():
+    assert all(event.port == 1 for event in parse_line(1, EDGE_LINES[0]))
+
+
+class Recorder:
+    """Listener that keeps the call decisions a CallTracker makes."""
+
+    def __init__(self):
+        self.log = []
+
+    def on_talker(self, idx, tg, id):
+        self.log.append(('talker', idx, tg, id))
+
+    def on_call_start(self, call):
+        self.log.append(('start', call.channel, call.radio_id, call.tg, call.cc))
+
+    def on_call_end(self, call):
+        self.log.append(('end', call.channel, call.radio_id, call.tg, call.cc))
+
+    def on_no_sync(self, idx):
+        self.log.append(('no sync', idx))
+
+
+def tracker_state(tracker):
+    return (tracker.is_in_transmission, tracker.current_tg, tracker.current_id, tracker.current_cc,
+            tracker.last_logged_id, sorted(tracker.open_calls))
+
+
+def test_parse_lines_drives_tracker_like_parse_line():
+    rnd = random.Random(3)
+    lines = synthetic_corpus(30000, seed=3)
+    # mix in other colour codes and edge lines so the collapse has something to get wrong
+    for _ in range(500):
+        lines.insert(rnd.randrange(len(lines)), rnd.choice(EDGE_LINES))
+    per_line, batched = Recorder(), Recorder()
+    a, b = CallTracker(per_line), CallTracker(batched)
+    for text in lines:
+        for event in parse_line(0, text):
+            a.handle(event)
+    i = 0
+    while i < len(lines):
+        size = rnd.randint(1, LINE_BATCH_MAX_LINES)
+        for event in parse_lines(0, lines[i:i + size]):
+            b.handle(event)
+        i += size
+    assert per_line.log and per_line.log == batched.log
+    assert tracker_state(a) == tracker_state(b)
+
+
+def test_parse_lines_collapses_repeated_state():
+    lines = ["12:00:01 Sync: +DMR | Color Code=01 | VC1\n", "12:00:02 Sync: +DMR | Color Code=01 | VC2\n",
+             "12:00:03 Sync: +DMR | Color Code=01 | VC3\n", " DMR PDU Payload [00]\n", "Sync: no sync\n"]
+    events = parse_lines(0, lines)
+    assert [fields(e) for e in events] == [(ColorCodeEvent, "01"), (VoiceEvent, "12:00:03"), (NoSyncEvent, None)]
@@ -0,0 +1,100 @@
+import os
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from dsd_core import WavRecorder, RecordingCatalog, read_recording, AUDIO_RATE
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_recording_is_written_as_part_then_renamed(tmp_path):
+    recorder = WavRecorder(codec="wav")
+    path = recorder.start(1, str(tmp_path), "1003/7", tg="91")
+    assert os.path.dirname(path) == str(tmp_path) and "_ch1_ID_1003-7" in path
+    frames = np.arange(-4000, 4000, dtype=np.int16).reshape(-1, 2)
+    recorder.write(1, frames)
+    assert wait_for(lambda: os.path.exists(path + ".part"))
+    assert not os.path.exists(path)
+    recorder.stop(1)
+    assert wait_for(lambda: os.path.exists(path))
+    assert not os.path.exists(path + ".part")
+    data, rate = read_recording(path)
+    assert rate == AUDIO_RATE and np.array_equal(data, frames)
+    recorder.close()
+    assert recorder.stats()['dropped'] == 0
+
+
+def test_close_finishes_open_recordings(tmp_path):
+    recorder = WavRecorder(layout="mono", codec="wav")
+    paths = [recorder.start(ch, str(tmp_path), 1000 + ch) for ch in (1, 2)]
+    for ch in (1, 2):
+        recorder.write(ch, np.full(AUDIO_RATE // 10, ch * 100, dtype=np.int16))
+    recorder.close()
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths)
+    for ch, path in zip((1, 2), paths):
+        data, _ = read_recording(path)
+        assert data.shape == (AUDIO_RATE // 10, 1) and (data == ch * 100).all()
+
+
+def test_start_needs_an_existing_directory(tmp_path):
+    recorder = WavRecorder()
+    assert recorder.start(1, str(tmp_path / "missing"), 1003) is None
+    assert not recorder.is_recording(1)
+    recorder.write(1, np.zeros(16, dtype=np.int16))
+    recorder.close()
+    assert not os.path.exists(tmp_path / "missing")
+
+
+def write_wav(path, frames, nchannels=1):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(nchannels); wav.setsampwidth(2); wav.setframerate(AUDIO_RATE)
+        wav.writeframes(frames.astype(np.int16).tobytes())
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = RecordingCatalog(str(tmp_path / "recordings.db"))
+    yield catalog
+    catalog.close()
+
+
+def test_finished_recordings_are_cataloged(tmp_path, catalog):
+    done = []
+    recorder = WavRecorder(codec="wav", catalog=catalog, on_cataloged=done.append)
+    path = recorder.start(2, str(tmp_path), 1003, tg="91", cc="01")
+    recorder.write(2, np.full((AUDIO_RATE // 2, 2), 3277, dtype=np.int16))
+    recorder.close()
+    assert done == [path]
+    row = catalog.get(path)
+    assert (row['channel'], row['tg'], row['radio_id'], row['cc'], row['dir']) == (2, "91", "1003", "01", str(tmp_path))
+    assert row['duration'] == 0.5 and abs(row['rms'] - 0.1) < 1e-3
+    assert catalog.count([str(tmp_path)]) == 1 and catalog.page([str(tmp_path)]) == [{k: row[k] for k in row if k != 'dir'}]
+
+
+def test_import_directory_catalogs_external_files(tmp_path, catalog):
+    named = tmp_path / "2024-05-01_120000_ch1_ID_1003.wav"
+    other = tmp_path / "dsd-fme call.wav"
+    write_wav(named, np.zeros(AUDIO_RATE)); write_wav(other, np.zeros(AUDIO_RATE // 4))
+    (tmp_path / "notes.txt").write_text("not audio")
+    old = time.time() - 60
+    os.utime(named, (old, old))
+    # the file just written may still be growing
+    assert catalog.import_directory(str(tmp_path), settle=30) == [str(named)]
+    row = catalog.get(str(named))
+    assert (row['channel'], row['radio_id'], row['start'], row['duration']) == (1, "1003", "2024-05-01 12:00:00", 1.0)
+    assert catalog.import_directory(str(tmp_path)) == [str(other)]
+    assert catalog.get(str(other))['channel'] is None
+    assert catalog.import_directory(str(tmp_path)) == []
+    assert [r['path'] for r in catalog.page([str(tmp_path)])] == [str(other), str(named)]
+    other.unlink()
+    assert catalog.remove_missing([str(tmp_path)]) == 1 and catalog.count([str(tmp_path)]) == 1
@@ -0,0 +1,42 @@
+from dsd_core import TerminalLog, TERMINAL_SPILL_BLOCK
+
+
+def filled(count, line_cap):
+    log = TerminalLog(line_cap)
+    for i in range(0, count, 97):
+        log.append_lines([f"line {n} Zażółć" for n in range(i, min(i + 97, count))])
+    return log
+
+
+def test_spilled_lines_read_back_by_index():
+    count = TERMINAL_SPILL_BLOCK * 5 + 17
+    log = filled(count, 100)
+    assert len(log) == count and len(log._lines) <= 125
+    for index in (0, 1, TERMINAL_SPILL_BLOCK - 1, TERMINAL_SPILL_BLOCK, count // 2, count - 101, count - 1):
+        assert log.line(index) == f"line {index} Zażółć"
+    assert [line for _, line in log.iter_lines(count - 150)] == [f"line {n} Zażółć" for n in range(count - 150, count)]
+    log.close()
+
+
+def test_find_wraps_around():
+    log = filled(3000, 64)
+    assert log.find("LINE 5 ") == 5
+    assert log.find("line 2999", start=100) == 2999
+    assert log.find("line 10 ", start=2000) == 10
+    assert log.find("missing") == -1 and log.find("") == -1
+    log.close()
+
+
+def test_save_and_clear(tmp_path):
+    log = filled(1000, 50)
+    path = tmp_path / "port1.log"
+    log.save(str(path))
+    saved = path.read_text(encoding="utf-8").splitlines()
+    assert saved == [f"line {n} Zażółć" for n in range(1000)]
+    log.set_line_cap(10)
+    assert len(log) == 1000 and log.line(995) == "line 995 Zażółć"
+    log.clear()
+    assert len(log) == 0 and list(log.iter_lines()) == []
+    log.append_lines(["again"])
+    assert log.line(0) == "again"
+    log.close()